@@ -1,25 +1,126 @@
+import hashlib
+import itertools
+import json
 import logging
-from time import sleep
-from typing import Any, Iterable
+import re
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from time import monotonic, sleep
+from typing import Any, Callable, Iterable, Iterator, Mapping, Optional, Sequence, TypeVar
 
 import boto3
+from botocore.exceptions import BotoCoreError, ClientError
 
-from .models import AlarmProps, MetricAlarmParam
+from . import hedging
+from .alarm_record import AlarmRecord
+from .deadline import Deadline, LatencyTracker
+from .journal import ApplyJournal
+from .models import MetricAlarmParam
+from .pagination import prefetch_pages
+from .quota import AlarmQuotaGate
+from .rate_limiter import THROTTLING_ERROR_CODES, AdaptiveTokenBucket, TokenBucket
+from .spill import MemoryMeter, SpillStore
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# alarm properties compared to detect drifts of existing alarms
+DRIFT_CHECK_KEYS = (
+    "AlarmDescription",
+    "Namespace",
+    "MetricName",
+    "Dimensions",
+    "Statistic",
+    "Period",
+    "EvaluationPeriods",
+    "Threshold",
+    "ComparisonOperator",
+    "TreatMissingData",
+    "AlarmActions",
+    "OKActions",
+    "InsufficientDataActions",
+)
+
+# errors of DeleteAlarms pointing at some of the alarms in the batch, which bisecting the batch can isolate.
+# the others, like AccessDenied, fail any part of the batch alike
+ALARM_SPECIFIC_ERROR_CODES = frozenset(
+    [
+        "ResourceNotFound",
+        "ResourceNotFoundException",
+        "ValidationError",
+        "InvalidParameterValue",
+        "InvalidParameterCombination",
+    ]
+)
+
+# how to compute the change set. `merge-join` streams the existing alarms in name order instead of indexing them,
+# and `columnar` computes it on arrays with numpy, an optional dependency
+DIFF_MODES = ("hash", "merge-join", "columnar")
+
+# marker of the desired-state fingerprint embedded in `AlarmDescription`
+FINGERPRINT_PATTERN = re.compile(r" \[fingerprint:([0-9a-f]+)\]$")
+
+
+@dataclass
+class DeleteBatchResult:
+    """Outcome of a batch of alarms to delete"""
+
+    alarm_names: list[str]
+    failed_alarm_names: list[str]
+
+
+@dataclass
+class CreateFailure:
+    """Alarm failed to create"""
+
+    alarm_param: dict[str, Any]
+    error: str
+
+
+@dataclass
+class UpdateResult:
+    """Outcome of updating alarms"""
+
+    delete_batches: list[DeleteBatchResult] = field(default_factory=list)
+    failed_to_create: list[CreateFailure] = field(default_factory=list)
+    failed_to_delete: list[str] = field(default_factory=list)
+    # alarms not tried before the deadline
+    not_created: list[dict[str, Any]] = field(default_factory=list)
+    not_deleted: list[str] = field(default_factory=list)
+
+
+@dataclass
+class VerificationResult:
+    """Outcome of verifying alarms updated"""
+
+    verified: int = 0
+    missing: list[str] = field(default_factory=list)
+    not_deleted: list[str] = field(default_factory=list)
+    different: list[str] = field(default_factory=list)
+
 
 class AlarmHandler:
     """Alarm Handler"""
 
-    def __init__(self, config: dict[str, Any]) -> None:
+    # retries at the end of the run for the alarms failed to update
+    retry_attempts = 3
+    retry_backoff_in_sec = 1.0
+    # DeleteAlarms accepts up to 100 alarms per invocation
+    delete_batch_size = 100
+
+    def __init__(self, config: dict[str, Any], concurrency: int = 1) -> None:
         """Constructor
 
         Args:
             config (dict[str, Any]): config dict
+            concurrency (int): max number of API calls in flight
         """
         self.cloudwatch = boto3.client("cloudwatch")
         self.config = config
+        self.concurrency = max(concurrency, 1)
+        self.hedger = hedging.from_config(config)
 
     def __del__(self) -> None:
         """Desctructor"""
@@ -27,73 +128,398 @@ class AlarmHandler:
         pass
 
     def get_alarms_change_set(
-        self, alarm_params: Iterable[MetricAlarmParam]
-    ) -> tuple[Iterable[AlarmProps], Iterable[AlarmProps], list[str]]:
+        self,
+        alarm_params: Iterable[MetricAlarmParam],
+        additional_alarm_actions: Optional[list[str]] = None,
+        diff_mode: str = "hash",
+        memory_limit_in_mb: Optional[float] = None,
+    ) -> tuple[Sequence[AlarmRecord], Sequence[AlarmRecord], Sequence[AlarmRecord], list[str]]:
         """Gets alarm change set
 
+        Existing alarms are compared with the required ones by the fingerprint embedded in `AlarmDescription`,
+        or on their properties if they have no fingerprint. The drifted alarms are returned as alarms to update.
+        Alarms to create and to update are ordered by the priority of the resources, the highest first.
+
+        In `merge-join` mode, the existing alarms are not indexed but merged page by page with the required alarms
+        sorted by name, as DescribeAlarms returns them in name order. It falls back to `hash` mode if they're not.
+        In `columnar` mode, the required alarms are held in a columnar table and compared with vectorized operations,
+        and the alarms of the change set are built from its rows when they're read.
+
+        With a memory limit, once the required alarms held in memory exceed it, they and the existing alarms
+        are spilled to an SQLite database in a temporary file, and the change set is computed and read from there
+        regardless of the diff mode. The existing alarms held in `hash` and `columnar` modes count toward the limit
+        too, and are described again to spill once they exceed it.
+
         Args:
             alarm_params (Iterable[MetricAlarmParam]): alarms to create
+            additional_alarm_actions (Optional[list[str]]): alarm actions given in addition to the config
+            diff_mode (str): `hash`, `merge-join` or `columnar`
+            memory_limit_in_mb (Optional[float]): memory to hold the required alarms in, unlimited if not given
 
         Returns:
-            tuple[Iterable[AlarmProps], list[str], list[str]]: a tuple of alarms to create,
-                                                                     alarms to keep and alarms to delete
+            tuple[Sequence[AlarmRecord], Sequence[AlarmRecord], Sequence[AlarmRecord], list[str]]: a tuple of alarms
+                            to create, alarms to update, alarms to keep as they are and alarms to delete
         """
+        if diff_mode not in DIFF_MODES:
+            raise ValueError(f"unknown diff mode: {diff_mode}")
+
         alarm_name_prefix = self.config["globals"]["alarm"]["alarm_name_prefix"]
-        required_alarms = list(self._get_required_alarm_params(alarm_name_prefix, alarm_params))
-        current_alarms = self._get_current_alarms(alarm_name_prefix)
-        current_alarm_names = {alm["AlarmName"] for alm in current_alarms}
+        common_param = self._get_common_alarm_params(additional_alarm_actions or [])
+        records = self._get_required_alarm_params(alarm_name_prefix, alarm_params, common_param)
+        meter = MemoryMeter(memory_limit_in_mb) if memory_limit_in_mb is not None else None
+        held: list[AlarmRecord] = []
+        for record in records:
+            held.append(record)
+            if meter and meter.add(record.name, record.description):
+                logger.info("spilling the change set to disk over %s MB", memory_limit_in_mb)
+                return self._spilled_change_set(held, records, alarm_name_prefix)
+
+        # the sort is stable, keeping the discovery order in the same priority
+        required_alarms = sorted(held, key=lambda r: -r.priority)
+        del held
+
+        # existing alarms held in memory count toward the limit too. merge-join mode streams them
+        current_alarms = _metered_alarms(self._get_current_alarms(alarm_name_prefix), meter)
+        try:
+            if diff_mode == "merge-join":
+                try:
+                    return self._merge_join_change_set(required_alarms, self._get_current_alarms(alarm_name_prefix))
+                except _UnsortedAlarmsError as e:
+                    logger.warning("falls back to the hash diff mode: %s", e)
+            elif diff_mode == "columnar":
+                return self._columnar_change_set(required_alarms, current_alarms)
+
+            return self._hash_change_set(required_alarms, current_alarms)
+        except _MemoryLimitExceededError:
+            # the alarms held so far are released with the error before spilling
+            pass
+
+        logger.info("spilling the change set to disk over %s MB with the existing alarms", memory_limit_in_mb)
+        return self._spilled_change_set(required_alarms, iter(()), alarm_name_prefix)
+
+    def _hash_change_set(
+        self,
+        required_alarms: list[AlarmRecord],
+        current_alarms: Iterable[Mapping[str, Any]],
+    ) -> tuple[list[AlarmRecord], list[AlarmRecord], list[AlarmRecord], list[str]]:
+        current_states = {alm["AlarmName"]: _alarm_state(alm) for alm in current_alarms}
         required_alarm_names = {alm["AlarmName"] for alm in required_alarms}
 
-        need_to_create = [alm for alm in required_alarms if alm["AlarmName"] not in current_alarm_names]
-        no_update = [alm for alm in required_alarms if alm["AlarmName"] in current_alarm_names]
-        need_to_delete = current_alarm_names.difference(required_alarm_names)
+        need_to_create = []
+        need_to_update = []
+        no_update = []
+        for alm in required_alarms:
+            name = alm["AlarmName"]
+            if name not in current_states:
+                need_to_create.append(alm)
+            elif _is_drifted(alm, current_states[name]):
+                need_to_update.append(alm)
+            else:
+                no_update.append(alm)
+        need_to_delete = [name for name in current_states if name not in required_alarm_names]
+
+        return (need_to_create, need_to_update, no_update, need_to_delete)
+
+    def _merge_join_change_set(
+        self,
+        required_alarms: list[AlarmRecord],
+        current_alarms: Iterable[Mapping[str, Any]],
+    ) -> tuple[list[AlarmRecord], list[AlarmRecord], list[AlarmRecord], list[str]]:
+        # positions of the required alarms in name order. the results are put back in the priority order
+        by_name = sorted(range(len(required_alarms)), key=lambda i: required_alarms[i]["AlarmName"])
+        create_at: list[int] = []
+        update_at: list[int] = []
+        keep_at: list[int] = []
+        need_to_delete = []
+
+        pos = 0
+        prev_name: Optional[str] = None
+        for alarm in current_alarms:
+            name = alarm["AlarmName"]
+            if prev_name is not None and name <= prev_name:
+                raise _UnsortedAlarmsError(f"existing alarms are not in name order: {prev_name}, {name}")
+            prev_name = name
+
+            while pos < len(by_name) and required_alarms[by_name[pos]]["AlarmName"] < name:
+                create_at.append(by_name[pos])
+                pos += 1
+
+            if pos < len(by_name) and required_alarms[by_name[pos]]["AlarmName"] == name:
+                current = _alarm_state(alarm)
+                while pos < len(by_name) and required_alarms[by_name[pos]]["AlarmName"] == name:
+                    i = by_name[pos]
+                    (update_at if _is_drifted(required_alarms[i], current) else keep_at).append(i)
+                    pos += 1
+            else:
+                need_to_delete.append(name)
+
+        create_at.extend(by_name[pos:])
+
+        return (
+            [required_alarms[i] for i in sorted(create_at)],
+            [required_alarms[i] for i in sorted(update_at)],
+            [required_alarms[i] for i in sorted(keep_at)],
+            need_to_delete,
+        )
+
+    def _columnar_change_set(
+        self,
+        required_alarms: list[AlarmRecord],
+        current_alarms: Iterable[Mapping[str, Any]],
+    ) -> tuple[Sequence[AlarmRecord], Sequence[AlarmRecord], Sequence[AlarmRecord], list[str]]:
+        from . import columnar  # numpy is loaded only in this mode
+
+        # the existing alarms are read first, as the records are spilled if they exceed the memory limit
+        current_names: list[str] = []
+        current_descriptions: list[Optional[str]] = []
+        for alarm in current_alarms:
+            current_names.append(alarm["AlarmName"])
+            current_descriptions.append(_alarm_state(alarm))
+
+        # the plan is held only in the table, and the records are built back from the rows at apply time
+        table = columnar.AlarmTable.from_alarms(required_alarms)
+        required_alarms.clear()
+        change_set = columnar.diff(table, current_names, current_descriptions)
+
+        return (
+            table.rows(change_set.created),
+            table.rows(change_set.updated),
+            table.rows(change_set.kept),
+            [current_names[i] for i in change_set.deleted.tolist()],
+        )
+
+    def _spilled_change_set(
+        self,
+        held: list[AlarmRecord],
+        rest: Iterator[AlarmRecord],
+        alarm_name_prefix: str,
+    ) -> tuple[Sequence[AlarmRecord], Sequence[AlarmRecord], Sequence[AlarmRecord], list[str]]:
+        store = SpillStore()
+        store.add_required(held)
+        held.clear()
+        store.add_required(rest)
+        store.add_current(
+            (alarm["AlarmName"], _alarm_state(alarm)) for alarm in self._get_current_alarms(alarm_name_prefix)
+        )
+        store.index()
+
+        store.add_change_set(("create", seq) for seq in store.created())
+        store.add_change_set(
+            ("update" if current is None or current != description else "keep", seq)
+            for seq, description, current in store.matched()
+        )
 
-        return (need_to_create, no_update, list(need_to_delete))
+        return (store.change_set("create"), store.change_set("update"), store.change_set("keep"), list(store.deleted()))
 
     def _get_required_alarm_params(
-        self, alarm_name_prefix: str, alarm_params: Iterable[MetricAlarmParam]
-    ) -> Iterable[AlarmProps]:
+        self, alarm_name_prefix: str, alarm_params: Iterable[MetricAlarmParam], common_param: dict[str, Any]
+    ) -> Iterator[AlarmRecord]:
+        # alarms sharing the properties but the dimensions share a template
+        templates: dict[Any, _AlarmTemplate] = {}
+        # metrics of a resource sharing the dimensions serialize them once
+        last_dimensions: Any = None
+        serialized_dimensions = ""
         for alm in alarm_params:
             resource_name = alm["TargetResource"]["ResourceName"]
             alarm_props = alm["AlarmProps"]
-            alarm_props["AlarmName"] = f"{alarm_name_prefix}{resource_name}-{alarm_props['MetricName']}"
-            alarm_props["AlarmDescription"] = f"Metric Alarm for `{alarm_props['MetricName']}` of {resource_name}"
+            template_key = _template_key(alarm_props)
+            template = templates.get(template_key)
+            if template is None:
+                template = templates[template_key] = _AlarmTemplate(alarm_name_prefix, common_param, alarm_props)
+            dimensions = alarm_props.get("Dimensions", [])
+            if dimensions is not last_dimensions:
+                last_dimensions, serialized_dimensions = dimensions, _serialize_dimensions(dimensions)
 
-            yield alarm_props
+            yield AlarmRecord.from_props(
+                alarm_props,
+                name=template.name(resource_name),
+                description=template.description(resource_name, serialized_dimensions),
+                priority=alm["TargetResource"].get("Priority", 0),
+            )
+
+    def _get_current_alarms(self, alarm_name_prefix: Optional[str]) -> Iterable:
+        # all the alarms if no prefix is given
+        prefix_filter: dict[str, Any] = {"AlarmNamePrefix": alarm_name_prefix} if alarm_name_prefix else {}
 
-    def _get_current_alarms(self, alarm_name_prefix: str) -> Iterable:
-        token = ""
-        while True:
-            current_alarms_resp = self.cloudwatch.describe_alarms(
+        def _describe_alarms(token: str) -> Mapping[str, Any]:
+            return self.cloudwatch.describe_alarms(
                 NextToken=token,
-                AlarmNamePrefix=alarm_name_prefix,
                 AlarmTypes=["MetricAlarm"],
                 MaxRecords=100,
+                **prefix_filter,
             )
-            yield from current_alarms_resp["MetricAlarms"]
 
-            next_token = current_alarms_resp.get("NextToken")
-            if next_token and next_token != "":
-                token = next_token
-            else:
-                # no more results
-                break
+        for current_alarms_resp in prefetch_pages(_describe_alarms, "NextToken", hedger=self.hedger):
+            yield from current_alarms_resp["MetricAlarms"]
 
     def update_alarms(
-        self, to_create: Iterable[AlarmProps], to_delete: list[str], additional_alarm_actions: list[str]
-    ) -> None:
+        self,
+        to_create: Sequence[Mapping[str, Any]],
+        to_delete: list[str],
+        additional_alarm_actions: list[str],
+        journal: Optional[ApplyJournal] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> UpdateResult:
         """Updates alarms with given changes
 
+        Alarms are deleted in a pipeline running alongside the creation, with its own rate limit.
+        An alarm failed to update doesn't stop the others, and is retried with backoff at the end of the run.
+        With a journal, operations completed are recorded, and those already recorded for the same plan are skipped.
+        With a deadline, no more alarms are tried once the measured latency tells they wouldn't finish in time.
+        Alarms are created in the given order. With `alarm_quota` in the config, creations exceeding the quota
+        wait for the deletions to make room. Alarms to create are read as they're sent, so a change set spilled
+        to disk isn't loaded into memory, with or without a journal.
+
         Args:
-            to_create (Iterable[AlarmProps]): alarms to create
+            to_create (Sequence[Mapping[str, Any]]): alarms to create
             to_delete (list[str]): alarms to delete
             additional_alarm_actions (list[str]): alarm actions for created alarms
+            journal (Optional[ApplyJournal]): journal of the operations applied
+            deadline (Optional[Deadline]): deadline of the run
+
+        Returns:
+            UpdateResult: outcome of the update
         """
-        self._create_alarms(to_create, additional_alarm_actions)
-        self._delete_alarms(to_delete)
+        pending: Iterable[Mapping[str, Any]] = to_create
+        if journal:
+            # the plan is identified by the alarms to put, including the common params
+            common_param = self._get_common_alarm_params(additional_alarm_actions)
+            applied = journal.begin(to_create, to_delete, common_param)
+            pending = (alm for alm in to_create if alm["AlarmName"] not in applied)
+            to_delete = [name for name in to_delete if name not in applied]
+
+        try:
+            result = self._update_alarms(pending, to_delete, additional_alarm_actions, journal, deadline)
+        except BaseException:
+            if journal:
+                journal.close()
+            raise
+
+        if journal:
+            if result.failed_to_create or result.failed_to_delete or result.not_created or result.not_deleted:
+                journal.close()  # resumable to apply the rest
+            else:
+                journal.end()
+
+        return result
+
+    def _update_alarms(
+        self,
+        to_create: Iterable[Mapping[str, Any]],
+        to_delete: list[str],
+        additional_alarm_actions: list[str],
+        journal: Optional[ApplyJournal],
+        deadline: Optional[Deadline],
+    ) -> UpdateResult:
+        quota_gate = self._create_quota_gate()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            deletion = executor.submit(self._delete_alarms, to_delete, journal, deadline, quota_gate)
+            try:
+                failed_to_create, not_created = self._create_alarms(
+                    to_create, additional_alarm_actions, journal, deadline, quota_gate
+                )
+            finally:
+                delete_batches, not_deleted = deletion.result()
+        result = UpdateResult(
+            delete_batches, failed_to_create, _failed_alarm_names(delete_batches), not_created, not_deleted
+        )
+
+        for attempt in range(self.retry_attempts):
+            if not result.failed_to_create and not result.failed_to_delete:
+                break
+
+            backoff = self.retry_backoff_in_sec * 2**attempt
+            if deadline and deadline.remaining() <= backoff:
+                logger.info("no time left to retry before the deadline")
+                break
+
+            logger.info(
+                "retrying %d alarms to create and %d alarms to delete in %s sec.",
+                len(result.failed_to_create),
+                len(result.failed_to_delete),
+                backoff,
+            )
+            sleep(backoff)
+            alarms_to_retry = [f.alarm_param for f in result.failed_to_create]
+            failed_to_create, not_retried = self._create_alarms(
+                alarms_to_retry, additional_alarm_actions, journal, deadline
+            )
+            # alarms not retried before the deadline keep their last errors
+            not_retried_names = {alm["AlarmName"] for alm in not_retried}
+            result.failed_to_create = failed_to_create + [
+                f for f in result.failed_to_create if f.alarm_param["AlarmName"] in not_retried_names
+            ]
+            retried_batches, not_retried_to_delete = self._delete_alarms(result.failed_to_delete, journal, deadline)
+            result.delete_batches.extend(retried_batches)
+            result.failed_to_delete = _failed_alarm_names(retried_batches) + not_retried_to_delete
 
-    def _create_alarms(self, alarm_params: Iterable[AlarmProps], additional_alarm_actions: list[str]) -> None:
-        common_param = self.config["globals"]["alarm"]["default_alarm_params"]
+        return result
+
+    def verify_alarms(
+        self,
+        to_create: Iterable[Mapping[str, Any]],
+        to_delete: Iterable[str],
+        additional_alarm_actions: list[str],
+        result: UpdateResult,
+    ) -> VerificationResult:
+        """Verifies alarms updated exist as required, and alarms deleted no longer exist
+
+        Only the alarms touched are described by their names, in batches running concurrently.
+        Alarms failed or not tried in the update are excluded.
+
+        Args:
+            to_create (Iterable[Mapping[str, Any]]): alarms given to create
+            to_delete (Iterable[str]): alarms given to delete
+            additional_alarm_actions (list[str]): alarm actions for created alarms
+            result (UpdateResult): outcome of the update
+
+        Returns:
+            VerificationResult: outcome of the verification
+        """
+        common_param = self._get_common_alarm_params(additional_alarm_actions)
+        not_created = {f.alarm_param["AlarmName"] for f in result.failed_to_create}
+        not_created.update(alm["AlarmName"] for alm in result.not_created)
+        not_deleted = set(result.failed_to_delete + result.not_deleted)
+        # alarm names paired with the params to compare, or None for the alarms deleted
+        touched: Iterator[tuple[str, Optional[Mapping[str, Any]]]] = itertools.chain(
+            ((alm["AlarmName"], alm) for alm in to_create if alm["AlarmName"] not in not_created),
+            ((name, None) for name in to_delete if name not in not_deleted),
+        )
+
+        # DescribeAlarms has its own rate limit
+        rate_limiter = self._create_rate_limiter()
+        verification = VerificationResult()
+        lock = threading.Lock()
+
+        def _verify_batch(batch: list[tuple[str, Optional[Mapping[str, Any]]]]) -> None:
+            resp = self._call_api(
+                rate_limiter,
+                self.cloudwatch.describe_alarms,
+                AlarmNames=[name for name, _ in batch],
+                AlarmTypes=["MetricAlarm"],
+                MaxRecords=100,
+            )
+            found = {alm["AlarmName"]: alm for alm in resp["MetricAlarms"]}
+            with lock:
+                verification.verified += len(batch)
+                for name, alarm_param in batch:
+                    actual = found.get(name)
+                    if alarm_param is None:
+                        if actual is not None:
+                            verification.not_deleted.append(name)
+                    elif actual is None:
+                        verification.missing.append(name)
+                    elif not _matches({**common_param, **alarm_param}, actual):
+                        verification.different.append(name)
+
+        # up to 100 alarms per invocation, within a page. the alarms are read a batch at a time
+        chunk_size = 100
+        self._run_concurrently(_verify_batch, iter(lambda: list(itertools.islice(touched, chunk_size)), []))
+
+        return verification
+
+    def _get_common_alarm_params(self, additional_alarm_actions: list[str]) -> dict[str, Any]:
+        common_param = dict(self.config["globals"]["alarm"]["default_alarm_params"])
 
         # alarm actions
         alarm_notif_distinations = self.config["globals"]["alarm"]["alarm_actions"] + additional_alarm_actions
@@ -106,34 +532,370 @@ class AlarmHandler:
         if alarm_tagging:
             common_param["Tags"] = [{"Key": k, "Value": v} for k, v in alarm_tagging.items()]
 
-        # interval for API calls
-        interval = self._get_interval_in_sec()
+        return common_param
 
-        for alm in alarm_params:
-            alarm_param = common_param | alm
+    def _create_alarms(
+        self,
+        alarm_params: Iterable[Mapping[str, Any]],
+        additional_alarm_actions: list[str],
+        journal: Optional[ApplyJournal] = None,
+        deadline: Optional[Deadline] = None,
+        quota_gate: Optional[AlarmQuotaGate] = None,
+    ) -> tuple[list[CreateFailure], list[dict[str, Any]]]:
+        common_param = self._get_common_alarm_params(additional_alarm_actions)
+
+        # rate limit for API calls, shared among the workers
+        rate_limiter = self._create_rate_limiter()
+        failures: list[CreateFailure] = []
+
+        def _put_metric_alarm(alm: Mapping[str, Any]) -> None:
+            alarm_param = {**common_param, **alm}
+
+            if quota_gate:
+                quota_gate.acquire(alarm_param["AlarmName"])
 
             logger.debug("creating alarm:%s", alarm_param)
-            resp = self.cloudwatch.put_metric_alarm(**alarm_param)
-            respm = resp["ResponseMetadata"]
-            logger.debug(
-                f"status={respm['HTTPStatusCode']}, {respm['HTTPHeaders']}, {respm['RetryAttempts']} retries made."
+            try:
+                self._call_api(rate_limiter, self.cloudwatch.put_metric_alarm, **alarm_param)
+            except (ClientError, BotoCoreError) as e:
+                logger.warning("failed to create alarm %s: %s", alarm_param.get("AlarmName"), e)
+                failures.append(CreateFailure(alarm_param, str(e)))
+                if quota_gate:
+                    quota_gate.cancel(alarm_param["AlarmName"])
+                return
+
+            if journal:
+                journal.record_created(alarm_param["AlarmName"])
+
+        tracker = deadline.new_tracker() if deadline else None
+        not_tried = self._run_concurrently(_put_metric_alarm, alarm_params, tracker)
+        if not_tried:
+            logger.warning("%d alarms are not created before the deadline", len(not_tried))
+
+        return (failures, [{**common_param, **alm} for alm in not_tried])
+
+    def _delete_alarms(
+        self,
+        alarms_to_delete: list[str],
+        journal: Optional[ApplyJournal] = None,
+        deadline: Optional[Deadline] = None,
+        quota_gate: Optional[AlarmQuotaGate] = None,
+    ) -> tuple[list[DeleteBatchResult], list[str]]:
+        # DeleteAlarms has its own rate limit apart from PutMetricAlarm
+        rate_limiter = self._create_rate_limiter()
+        results: list[DeleteBatchResult] = []
+
+        def _delete_batch(alarm_names: list[str]) -> None:
+            logger.debug("deleting alarms:%s", alarm_names)
+            failed = self._delete_alarms_in_batch(rate_limiter, alarm_names)
+            if failed:
+                logger.warning("failed to delete %d of %d alarms: %s", len(failed), len(alarm_names), failed)
+            if journal and len(failed) < len(alarm_names):
+                journal.record_deleted([name for name in alarm_names if name not in failed])
+            if quota_gate:
+                quota_gate.release(len(alarm_names) - len(failed))
+            results.append(DeleteBatchResult(alarm_names, failed))
+
+        chunk_size = self.delete_batch_size
+        batches = (alarms_to_delete[i:end] for i, end in _chunk_ranges(len(alarms_to_delete), chunk_size))
+        tracker = deadline.new_tracker() if deadline else None
+        try:
+            not_tried = [name for batch in self._run_concurrently(_delete_batch, batches, tracker) for name in batch]
+        finally:
+            if quota_gate:
+                quota_gate.close()  # no more room is made
+        if not_tried:
+            logger.warning("%d alarms are not deleted before the deadline", len(not_tried))
+
+        return (results, not_tried)
+
+    def _delete_alarms_in_batch(self, rate_limiter: TokenBucket, alarm_names: list[str]) -> list[str]:
+        try:
+            self._call_api(rate_limiter, self.cloudwatch.delete_alarms, AlarmNames=alarm_names)
+            return []
+        except ClientError as e:
+            if not _is_alarm_specific(e) or len(alarm_names) == 1:
+                logger.debug("failed to delete alarms:%s, %s", alarm_names, e)
+                return alarm_names
+
+            # DeleteAlarms deletes nothing if any of the alarms fails. bisects the batch to find them
+            mid = len(alarm_names) // 2
+            return self._delete_alarms_in_batch(rate_limiter, alarm_names[:mid]) + self._delete_alarms_in_batch(
+                rate_limiter, alarm_names[mid:]
             )
-            if interval > 0:
-                sleep(interval)
+        except BotoCoreError as e:
+            # errors out of the API like connection failures and timeouts fail the whole batch
+            logger.debug("failed to delete alarms:%s, %s", alarm_names, e)
+            return alarm_names
 
-    def _delete_alarms(self, alarms_to_delete: list[str]) -> None:
-        # interval for API calls
-        interval = self._get_interval_in_sec()
+    def _call_api(self, rate_limiter: TokenBucket, api: Callable[..., Any], **kwargs: Any) -> Any:
+        rate_limiter.acquire()
+        try:
+            resp = api(**kwargs)
+        except ClientError as e:
+            if _is_throttling(e):
+                rate_limiter.on_throttled()
+            raise
 
-        # delete up to 100 alarms per invocation
-        chunk_size = 100
-        for i in range(0, len(alarms_to_delete), chunk_size):
-            end = i + chunk_size
-            self.cloudwatch.delete_alarms(AlarmNames=alarms_to_delete[i:end])
-            if interval > 0:
-                sleep(interval)
+        respm = resp["ResponseMetadata"]
+        logger.debug(
+            f"status={respm['HTTPStatusCode']}, {respm['HTTPHeaders']}, {respm['RetryAttempts']} retries made."
+        )
+        if respm["RetryAttempts"] > 0:
+            rate_limiter.on_throttled()
+        else:
+            rate_limiter.on_success()
+
+        return resp
+
+    def _run_concurrently(
+        self, func: Callable[[T], None], items: Iterable[T], tracker: Optional[LatencyTracker] = None
+    ) -> list[T]:
+        # submits items lazily, keeping up to `concurrency` calls in flight.
+        # returns the items not submitted as the tracker tells no time is left
+        def _timed(item: T) -> None:
+            started = monotonic()
+            func(item)
+            assert tracker
+            tracker.observe(monotonic() - started)
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            in_flight: set[Future[None]] = set()
+            item_iter = iter(items)
+            for item in item_iter:
+                if len(in_flight) >= self.concurrency:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for f in done:
+                        f.result()  # raises the error in the worker
+                if tracker and not tracker.allows_next():
+                    for f in in_flight:
+                        f.result()
+                    return [item, *item_iter]
+                in_flight.add(executor.submit(_timed if tracker else func, item))
+
+            for f in in_flight:
+                f.result()
+
+        return []
+
+    def _create_quota_gate(self) -> Optional[AlarmQuotaGate]:
+        quota = self.config["globals"].get("alarm_quota")
+        if not quota:
+            return None
+
+        # counts all the alarms in the account, not only the ones with the prefix
+        existing_alarm_names = [alm["AlarmName"] for alm in self._get_current_alarms(None)]
+        return AlarmQuotaGate(quota, existing_alarm_names)
+
+    def _create_rate_limiter(self) -> TokenBucket:
+        calls_per_sec = self._get_calls_per_sec()
+        if self.config["globals"].get("api_call_rate_control") == "adaptive":
+            return AdaptiveTokenBucket(calls_per_sec)
+        else:
+            return TokenBucket(calls_per_sec)
 
     def _get_interval_in_sec(self) -> float:
         interval = self.config["globals"]["api_call_intervals_in_millis"]
         assert isinstance(interval, int)
         return interval / 1000  # from milli-seconds to seconds
+
+    def _get_calls_per_sec(self) -> Optional[float]:
+        interval = self._get_interval_in_sec()
+        return 1 / interval if interval > 0 else None
+
+
+def _failed_alarm_names(delete_batches: Iterable[DeleteBatchResult]) -> list[str]:
+    return [name for batch in delete_batches for name in batch.failed_alarm_names]
+
+
+def _chunk_ranges(length: int, chunk_size: int) -> Iterable[tuple[int, int]]:
+    for i in range(0, length, chunk_size):
+        yield (i, min(i + chunk_size, length))
+
+
+def _is_throttling(e: ClientError) -> bool:
+    return e.response.get("Error", {}).get("Code") in THROTTLING_ERROR_CODES
+
+
+def _is_alarm_specific(e: ClientError) -> bool:
+    return e.response.get("Error", {}).get("Code") in ALARM_SPECIFIC_ERROR_CODES
+
+
+class _UnsortedAlarmsError(Exception):
+    """Existing alarms are not listed in name order"""
+
+
+class _MemoryLimitExceededError(Exception):
+    """Alarms held in memory exceed the limit"""
+
+
+def _metered_alarms(alarms: Iterable[Mapping[str, Any]], meter: Optional[MemoryMeter]) -> Iterator[Mapping[str, Any]]:
+    """Counts the existing alarms held in memory while iterating them
+
+    Args:
+        alarms (Iterable[Mapping[str, Any]]): `MetricAlarms` elements of DescribeAlarms API
+        meter (Optional[MemoryMeter]): meter of the memory, or None if unlimited
+
+    Yields:
+        Mapping[str, Any]: existing alarm
+
+    Raises:
+        _MemoryLimitExceededError: if the alarms exceed the limit
+    """
+    for alarm in alarms:
+        if meter and meter.add(alarm["AlarmName"], alarm.get("AlarmDescription", "")):
+            raise _MemoryLimitExceededError()
+        yield alarm
+
+
+def _is_drifted(alarm_param: Mapping[str, Any], current: Optional[str]) -> bool:
+    """Tells whether an existing alarm differs from the required one
+
+    Required alarms always embed the fingerprint in the description, so an existing alarm without it
+    is updated to embed it.
+
+    Args:
+        alarm_param (Mapping[str, Any]): required params of PutMetricAlarm API
+        current (Optional[str]): state of the existing alarm given by `_alarm_state()`
+
+    Returns:
+        bool: True if the alarm needs to update
+    """
+    return current is None or current != alarm_param["AlarmDescription"]
+
+
+def _alarm_state(alarm: Mapping[str, Any]) -> Optional[str]:
+    """Gets the state of an existing alarm to compare
+
+    Args:
+        alarm (Mapping[str, Any]): `MetricAlarms` element of DescribeAlarms API
+
+    Returns:
+        Optional[str]: the description if it has a fingerprint, or None
+    """
+    description: str = alarm.get("AlarmDescription", "")
+    return description if FINGERPRINT_PATTERN.search(description) else None
+
+
+def _fingerprint(alarm_param: Mapping[str, Any]) -> str:
+    """Computes a stable hash of the desired alarm
+
+    Args:
+        alarm_param (Mapping[str, Any]): desired params of PutMetricAlarm API
+
+    Returns:
+        str: fingerprint
+    """
+    normalized = _normalize_alarm(alarm_param)
+    del normalized["AlarmDescription"]
+    normalized["Tags"] = sorted((t["Key"], t["Value"]) for t in alarm_param.get("Tags", []))
+    serialized = json.dumps(normalized, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(serialized.encode()).hexdigest()[:16]
+
+
+class _AlarmTemplate:
+    """Formatters of the names, the descriptions and the fingerprints of the alarms differing only in dimensions
+
+    The fingerprint is serialized once with a placeholder of the dimensions, which is filled in for each alarm.
+    It gives the same fingerprint as `_fingerprint()`.
+    """
+
+    __slots__ = ("name_prefix", "name_suffix", "description_prefix", "serialized_head", "serialized_tail")
+
+    _DIMENSIONS_PLACEHOLDER = "\0dimensions\0"
+
+    def __init__(self, alarm_name_prefix: str, common_param: Mapping[str, Any], alarm_props: Mapping[str, Any]):
+        metric_name = alarm_props["MetricName"]
+        self.name_prefix = alarm_name_prefix
+        self.name_suffix = f"-{metric_name}"
+        self.description_prefix = f"Metric Alarm for `{metric_name}` of "
+
+        alarm_param = {**common_param, **alarm_props}
+        normalized = _normalize_alarm(alarm_param)
+        del normalized["AlarmDescription"]
+        normalized["Tags"] = sorted((t["Key"], t["Value"]) for t in alarm_param.get("Tags", []))
+        normalized["Dimensions"] = self._DIMENSIONS_PLACEHOLDER
+        serialized = json.dumps(normalized, sort_keys=True, separators=(",", ":"))
+        self.serialized_head, self.serialized_tail = serialized.split(json.dumps(self._DIMENSIONS_PLACEHOLDER))
+
+    def name(self, resource_name: str) -> str:
+        return self.name_prefix + resource_name + self.name_suffix
+
+    def description(self, resource_name: str, serialized_dimensions: str) -> str:
+        return f"{self.description_prefix}{resource_name} [fingerprint:{self.fingerprint(serialized_dimensions)}]"
+
+    def fingerprint(self, serialized_dimensions: str) -> str:
+        serialized = self.serialized_head + serialized_dimensions + self.serialized_tail
+        return hashlib.sha256(serialized.encode()).hexdigest()[:16]
+
+
+def _serialize_dimensions(dimensions: Iterable[Mapping[str, str]]) -> str:
+    """Serializes the dimensions as normalized in `_normalize_alarm()`
+
+    Args:
+        dimensions (Iterable[Mapping[str, str]]): alarm dimensions
+
+    Returns:
+        str: JSON of the dimensions
+    """
+    pairs = sorted((d["Name"], d["Value"]) for d in dimensions)
+    if all(_is_plain(n) and _is_plain(v) for n, v in pairs):
+        return "[" + ",".join(f'["{n}","{v}"]' for n, v in pairs) + "]"
+    return json.dumps(pairs, separators=(",", ":"))
+
+
+def _is_plain(text: str) -> bool:
+    # serialized as is in JSON
+    return text.isascii() and text.isprintable() and '"' not in text and "\\" not in text
+
+
+def _template_key(alarm_props: Mapping[str, Any]) -> Any:
+    """Gets the key of the alarm properties but the dimensions
+
+    Args:
+        alarm_props (Mapping[str, Any]): alarm properties
+
+    Returns:
+        Any: hashable key
+    """
+    key = tuple((k, v) for k, v in alarm_props.items() if k != "Dimensions")
+    try:
+        hash(key)
+        return key
+    except TypeError:
+        # properties of lists or dicts
+        return repr(key)
+
+
+def _matches(alarm_param: Mapping[str, Any], alarm: Mapping[str, Any]) -> bool:
+    """Compares the required alarm with an existing one on the properties given
+
+    Args:
+        alarm_param (Mapping[str, Any]): params of PutMetricAlarm API
+        alarm (Mapping[str, Any]): `MetricAlarms` element of DescribeAlarms API
+
+    Returns:
+        bool: True if they match
+    """
+    required = _normalize_alarm(alarm_param)
+    actual = _normalize_alarm(alarm)
+    return all(required[k] == actual[k] for k in DRIFT_CHECK_KEYS if k in alarm_param)
+
+
+def _normalize_alarm(alarm: Mapping[str, Any]) -> dict[str, Any]:
+    """Normalizes alarm properties to compare a required alarm with an existing one
+
+    Args:
+        alarm (Mapping[str, Any]): alarm properties, or a `MetricAlarms` element of DescribeAlarms API
+
+    Returns:
+        dict[str, Any]: normalized alarm properties
+    """
+    normalized = {k: alarm.get(k) for k in DRIFT_CHECK_KEYS}
+    normalized["Dimensions"] = sorted((d["Name"], d["Value"]) for d in alarm.get("Dimensions", []))
+    for k in ["AlarmActions", "OKActions", "InsufficientDataActions"]:
+        normalized[k] = sorted(alarm.get(k, []))
+    if normalized["Threshold"] is not None:
+        normalized["Threshold"] = float(normalized["Threshold"])  # DescribeAlarms returns a float
+
+    return normalized
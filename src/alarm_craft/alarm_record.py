@@ -0,0 +1,225 @@
+import json
+import sys
+from collections.abc import Mapping
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Iterator, Optional
+
+# dimensions and overrides shared among the records are pooled up to this number
+SHARED_POOL_SIZE = 1 << 16
+
+# dimensions as pairs of the name and the value
+Dimensions = tuple[tuple[str, str], ...]
+
+# properties held in the fields of a record. the others are the overrides shared among the records
+FIELD_KEYS = frozenset(["AlarmName", "AlarmDescription", "Namespace", "MetricName", "Dimensions"])
+
+_NO_OVERRIDES: Mapping[str, Any] = MappingProxyType({})
+
+
+class AlarmRecord(Mapping[str, Any]):
+    """Immutable record of a required alarm, read as the params of PutMetricAlarm API
+
+    Namespaces and metric names are interned, and the dimensions and the other properties are frozen objects
+    shared among the records. The params are built only when the record is read as a mapping,
+    like `{**common_param, **record}` at send time.
+    """
+
+    __slots__ = ("name", "description", "namespace", "metric_name", "dimensions", "overrides", "priority")
+
+    name: str
+    description: str
+    namespace: Optional[str]
+    metric_name: Optional[str]
+    dimensions: Optional[Dimensions]
+    overrides: Mapping[str, Any]
+    priority: int
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        namespace: Optional[str],
+        metric_name: Optional[str],
+        dimensions: Optional[Dimensions],
+        overrides: Mapping[str, Any] = _NO_OVERRIDES,
+        priority: int = 0,
+    ) -> None:
+        """Constructor
+
+        Args:
+            name (str): alarm name
+            description (str): alarm description
+            namespace (Optional[str]): metric namespace
+            metric_name (Optional[str]): metric name
+            dimensions (Optional[Dimensions]): metric dimensions
+            overrides (Mapping[str, Any]): other params of PutMetricAlarm API
+            priority (int): priority of the target resource
+        """
+        init = object.__setattr__
+        init(self, "name", name)
+        init(self, "description", description)
+        init(self, "namespace", namespace)
+        init(self, "metric_name", metric_name)
+        init(self, "dimensions", dimensions)
+        init(self, "overrides", overrides)
+        init(self, "priority", priority)
+
+    @classmethod
+    def from_props(
+        cls,
+        props: Mapping[str, Any],
+        name: Optional[str] = None,
+        description: Optional[str] = None,
+        priority: int = 0,
+    ) -> "AlarmRecord":
+        """Creates the record of alarm properties
+
+        Args:
+            props (Mapping[str, Any]): params of PutMetricAlarm API
+            name (Optional[str]): alarm name, instead of the one in the props
+            description (Optional[str]): alarm description, instead of the one in the props
+            priority (int): priority of the target resource
+
+        Returns:
+            AlarmRecord: record
+        """
+        namespace = props.get("Namespace")
+        metric_name = props.get("MetricName")
+        dimensions = props.get("Dimensions")
+        overrides = {k: v for k, v in props.items() if k not in FIELD_KEYS}
+        return cls(
+            name if name is not None else props["AlarmName"],
+            description if description is not None else props["AlarmDescription"],
+            sys.intern(namespace) if namespace is not None else None,
+            sys.intern(metric_name) if metric_name is not None else None,
+            _shared_dimensions(tuple((d["Name"], d["Value"]) for d in dimensions)) if dimensions is not None else None,
+            _get_shared_overrides(overrides) if overrides else _NO_OVERRIDES,
+            priority,
+        )
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Rejects updating the record
+
+        Raises:
+            AttributeError: always
+        """
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __getitem__(self, key: str) -> Any:
+        """Gets a param of PutMetricAlarm API
+
+        Args:
+            key (str): param name
+
+        Returns:
+            Any: param value
+
+        Raises:
+            KeyError: if the record has no such param
+        """
+        if key == "AlarmName":
+            return self.name
+        if key == "AlarmDescription":
+            return self.description
+        if key in FIELD_KEYS:
+            for k, v in self._field_items():
+                if k == key:
+                    return v
+            raise KeyError(key)
+        return self.overrides[key]
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterates the param names
+
+        Returns:
+            Iterator[str]: param names
+        """
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        """Number of the params
+
+        Returns:
+            int: number of the params
+        """
+        return len(self._keys())
+
+    def __ror__(self, other: Mapping[str, Any]) -> dict[str, Any]:
+        """Merges the record into a dict of the params like `common_param | record`
+
+        Args:
+            other (Mapping[str, Any]): params to merge into
+
+        Returns:
+            dict[str, Any]: merged params
+        """
+        return {**other, **self.to_dict()}
+
+    def __repr__(self) -> str:
+        """Representation as the params
+
+        Returns:
+            str: representation
+        """
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def to_dict(self) -> dict[str, Any]:
+        """Builds the params of PutMetricAlarm API
+
+        Returns:
+            dict[str, Any]: params
+        """
+        params = dict(self._field_items())
+        params.update(self.overrides)
+        params["AlarmName"] = self.name
+        params["AlarmDescription"] = self.description
+        return params
+
+    def _field_items(self) -> Iterator[tuple[str, Any]]:
+        if self.metric_name is not None:
+            yield "MetricName", self.metric_name
+        if self.namespace is not None:
+            yield "Namespace", self.namespace
+        if self.dimensions is not None:
+            yield "Dimensions", [{"Name": n, "Value": v} for n, v in self.dimensions]
+
+    def _keys(self) -> list[str]:
+        keys = [
+            k
+            for k, v in [
+                ("MetricName", self.metric_name),
+                ("Namespace", self.namespace),
+                ("Dimensions", self.dimensions),
+            ]
+            if v is not None
+        ]
+        keys.extend(self.overrides)
+        keys.extend(["AlarmName", "AlarmDescription"])
+        return keys
+
+
+@lru_cache(maxsize=SHARED_POOL_SIZE)
+def _shared_dimensions(dimensions: Dimensions) -> Dimensions:
+    # equal dimensions resolve to the same tuple
+    return tuple((sys.intern(n), v) for n, v in dimensions)
+
+
+def _get_shared_overrides(overrides: dict[str, Any]) -> Mapping[str, Any]:
+    # equal overrides resolve to the same read-only mapping
+    items = tuple(sorted(overrides.items()))
+    try:
+        return _shared_overrides(items)
+    except TypeError:
+        # overrides of lists or dicts
+        return _shared_serialized_overrides(json.dumps(overrides, sort_keys=True))
+
+
+@lru_cache(maxsize=SHARED_POOL_SIZE)
+def _shared_overrides(items: tuple[tuple[str, Any], ...]) -> Mapping[str, Any]:
+    return MappingProxyType(dict(items))
+
+
+@lru_cache(maxsize=SHARED_POOL_SIZE)
+def _shared_serialized_overrides(serialized: str) -> Mapping[str, Any]:
+    return MappingProxyType(json.loads(serialized))
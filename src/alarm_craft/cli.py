@@ -3,6 +3,7 @@ import logging
 import os
 
 from . import core
+from .alarm import DIFF_MODES
 
 
 def run() -> None:
@@ -19,7 +20,19 @@ def run() -> None:
     )
     argparser.add_argument("-c", "--config-file")
     argparser.add_argument("-u", "--update-existing-alarms", action="store_true", dest="update_existing_alarms")
+    argparser.add_argument("--concurrency", type=int, dest="concurrency", default=1)
+    argparser.add_argument("--dead-letter-file", type=str, dest="dead_letter_file")
+    argparser.add_argument("--replay-dead-letter", type=str, dest="replay_dead_letter_file")
+    argparser.add_argument("--journal-file", type=str, dest="journal_file")
+    argparser.add_argument("--resume", action="store_true", dest="resume")
+    argparser.add_argument("--deadline", type=float, dest="deadline_in_sec")
+    argparser.add_argument("--verify", action="store_true", dest="verify")
+    argparser.add_argument("--invalidate-discovery-cache", action="store_true", dest="invalidate_discovery_cache")
+    argparser.add_argument("--diff-mode", choices=DIFF_MODES, dest="diff_mode", default="hash")
+    argparser.add_argument("--memory-limit-mb", type=float, dest="memory_limit_in_mb")
     args = argparser.parse_args(namespace=opts)
+    if args.resume and not args.journal_file:
+        argparser.error("--resume requires --journal-file")
 
     logger.debug("commandline opts:%s", opts)
 
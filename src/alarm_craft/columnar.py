@@ -0,0 +1,229 @@
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, Mapping, Optional, Sequence, Union, overload
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError("the columnar diff mode requires numpy. install it by `pip install alarm-craft[columnar]`") from e
+
+from .alarm_record import AlarmRecord
+
+
+@dataclass
+class AlarmTable:
+    """Columnar table of the required alarms
+
+    Fields of the i-th alarm are held in the i-th elements of the parallel arrays, and the other properties
+    in a profile shared among the alarms. Records, and the params of PutMetricAlarm API in turn, are built back
+    from the rows only when they're read at apply time.
+    """
+
+    names: "np.ndarray"
+    descriptions: "np.ndarray"
+    namespaces: "np.ndarray"
+    metrics: "np.ndarray"
+    dimensions: "np.ndarray"
+    priorities: "np.ndarray"
+    profile_ids: "np.ndarray"
+    profiles: list[Mapping[str, Any]]
+
+    @classmethod
+    def from_alarms(cls, alarms: Sequence[AlarmRecord]) -> "AlarmTable":
+        """Builds the table of the alarms
+
+        Only the fields of the records are read, without building the params of PutMetricAlarm API.
+        The overrides shared among the records are the profiles.
+
+        Args:
+            alarms (Sequence[AlarmRecord]): required alarms
+
+        Returns:
+            AlarmTable: columnar table
+        """
+        profiles: list[Mapping[str, Any]] = []
+        profile_index: dict[int, int] = {}
+        profile_ids = np.empty(len(alarms), dtype=np.int32)
+        for row, alarm in enumerate(alarms):
+            profile_id = profile_index.get(id(alarm.overrides))
+            if profile_id is None:
+                # the profile is held by the list, so its id isn't reused while indexed
+                profile_id = profile_index[id(alarm.overrides)] = len(profiles)
+                profiles.append(alarm.overrides)
+            profile_ids[row] = profile_id
+
+        return cls(
+            names=_object_array([alarm.name for alarm in alarms]),
+            descriptions=_object_array([alarm.description for alarm in alarms]),
+            namespaces=_object_array([alarm.namespace for alarm in alarms]),
+            metrics=_object_array([alarm.metric_name for alarm in alarms]),
+            dimensions=_object_array([alarm.dimensions for alarm in alarms]),
+            priorities=np.array([alarm.priority for alarm in alarms], dtype=np.int64),
+            profile_ids=profile_ids,
+            profiles=profiles,
+        )
+
+    def __len__(self) -> int:
+        """Number of the alarms
+
+        Returns:
+            int: number of the rows
+        """
+        return len(self.names)
+
+    def record(self, row: int) -> AlarmRecord:
+        """Builds the record of a row
+
+        Args:
+            row (int): row of the alarm
+
+        Returns:
+            AlarmRecord: record
+        """
+        return AlarmRecord(
+            self.names[row],
+            self.descriptions[row],
+            self.namespaces[row],
+            self.metrics[row],
+            self.dimensions[row],
+            self.profiles[self.profile_ids[row]],
+            int(self.priorities[row]),
+        )
+
+    def rows(self, rows: Optional["np.ndarray"] = None) -> "AlarmRows":
+        """Gets a list of the rows
+
+        Args:
+            rows (Optional[np.ndarray]): rows in the order of the list, all the rows if not given
+
+        Returns:
+            AlarmRows: list of the records built from the rows
+        """
+        return AlarmRows(self, rows if rows is not None else np.arange(len(self)))
+
+
+class AlarmRows(Sequence[AlarmRecord]):
+    """List of the alarms in a change set, built from the rows of the table on demand"""
+
+    def __init__(self, table: AlarmTable, rows: "np.ndarray") -> None:
+        """Constructor
+
+        Args:
+            table (AlarmTable): table of the alarms
+            rows (np.ndarray): rows of the alarms in the list
+        """
+        self.table = table
+        self.rows = rows
+
+    @overload
+    def __getitem__(self, index: int) -> AlarmRecord: ...  # noqa: D105, E704
+
+    @overload
+    def __getitem__(self, index: slice) -> Sequence[AlarmRecord]: ...  # noqa: D105, E704
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[AlarmRecord, Sequence[AlarmRecord]]:
+        """Gets the alarm(s) at the position
+
+        Args:
+            index (Union[int, slice]): position
+
+        Returns:
+            Union[AlarmRecord, Sequence[AlarmRecord]]: alarm, or a list of the alarms for a slice
+
+        Raises:
+            IndexError: if the position is out of range
+        """
+        if isinstance(index, slice):
+            return AlarmRows(self.table, self.rows[index])
+        return self.table.record(self.rows[index])
+
+    def __iter__(self) -> Iterator[AlarmRecord]:
+        """Iterates the alarms in order
+
+        Yields:
+            AlarmRecord: alarm
+        """
+        for row in self.rows.tolist():
+            yield self.table.record(row)
+
+    def __len__(self) -> int:
+        """Number of the alarms
+
+        Returns:
+            int: number of the alarms
+        """
+        return len(self.rows)
+
+
+@dataclass
+class ColumnarDiff:
+    """Change set computed on the columns
+
+    Rows of the table are in ascending order, which is the order of the required alarms.
+    """
+
+    created: "np.ndarray"
+    updated: "np.ndarray"
+    kept: "np.ndarray"
+    # positions of the existing alarms to delete
+    deleted: "np.ndarray"
+
+
+def diff(
+    table: AlarmTable, current_names: Sequence[str], current_descriptions: Sequence[Optional[str]]
+) -> ColumnarDiff:
+    """Computes the change set with vectorized operations
+
+    Existing alarms are looked up by `searchsorted` on their sorted names and the required alarms the other way,
+    and compared by the descriptions embedding the fingerprints. Those without fingerprints are to update.
+
+    Args:
+        table (AlarmTable): required alarms
+        current_names (Sequence[str]): names of the existing alarms
+        current_descriptions (Sequence[Optional[str]]): descriptions of the existing alarms with fingerprints,
+                                                        or None for those without
+
+    Returns:
+        ColumnarDiff: change set
+    """
+    names = _object_array(current_names)
+    descriptions = _object_array(current_descriptions)
+    rows = np.arange(len(table))
+    empty = np.array([], dtype=np.intp)
+
+    if len(names) == 0:
+        return ColumnarDiff(rows, empty, empty, empty)
+    if len(table) == 0:
+        return ColumnarDiff(empty, empty, empty, np.arange(len(names)))
+
+    found, current_of_row = _lookup(names, table.names)
+    matched = rows[found]
+    matched_current = current_of_row[found]
+    # None, the state of the alarms without fingerprints, equals no description
+    same = descriptions[matched_current] == table.descriptions[matched]
+
+    required_found, _ = _lookup(table.names, names)
+
+    return ColumnarDiff(
+        created=rows[~found],
+        updated=matched[~same],
+        kept=matched[same],
+        deleted=np.flatnonzero(~required_found),
+    )
+
+
+def _lookup(names: "np.ndarray", keys: "np.ndarray") -> tuple["np.ndarray", "np.ndarray"]:
+    # whether each key is in the names, and the position of the name equal to it
+    order = np.argsort(names, kind="stable")
+    sorted_names = names[order]
+    pos = np.minimum(np.searchsorted(sorted_names, keys), len(names) - 1)
+    return sorted_names[pos] == keys, order[pos]
+
+
+def _object_array(values: Iterable[Any]) -> "np.ndarray":
+    # elements are the objects shared with the records, like the strings and the tuples of the dimensions,
+    # instead of the copies in fixed width unicode
+    values = list(values)
+    array = np.empty(len(values), dtype=object)
+    for i, v in enumerate(values):
+        array[i] = v
+    return array
@@ -1,6 +1,6 @@
 import json
 from os import path
-from typing import Dict, List, Literal, Optional, TypedDict, Union
+from typing import Any, Dict, List, Literal, Optional, TypedDict, Union
 
 import jsonschema
 import yaml
@@ -90,6 +90,16 @@ def _merge_configs(config: ConfigValue) -> ConfigValue:
     resources = config["resources"]
     for key in resources:  # type: ignore
         resource_config = _merge_dicts(glo_resource_filter, resources[key])  # type: ignore
+        name_pattern = resources[key].get("target_resource_name_pattern")  # type: ignore
+        if name_pattern:
+            # patterns to include are overridden, not merged as a list
+            resource_config["target_resource_name_pattern"] = name_pattern
+        global_exclude_pattern = glo_resource_filter.get("target_resource_name_exclude_pattern")  # type: ignore
+        exclude_pattern = resources[key].get("target_resource_name_exclude_pattern")  # type: ignore
+        exclude_patterns = _as_list(global_exclude_pattern) + _as_list(exclude_pattern)
+        if exclude_patterns:
+            # patterns to exclude are merged, given as either a string or a list
+            resource_config["target_resource_name_exclude_pattern"] = exclude_patterns
 
         merged[key] = resource_config
 
@@ -106,6 +116,7 @@ DEFAULT_ALARM_PARAMS: ConfigValue = {
     "TreatMissingData": "notBreaching",
 }
 DEFAULT_API_CALL_INTERVAL = 334
+DEFAULT_API_CALL_RATE_CONTROL = "fixed"
 
 
 def default_global_config() -> ConfigValue:
@@ -122,9 +133,16 @@ def default_global_config() -> ConfigValue:
         },
         "resource_filter": {},
         "api_call_intervals_in_millis": DEFAULT_API_CALL_INTERVAL,
+        "api_call_rate_control": DEFAULT_API_CALL_RATE_CONTROL,
     }
 
 
+def _as_list(value: Any) -> ConfigList:
+    if not value:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
 def _merge_dicts(conf1: dict, conf2: dict) -> ConfigValue:
     ret = conf1.copy()
     for k, v2 in conf2.items():
@@ -1,12 +1,14 @@
 import itertools
+import json
 import logging
 from dataclasses import dataclass
-from typing import Iterable, Optional
+from typing import Any, Iterable, Iterator, Mapping, Optional, Sequence, Union, overload
 
-from . import config_loader
-from .alarm import AlarmHandler
-from .models import AlarmProps
-from .monitoring_targets import get_target_metrics
+from . import config_loader, dead_letter
+from .alarm import AlarmHandler, UpdateResult, VerificationResult
+from .deadline import Deadline
+from .journal import ApplyJournal
+from .monitoring_targets import discovery_cache, get_target_metrics
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +21,16 @@ class CommandOpts:
     config_file: Optional[str]
     notification_topic_arn: list[str]
     update_existing_alarms: bool
+    concurrency: int = 1
+    dead_letter_file: Optional[str] = None
+    replay_dead_letter_file: Optional[str] = None
+    journal_file: Optional[str] = None
+    resume: bool = False
+    deadline_in_sec: Optional[float] = None
+    verify: bool = False
+    invalidate_discovery_cache: bool = False
+    diff_mode: str = "hash"
+    memory_limit_in_mb: Optional[float] = None
 
 
 def main(opts: CommandOpts) -> None:
@@ -27,36 +39,112 @@ def main(opts: CommandOpts) -> None:
     Args:
         opts (CommandOpts): command options
     """
+    # the deadline counts from the start, including the discovery
+    deadline = Deadline(opts.deadline_in_sec) if opts.deadline_in_sec else None
     config = config_loader.load(opts.config_file)
-    target_metrics = list(get_target_metrics(config))
-
-    alarm_handler = AlarmHandler(config)
-    (create, keep, delete) = alarm_handler.get_alarms_change_set(target_metrics)
-    _print_chagne_set(create, keep, delete, opts.update_existing_alarms)
-
-    if create or delete or (keep and opts.update_existing_alarms):
+    alarm_handler = AlarmHandler(config, opts.concurrency)
+
+    journal = ApplyJournal(opts.journal_file) if opts.journal_file else None
+    unfinished_plan = journal.load_unfinished_plan() if journal and opts.resume else None
+
+    create: Sequence[Mapping[str, Any]]
+    update: Sequence[Mapping[str, Any]]
+    keep: Sequence[Mapping[str, Any]]
+    if unfinished_plan:
+        # resumes the plan interrupted without discovering resources
+        _print("resuming the unfinished plan in " + str(opts.journal_file))
+        create, delete = unfinished_plan
+        update, keep = [], []
+    elif opts.replay_dead_letter_file:
+        # replays alarms in the dead-letter file without discovering resources
+        create, delete = dead_letter.load(opts.replay_dead_letter_file)
+        update, keep = [], []
+    else:
+        cache = discovery_cache.from_config(config)
+        if cache and opts.invalidate_discovery_cache:
+            num_entries = cache.invalidate()
+            logger.info("%d entries of the discovery cache are invalidated", num_entries)
+        # streamed to the change set, to be spilled to disk over the memory limit
+        target_metrics = get_target_metrics(config)
+        create, update, keep, delete = alarm_handler.get_alarms_change_set(
+            target_metrics, opts.notification_topic_arn, opts.diff_mode, opts.memory_limit_in_mb
+        )
+
+    _print_chagne_set(create, update, keep, delete, opts.update_existing_alarms)
+
+    if create or delete or (update and opts.update_existing_alarms):
         force_update = not opts.confirm_changeset
         if force_update or _prompt_update():
             _print("!!! UPDATE ALARMS !!!")
-            if opts.update_existing_alarms:
-                alarm_handler.update_alarms(itertools.chain(create, keep), delete, opts.notification_topic_arn)
-            else:
-                alarm_handler.update_alarms(create, delete, opts.notification_topic_arn)
+            # concatenated without reading the alarms, which may be spilled to disk
+            to_apply = _ChainedAlarms(create, update) if opts.update_existing_alarms else create
+            result = alarm_handler.update_alarms(to_apply, delete, opts.notification_topic_arn, journal, deadline)
+
+            _report_failures(result, opts.dead_letter_file)
+            if opts.verify:
+                verification = alarm_handler.verify_alarms(to_apply, delete, opts.notification_topic_arn, result)
+                _report_verification(verification)
+            if deadline:
+                _print_summary(result)
         else:
             _print("no updates executed..")
     else:
         _print("all required alarms already exist. no updates executed")
 
 
+def _report_failures(result: UpdateResult, dead_letter_file: Optional[str]) -> None:
+    for failure in result.failed_to_create:
+        _print(f"! failed to create {failure.alarm_param['AlarmName']}: {failure.error}")
+    for name in result.failed_to_delete:
+        _print("! failed to delete " + name)
+
+    if dead_letter_file:
+        num_failures = dead_letter.write(dead_letter_file, result)
+        if num_failures > 0:
+            _print(f"{num_failures} alarm(s) failed to update are written to {dead_letter_file}")
+
+
+def _report_verification(verification: VerificationResult) -> None:
+    for name in verification.missing:
+        _print("! missing " + name)
+    for name in verification.different:
+        _print("! different " + name)
+    for name in verification.not_deleted:
+        _print("! not deleted " + name)
+
+    num_problems = len(verification.missing) + len(verification.different) + len(verification.not_deleted)
+    _print(f"verified {verification.verified} alarm(s). {num_problems} problem(s) found")
+
+
+def _print_summary(result: UpdateResult) -> None:
+    # a single line in JSON for the scheduler to pick up the rest
+    summary = {
+        "Completed": not result.not_created and not result.not_deleted,
+        "RemainingToCreate": [alm["AlarmName"] for alm in result.not_created],
+        "RemainingToDelete": result.not_deleted,
+        "FailedToCreate": [f.alarm_param["AlarmName"] for f in result.failed_to_create],
+        "FailedToDelete": result.failed_to_delete,
+    }
+    _print(json.dumps(summary))
+
+
 def _print_chagne_set(
-    to_create: Iterable[AlarmProps], no_update: Iterable[AlarmProps], to_delete: list[str], anyway_update: bool
+    to_create: Iterable[Mapping[str, Any]],
+    to_update: Iterable[Mapping[str, Any]],
+    no_update: Iterable[Mapping[str, Any]],
+    to_delete: list[str],
+    anyway_update: bool,
 ) -> None:
     adding_label = "+ "
-    exists_label = "  " if not anyway_update else "U "
+    # drifted alarms are marked even when they're left as they are
+    update_label = "~ " if not anyway_update else "U "
+    exists_label = "  "
     delete_label = "- "
 
     for a in to_create:
         _print(adding_label + a["AlarmName"])
+    for a in to_update:
+        _print(update_label + a["AlarmName"])
     for a in no_update:
         _print(exists_label + a["AlarmName"])
     for s in to_delete:
@@ -70,3 +158,34 @@ def _print(text: str) -> None:
 def _prompt_update() -> bool:
     ans = input("execute updating above alarms ? [y/n]:") == "y"
     return ans
+
+
+class _ChainedAlarms(Sequence[Mapping[str, Any]]):
+    # alarms of the lists one after another, read from the lists on demand
+
+    def __init__(self, *lists: Sequence[Mapping[str, Any]]) -> None:
+        self.lists = lists
+
+    @overload
+    def __getitem__(self, index: int) -> Mapping[str, Any]: ...  # noqa: D105, E704
+
+    @overload
+    def __getitem__(self, index: slice) -> Sequence[Mapping[str, Any]]: ...  # noqa: D105, E704
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Mapping[str, Any], Sequence[Mapping[str, Any]]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        pos = index + len(self) if index < 0 else index
+        if pos >= 0:
+            for alarms in self.lists:
+                if pos < len(alarms):
+                    return alarms[pos]
+                pos -= len(alarms)
+        raise IndexError(index)
+
+    def __iter__(self) -> Iterator[Mapping[str, Any]]:
+        return itertools.chain.from_iterable(self.lists)
+
+    def __len__(self) -> int:
+        return sum(len(alarms) for alarms in self.lists)
@@ -0,0 +1,51 @@
+import json
+from typing import Any
+
+from .alarm import UpdateResult
+
+
+def write(file_path: str, result: UpdateResult) -> int:
+    """Writes alarms failed to update into a dead-letter file in JSON Lines
+
+    Args:
+        file_path (str): file path of the dead-letter file
+        result (UpdateResult): outcome of updating alarms
+
+    Returns:
+        int: number of the alarms written
+    """
+    with open(file_path, "w") as f:
+        for failure in result.failed_to_create:
+            entry = {"Operation": "create", "AlarmParam": failure.alarm_param, "Error": failure.error}
+            f.write(json.dumps(entry) + "\n")
+        for name in result.failed_to_delete:
+            f.write(json.dumps({"Operation": "delete", "AlarmName": name}) + "\n")
+
+    return len(result.failed_to_create) + len(result.failed_to_delete)
+
+
+def load(file_path: str) -> tuple[list[dict[str, Any]], list[str]]:
+    """Loads alarms to replay from a dead-letter file
+
+    Args:
+        file_path (str): file path of the dead-letter file
+
+    Returns:
+        tuple[list[dict[str, Any]], list[str]]: a tuple of alarms to create and alarms to delete
+    """
+    to_create = []
+    to_delete = []
+    with open(file_path, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+
+            entry = json.loads(line)
+            if entry["Operation"] == "create":
+                to_create.append(entry["AlarmParam"])
+            elif entry["Operation"] == "delete":
+                to_delete.append(entry["AlarmName"])
+            else:
+                raise ValueError(f"unknown operation in the dead-letter file: {entry['Operation']}")
+
+    return (to_create, to_delete)
@@ -0,0 +1,74 @@
+import threading
+from time import monotonic
+from typing import Optional
+
+
+class Deadline:
+    """Wall-clock deadline of a run"""
+
+    def __init__(self, seconds: float) -> None:
+        """Constructor
+
+        Args:
+            seconds (float): seconds from now until the deadline
+        """
+        self.expires_at = monotonic() + seconds
+
+    def remaining(self) -> float:
+        """Gets the time remaining until the deadline
+
+        Returns:
+            float: seconds remaining, negative after the deadline
+        """
+        return self.expires_at - monotonic()
+
+    def new_tracker(self) -> "LatencyTracker":
+        """Creates a tracker of the latency of a kind of work
+
+        Returns:
+            LatencyTracker: tracker
+        """
+        return LatencyTracker(self)
+
+
+class LatencyTracker:
+    """Tracker of the latency measured per work, which tells whether another work finishes before the deadline
+
+    The latency is estimated by the exponentially weighted moving average, shared among worker threads.
+    """
+
+    def __init__(self, deadline: Deadline, smoothing: float = 0.2, safety_factor: float = 2.0) -> None:
+        """Constructor
+
+        Args:
+            deadline (Deadline): deadline
+            smoothing (float): weight of the latest measurement in the average
+            safety_factor (float): factor multiplied to the estimated latency for its variance
+        """
+        self.deadline = deadline
+        self.smoothing = smoothing
+        self.safety_factor = safety_factor
+        self.estimated_latency: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def observe(self, latency: float) -> None:
+        """Measures the latency of a work done
+
+        Args:
+            latency (float): seconds taken for the work
+        """
+        with self._lock:
+            if self.estimated_latency is None:
+                self.estimated_latency = latency
+            else:
+                self.estimated_latency += self.smoothing * (latency - self.estimated_latency)
+
+    def allows_next(self) -> bool:
+        """Tells whether a work started now is expected to finish before the deadline
+
+        Returns:
+            bool: True if the work can be started
+        """
+        # no measurement yet. the first work is started as long as the deadline hasn't passed
+        estimated = self.estimated_latency or 0.0
+        return estimated * self.safety_factor < self.deadline.remaining()
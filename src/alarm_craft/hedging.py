@@ -0,0 +1,127 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Mapping, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_PERCENTILE = 95.0
+DEFAULT_MAX_EXTRA_RATIO = 0.1
+# latencies needed before hedging, and kept to take the percentile of
+MIN_SAMPLES = 10
+LATENCY_WINDOW = 200
+MAX_HEDGE_WORKERS = 16
+
+
+class RequestHedger:
+    """Hedger of idempotent read calls
+
+    A call not returned by the percentile of the latencies observed so far is sent again,
+    and the response arriving first is used. The extra calls are capped at a ratio of all the calls.
+    """
+
+    def __init__(
+        self, percentile: float = DEFAULT_PERCENTILE, max_extra_ratio: float = DEFAULT_MAX_EXTRA_RATIO
+    ) -> None:
+        """Constructor
+
+        Args:
+            percentile (float): percentile of the latencies to wait for before sending the duplicate
+            max_extra_ratio (float): max ratio of the duplicate calls to all the calls
+        """
+        self.percentile = percentile
+        self.max_extra_ratio = max_extra_ratio
+        self.calls = 0
+        self.hedged_calls = 0
+        self._latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def call(self, func: Callable[[], T]) -> T:
+        """Calls the function, hedging it when it's slow
+
+        Args:
+            func (Callable[[], T]): idempotent function to call
+
+        Returns:
+            T: result of the call returned first
+        """
+        with self._lock:
+            self.calls += 1
+        delay = self.hedge_delay()
+        if delay is None:
+            return self._timed(func)()
+
+        executor = self._get_executor()
+        primary = executor.submit(self._timed(func))
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._take_extra_call():
+            return primary.result()
+
+        logger.debug("hedged a call not returned in %.3f sec", delay)
+        pending: set[Future[T]] = {primary, executor.submit(self._timed(func))}
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                # an error is raised only when no other call is left
+                if f.exception() is None or not pending:
+                    return f.result()
+
+    def hedge_delay(self) -> Optional[float]:
+        """Gets the seconds to wait before sending the duplicate
+
+        Returns:
+            Optional[float]: percentile of the latencies, or None if not enough latencies are observed
+        """
+        with self._lock:
+            if len(self._latencies) < MIN_SAMPLES:
+                return None
+            latencies = sorted(self._latencies)
+        index = min(int(len(latencies) * self.percentile / 100), len(latencies) - 1)
+        return latencies[index]
+
+    def _take_extra_call(self) -> bool:
+        with self._lock:
+            if self.hedged_calls + 1 > self.calls * self.max_extra_ratio:
+                return False
+            self.hedged_calls += 1
+            return True
+
+    def _timed(self, func: Callable[[], T]) -> Callable[[], T]:
+        def _call() -> T:
+            start = time.monotonic()
+            result = func()
+            with self._lock:
+                self._latencies.append(time.monotonic() - start)
+            return result
+
+        return _call
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=MAX_HEDGE_WORKERS, thread_name_prefix="hedge")
+            return self._executor
+
+
+def from_config(config: Mapping[str, Any]) -> Optional[RequestHedger]:
+    """Creates the request hedger if it's configured
+
+    Args:
+        config (Mapping[str, Any]): config dict
+
+    Returns:
+        Optional[RequestHedger]: request hedger, or None if not configured
+    """
+    hedging_config = config.get("globals", {}).get("request_hedging")
+    if hedging_config is None:
+        return None
+
+    return RequestHedger(
+        hedging_config.get("percentile", DEFAULT_PERCENTILE),
+        hedging_config.get("max_extra_ratio", DEFAULT_MAX_EXTRA_RATIO),
+    )
@@ -0,0 +1,175 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import IO, Any, Iterable, Iterator, Mapping, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+class ApplyJournal:
+    """Append-only journal of the operations applied
+
+    The journal is a file in JSON Lines. A `plan` record holds the alarms to create and to delete,
+    and is followed by `created` and `deleted` records of the operations completed for the plan,
+    and a `finished` record at the end. Records are keyed by the plan identity,
+    which is a hash of the alarms in the plan.
+    """
+
+    def __init__(self, file_path: str) -> None:
+        """Constructor
+
+        Args:
+            file_path (str): file path of the journal
+        """
+        self.file_path = file_path
+        self.plan_id: Optional[str] = None
+        self._file: Optional[IO[str]] = None
+        self._lock = threading.Lock()
+
+    def begin(
+        self,
+        to_create: Sequence[Mapping[str, Any]],
+        to_delete: Sequence[str],
+        common_param: Optional[Mapping[str, Any]] = None,
+    ) -> set[str]:
+        """Begins to apply a plan
+
+        The alarms to create are read twice, to identify the plan and to record it, without being held at once.
+
+        Args:
+            to_create (Sequence[Mapping[str, Any]]): params of the alarms to create
+            to_delete (Sequence[str]): alarm names to delete
+            common_param (Optional[Mapping[str, Any]]): params common to the alarms to create
+
+        Returns:
+            set[str]: alarm names already applied for the same plan since it last finished
+        """
+
+        def _payloads() -> Iterator[dict[str, Any]]:
+            return ({**(common_param or {}), **alarm} for alarm in to_create)
+
+        self.plan_id = _plan_id(_payloads(), to_delete)
+        plan_recorded = False
+        applied: set[str] = set()
+        for record in self._read_records():
+            if record["PlanId"] != self.plan_id:
+                continue
+            if record["Type"] == "plan":
+                plan_recorded = True
+            elif record["Type"] == "created":
+                applied.add(record["AlarmName"])
+            elif record["Type"] == "deleted":
+                applied.update(record["AlarmNames"])
+            elif record["Type"] == "finished":
+                # only the last unfinished run of the plan is resumed
+                plan_recorded = False
+                applied.clear()
+
+        self._file = open(self.file_path, "a")
+        if not _ends_with_newline(self.file_path):
+            self._file.write("\n")  # terminates the broken record
+        if plan_recorded:
+            logger.info("resuming plan %s. %d alarms are already applied", self.plan_id, len(applied))
+        else:
+            self._append_plan(_payloads(), to_delete)
+
+        return applied
+
+    def record_created(self, alarm_name: str) -> None:
+        """Records an alarm created
+
+        Args:
+            alarm_name (str): alarm name
+        """
+        self._append({"Type": "created", "AlarmName": alarm_name})
+
+    def record_deleted(self, alarm_names: Sequence[str]) -> None:
+        """Records alarms deleted
+
+        Args:
+            alarm_names (Sequence[str]): alarm names
+        """
+        self._append({"Type": "deleted", "AlarmNames": list(alarm_names)})
+
+    def end(self) -> None:
+        """Ends applying the plan, with all the operations completed"""
+        self._append({"Type": "finished"})
+        self.close()
+
+    def close(self) -> None:
+        """Closes the journal, leaving the plan unfinished to resume"""
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    def load_unfinished_plan(self) -> Optional[tuple[list[dict[str, Any]], list[str]]]:
+        """Loads the last plan unfinished
+
+        The plan is returned as a whole so that it keeps the identity. `begin()` skips the operations applied.
+
+        Returns:
+            Optional[tuple[list[dict[str, Any]], list[str]]]: a tuple of alarms to create and alarms to delete,
+                                                              or None if the last plan has been finished
+        """
+        plan: Optional[dict[str, Any]] = None
+        for record in self._read_records():
+            if record["Type"] == "plan":
+                plan = record
+            elif record["Type"] == "finished" and plan and record["PlanId"] == plan["PlanId"]:
+                plan = None
+
+        if plan is None:
+            return None
+
+        return (plan["Create"], plan["Delete"])
+
+    def _read_records(self) -> Iterable[dict[str, Any]]:
+        if not os.path.exists(self.file_path):
+            return
+
+        with open(self.file_path, "r") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # the last line may be broken if the run was killed while writing
+                    logger.warning("skipped a broken record in the journal: %s", line)
+
+    def _append_plan(self, to_create: Iterable[Mapping[str, Any]], to_delete: Sequence[str]) -> None:
+        # the plan is written an alarm at a time, in the line `_append()` would write as a whole
+        with self._lock:
+            assert self._file, "call begin() before recording"
+            header = json.dumps({"PlanId": self.plan_id, "Type": "plan"})
+            self._file.write(header[:-1] + ', "Create": [')
+            for i, alarm in enumerate(to_create):
+                self._file.write((", " if i else "") + json.dumps(alarm))
+            self._file.write('], "Delete": ' + json.dumps(list(to_delete)) + "}\n")
+            self._file.flush()
+
+    def _append(self, record: dict[str, Any]) -> None:
+        with self._lock:
+            assert self._file, "call begin() before recording"
+            self._file.write(json.dumps({"PlanId": self.plan_id} | record) + "\n")
+            self._file.flush()
+
+
+def _ends_with_newline(file_path: str) -> bool:
+    with open(file_path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() == 0:
+            return True
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def _plan_id(to_create: Iterable[Mapping[str, Any]], to_delete: Iterable[str]) -> str:
+    # digests of the alarms are summed up, identifying the plan in any order without sorting it in memory
+    total = 0
+    for kind, items in [("Create", to_create), ("Delete", to_delete)]:
+        for item in items:
+            serialized = json.dumps([kind, item], sort_keys=True, separators=(",", ":"))
+            total += int.from_bytes(hashlib.sha256(serialized.encode()).digest(), "big")
+    return hashlib.sha256((total % (1 << 256)).to_bytes(32, "big")).hexdigest()[:16]
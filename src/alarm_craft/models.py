@@ -1,4 +1,4 @@
-from typing import Mapping, Optional, Sequence, TypedDict
+from typing import Mapping, Optional, Sequence, TypedDict, Union
 
 
 class AlarmProps(TypedDict, total=False):
@@ -21,14 +21,18 @@ class AlarmProps(TypedDict, total=False):
     Dimensions: Sequence[Mapping[str, str]]
 
 
-class TargetResource(TypedDict):
+class _RequiredTargetResource(TypedDict):
+    ResourceName: str
+
+
+class TargetResource(_RequiredTargetResource, total=False):
     """Target Resource
 
     Args:
         TypedDict (_type_): typed dict
     """
 
-    ResourceName: str
+    Priority: int
 
 
 class MetricAlarmParam(TypedDict):
@@ -62,6 +66,8 @@ class ResourceConfig(TypedDict):
     """
 
     target_resource_type: str
-    target_resource_name_pattern: Optional[str]
+    target_resource_name_pattern: Optional[Union[str, Sequence[str]]]
+    target_resource_name_exclude_pattern: Optional[Union[str, Sequence[str]]]
     target_resource_tags: Optional[Mapping[str, str]]
+    priority: Optional[int]
     alarm: ResourceAlarmConfig
@@ -0,0 +1,50 @@
+from functools import lru_cache
+from typing import NamedTuple
+
+# ARNs parsed in a run are cached up to this number
+ARN_CACHE_SIZE = 1 << 17
+
+
+class Arn(NamedTuple):
+    """Amazon Resource Name split into its fields
+
+    `resource` is the whole resource part, which is split into the type and the id by the first `:`,
+    or by the last `/` if it has no `:`.
+    For an ARN without resource type like SNS topics, `resource_type` is empty.
+    """
+
+    partition: str
+    service: str
+    region: str
+    account: str
+    resource: str
+    resource_type: str
+    resource_id: str
+
+
+@lru_cache(maxsize=ARN_CACHE_SIZE)
+def parse_arn(arn: str) -> Arn:
+    """Parses an ARN in a single pass
+
+    Args:
+        arn (str): ARN like `arn:aws:lambda:ap-northeast-1:123456789012:function:my-function`
+
+    Returns:
+        Arn: structured ARN
+
+    Raises:
+        ValueError: if the string is not an ARN
+    """
+    fields = arn.split(":", 5)
+    if len(fields) != 6 or fields[0] != "arn":
+        raise ValueError(f"not an ARN: {arn}")
+
+    _, partition, service, region, account, resource = fields
+    if ":" in resource:
+        resource_type, _, resource_id = resource.partition(":")
+    elif "/" in resource:
+        resource_type, _, resource_id = resource.rpartition("/")
+    else:
+        resource_type, resource_id = "", resource
+
+    return Arn(partition, service, region, account, resource, resource_type, resource_id)
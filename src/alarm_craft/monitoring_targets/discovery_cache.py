@@ -0,0 +1,146 @@
+import gzip
+import hashlib
+import io
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Mapping, Optional
+
+import boto3
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIRECTORY = ".alarm-craft/discovery-cache"
+DEFAULT_CACHE_TTL_IN_SEC = 3600
+CACHE_FILE_SUFFIX = ".json.gz"
+
+
+class DiscoveryCache:
+    """On-disk cache of the ARNs discovered
+
+    An entry is a gzipped JSON file per resource type, tags, account and region, and expires after the TTL.
+    """
+
+    def __init__(self, directory: str, ttl_in_sec: float) -> None:
+        """Constructor
+
+        Args:
+            directory (str): directory to store the cache files
+            ttl_in_sec (float): seconds for an entry to live
+        """
+        self.directory = directory
+        self.ttl_in_sec = ttl_in_sec
+        self._scope: Optional[tuple[str, str]] = None
+        self._lock = threading.Lock()
+
+    def get(self, resource_type: str, tags: Optional[Mapping[str, str]]) -> Optional[list[str]]:
+        """Gets the ARNs cached
+
+        Args:
+            resource_type (str): resource type
+            tags (Optional[Mapping[str, str]]): tags to filter the resources
+
+        Returns:
+            Optional[list[str]]: ARNs, or None if not cached or expired
+        """
+        file_path = self._file_path(resource_type, tags)
+        try:
+            with gzip.open(file_path, "rt") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning("ignored a broken discovery cache %s: %s", file_path, e)
+            return None
+
+        if time.time() - entry["CreatedAt"] > self.ttl_in_sec:
+            logger.debug("discovery cache expired: %s", file_path)
+            return None
+
+        arns: list[str] = entry["Arns"]
+        return arns
+
+    def put(self, resource_type: str, tags: Optional[Mapping[str, str]], arns: list[str]) -> None:
+        """Caches the ARNs discovered
+
+        Args:
+            resource_type (str): resource type
+            tags (Optional[Mapping[str, str]]): tags to filter the resources
+            arns (list[str]): ARNs
+        """
+        file_path = self._file_path(resource_type, tags)
+        entry = {"Key": self._key(resource_type, tags), "CreatedAt": time.time(), "Arns": arns}
+        os.makedirs(self.directory, exist_ok=True)
+
+        # replaces the file at once not to be read while writing
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            # GzipFile doesn't close the file object given
+            with os.fdopen(fd, "wb") as raw, io.TextIOWrapper(gzip.GzipFile(fileobj=raw, mode="wb")) as f:
+                json.dump(entry, f, separators=(",", ":"))
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def invalidate(self) -> int:
+        """Removes all the entries
+
+        Returns:
+            int: number of the entries removed
+        """
+        if not os.path.isdir(self.directory):
+            return 0
+
+        removed = 0
+        for file_name in os.listdir(self.directory):
+            if file_name.endswith(CACHE_FILE_SUFFIX):
+                os.remove(os.path.join(self.directory, file_name))
+                removed += 1
+
+        return removed
+
+    def _file_path(self, resource_type: str, tags: Optional[Mapping[str, str]]) -> str:
+        key = json.dumps(self._key(resource_type, tags), sort_keys=True, separators=(",", ":"))
+        file_name = hashlib.sha256(key.encode()).hexdigest()[:32] + CACHE_FILE_SUFFIX
+        return os.path.join(self.directory, file_name)
+
+    def _key(self, resource_type: str, tags: Optional[Mapping[str, str]]) -> dict[str, Any]:
+        account, region = self._get_scope()
+        return {
+            "ResourceType": resource_type,
+            "Tags": sorted((tags or {}).items()),
+            "Account": account,
+            "Region": region,
+        }
+
+    def _get_scope(self) -> tuple[str, str]:
+        # the account and the region of the credentials, resolved once
+        with self._lock:
+            if self._scope is None:
+                session = boto3.session.Session()
+                account = session.client("sts").get_caller_identity()["Account"]
+                self._scope = (account, session.region_name or "")
+            return self._scope
+
+
+def from_config(config: Mapping[str, Any]) -> Optional[DiscoveryCache]:
+    """Creates the discovery cache if it's configured
+
+    Args:
+        config (Mapping[str, Any]): config dict
+
+    Returns:
+        Optional[DiscoveryCache]: discovery cache, or None if not configured
+    """
+    cache_config = config.get("globals", {}).get("discovery_cache")
+    if cache_config is None:
+        return None
+
+    return DiscoveryCache(
+        cache_config.get("directory", DEFAULT_CACHE_DIRECTORY),
+        cache_config.get("ttl_in_sec", DEFAULT_CACHE_TTL_IN_SEC),
+    )
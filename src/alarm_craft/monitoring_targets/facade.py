@@ -1,40 +1,127 @@
 import logging
 import os
 import pkgutil
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Iterable, Mapping
 
+from alarm_craft import hedging
 from alarm_craft.models import MetricAlarmParam
 
-from .target_metrics_provider import TargetMetricsProvider, provider_class_name_postfix, provider_module_name_prefix
+from . import discovery_cache, metric_index
+from .target_metrics_provider import (
+    TargetMetricsProvider,
+    TargetMetricsProviderBase,
+    provider_class_name_postfix,
+    provider_module_name_prefix,
+)
+from .target_metrics_provider_rgta import ResourceGroupsTaggingAPITargetMetricsProviderBase, ResourceScanPlanner
 
 logger = logging.getLogger(__name__)
 
+# max number of providers discovering resources at once
+MAX_DISCOVERY_WORKERS = 8
 
-def get_target_metrics(config: Mapping[str, Any]) -> Iterable[MetricAlarmParam]:
+# max number of metrics a provider discovers ahead of the consumer
+DISCOVERY_LOOKAHEAD = 1000
+
+# interval to check whether the consumer has stopped while a provider waits for room
+_PUT_TIMEOUT_IN_SEC = 0.1
+
+# marker of the end of the metrics of a provider
+_END = object()
+
+# table of providers compiled from declarations in a provider module
+declared_providers_attr_name = "DECLARED_PROVIDERS"
+
+
+def get_target_metrics(
+    config: Mapping[str, Any], max_workers: int = MAX_DISCOVERY_WORKERS, lookahead: int = DISCOVERY_LOOKAHEAD
+) -> Iterable[MetricAlarmParam]:
     """Gets target metrics
 
+    Providers discover resources concurrently, and the metrics are yielded in the order of the resource configs.
+    A provider discovers up to `lookahead` metrics ahead of the consumer, and waits for them to be consumed.
+    An error in a provider is raised when its turn comes.
+
     Args:
         config (dict[str, Any]): config dict
+        max_workers (int): max number of providers discovering resources at once
+        lookahead (int): max number of metrics a provider discovers ahead
 
     Yields:
         Iterator[Iterable[MetricAlarmParam]]: metric alarm params
     """
-    for provider in _get_target_metrics_providers(config):
-        yield from provider.get_metric_alarms()
+    providers = list(_get_target_metrics_providers(config))
+
+    # resource configs scan the resources together
+    scan_planner = ResourceScanPlanner(discovery_cache.from_config(config), hedging.from_config(config))
+    for provider in providers:
+        if isinstance(provider, ResourceGroupsTaggingAPITargetMetricsProviderBase):
+            provider.scan_planner = scan_planner
+            scan_planner.register(
+                provider.resource_config["target_resource_type"], provider.resource_config.get("target_resource_tags")
+            )
+
+    # resource configs look up the metrics existing in the same index
+    index = metric_index.from_config(config)
+    if index:
+        for provider in providers:
+            if isinstance(provider, TargetMetricsProviderBase):
+                provider.metric_index = index
+
+    # the providers are started in order, so the one being consumed is always running
+    channels: list[queue.Queue] = [queue.Queue(maxsize=max(lookahead, 1)) for _ in providers]
+    stopped = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=max(max_workers, 1))
+    try:
+        futures = [
+            executor.submit(_get_metric_alarms, provider, channel, stopped)
+            for provider, channel in zip(providers, channels)
+        ]
+        for f, channel in zip(futures, channels):
+            while (param := channel.get()) is not _END:
+                yield param
+            f.result()  # raises the error of the provider
+    finally:
+        stopped.set()
+        executor.shutdown(cancel_futures=True)
 
 
 # implementations
 
 
+def _get_metric_alarms(provider: TargetMetricsProvider, channel: queue.Queue, stopped: threading.Event) -> None:
+    try:
+        for param in provider.get_metric_alarms():
+            if not _put(channel, param, stopped):
+                return
+    finally:
+        _put(channel, _END, stopped)
+
+
+def _put(channel: queue.Queue, item: Any, stopped: threading.Event) -> bool:
+    # waits for room until the consumer stops
+    while not stopped.is_set():
+        try:
+            channel.put(item, timeout=_PUT_TIMEOUT_IN_SEC)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
 def _get_provider_dict() -> dict[str, type[TargetMetricsProvider]]:
     """Gets a dict mapping resource_type and Provider classes
 
-    Searches Provider classes and dynamically loads them
+    Searches Provider classes and dynamically loads them,
+    along with the providers compiled from the definitions in `DECLARED_PROVIDERS` of the modules
 
     Returns:
         dict[str, type[TargetMetricsProvider]]: mapping for resource_type and provider
     """
-    repository = {}
+    repository: dict[str, type[TargetMetricsProvider]] = {}
     pkg = __package__
     curr_dir = os.path.dirname(__file__)
     logger.debug("package:%s, current dir:%s", pkg, curr_dir)
@@ -43,6 +130,7 @@ def _get_provider_dict() -> dict[str, type[TargetMetricsProvider]]:
         if module_name.startswith(provider_module_name_prefix):
             # import *_metrics_provider_* module
             module = __import__(name=module_name, fromlist=[""])
+            repository.update(getattr(module, declared_providers_attr_name, {}))
             for member in dir(module):
                 if member.endswith(provider_class_name_postfix):
                     # Load *MetricsProvider class
@@ -0,0 +1,92 @@
+import logging
+import threading
+from typing import Any, Iterable, Mapping, Optional, Sequence
+
+import boto3
+
+from alarm_craft.pagination import prefetch_pages
+
+from .target_metrics_provider import client_lock
+
+logger = logging.getLogger(__name__)
+
+# (metric name, dimensions) of a metric in a namespace
+MetricKey = tuple[str, frozenset[tuple[str, str]]]
+
+
+class MetricIndex:
+    """In-memory index of the metrics existing in CloudWatch
+
+    A namespace is scanned by `ListMetrics` once, when a metric in it is looked up first.
+    `ListMetrics` only returns the metrics with data points in the past two weeks.
+    """
+
+    def __init__(self) -> None:
+        """Constructor"""
+        self._client: Any = None
+        self._metrics: dict[str, frozenset[MetricKey]] = {}
+        self._lock = threading.Lock()
+        self._namespace_locks: dict[str, threading.Lock] = {}
+
+    def contains(self, namespace: str, metric_name: str, dimensions: Sequence[Mapping[str, str]]) -> bool:
+        """Tells whether the metric exists
+
+        Args:
+            namespace (str): metric namespace
+            metric_name (str): metric name
+            dimensions (Sequence[Mapping[str, str]]): metric dimensions
+
+        Returns:
+            bool: True if the metric exists
+        """
+        key = (metric_name, frozenset((d["Name"], d["Value"]) for d in dimensions))
+        return key in self._get_metrics(namespace)
+
+    def _get_metrics(self, namespace: str) -> frozenset[MetricKey]:
+        metrics = self._metrics.get(namespace)
+        if metrics is not None:
+            return metrics
+
+        # scans a namespace once even if providers look it up at the same time
+        with self._lock:
+            namespace_lock = self._namespace_locks.setdefault(namespace, threading.Lock())
+        with namespace_lock:
+            if namespace not in self._metrics:
+                self._metrics[namespace] = frozenset(self._scan(namespace))
+                logger.debug("indexed %d metrics in %s", len(self._metrics[namespace]), namespace)
+            return self._metrics[namespace]
+
+    def _scan(self, namespace: str) -> Iterable[MetricKey]:
+        client = self._get_client()
+
+        def _fetch_page(token: str) -> Mapping[str, Any]:
+            kwargs = {"Namespace": namespace}
+            if token:
+                kwargs["NextToken"] = token
+            resp: Mapping[str, Any] = client.list_metrics(**kwargs)
+            return resp
+
+        for page in prefetch_pages(_fetch_page, "NextToken"):
+            for metric in page["Metrics"]:
+                dimensions = frozenset((d["Name"], d["Value"]) for d in metric.get("Dimensions", []))
+                yield (metric["MetricName"], dimensions)
+
+    def _get_client(self) -> Any:
+        with client_lock:
+            if self._client is None:
+                self._client = boto3.client("cloudwatch")
+            return self._client
+
+
+def from_config(config: Mapping[str, Any]) -> Optional[MetricIndex]:
+    """Creates the metric index if it's enabled
+
+    Args:
+        config (Mapping[str, Any]): config dict
+
+    Returns:
+        Optional[MetricIndex]: metric index, or None if not enabled
+    """
+    if config.get("globals", {}).get("metric_index"):
+        return MetricIndex()
+    return None
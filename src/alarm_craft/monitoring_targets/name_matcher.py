@@ -0,0 +1,145 @@
+import re
+from typing import Optional, Sequence, Union
+
+# patterns given in the config, a regular expression or a list of them
+NamePatterns = Union[str, Sequence[str]]
+
+_REGEX_METACHARS = frozenset(".^$*+?{}[]\\|()")
+
+# inline flags applying to the whole expression like `(?i)`, not the scoped ones like `(?i:...)`
+_GLOBAL_FLAGS = re.compile(r"\(\?[aiLmsux]+\)")
+
+
+class _Trie:
+    """Trie of literal strings telling whether a string starts with any of them"""
+
+    def __init__(self) -> None:
+        self.root: dict[str, dict] = {}
+
+    def add(self, literal: str) -> None:
+        node = self.root
+        for c in literal:
+            node = node.setdefault(c, {})
+        node[""] = {}  # end of a literal
+
+    def has_prefix_of(self, text: str) -> bool:
+        node = self.root
+        if "" in node:
+            return True
+        for c in text:
+            next_node = node.get(c)
+            if next_node is None:
+                return False
+            if "" in next_node:
+                return True
+            node = next_node
+        return False
+
+    def __bool__(self) -> bool:
+        return bool(self.root)
+
+
+class _PatternSet:
+    """Set of name patterns matched at once
+
+    Patterns of a literal prefix like `^myproj-` or a literal suffix like `.*-dlq$` are looked up in tries,
+    and the other patterns are combined into a single regular expression.
+    Each pattern matches at the beginning of the name, like `re.match()`.
+    """
+
+    def __init__(self, patterns: Sequence[str]) -> None:
+        self.prefixes = _Trie()
+        self.suffixes = _Trie()  # of the reversed suffixes
+        regexes = []
+        for pattern in patterns:
+            prefix = _literal_prefix(pattern)
+            suffix = _literal_suffix(pattern) if prefix is None else None
+            if prefix is not None:
+                self.prefixes.add(prefix)
+            elif suffix is not None:
+                self.suffixes.add(suffix[::-1])
+            else:
+                regexes.append(pattern)
+
+        self.regexes = _combine(regexes)
+
+    def matches(self, name: str) -> bool:
+        if self.prefixes and self.prefixes.has_prefix_of(name):
+            return True
+        if self.suffixes and self.suffixes.has_prefix_of(name[::-1]):
+            return True
+        return any(r.match(name) for r in self.regexes)
+
+
+class NameMatcher:
+    """Matcher of resource names with include and exclude patterns
+
+    A name matches if it matches any of the include patterns, or no include pattern is given,
+    and it matches none of the exclude patterns.
+    """
+
+    def __init__(self, include: Optional[NamePatterns], exclude: Optional[NamePatterns] = None) -> None:
+        """Constructor
+
+        Args:
+            include (Optional[NamePatterns]): regular expression(s) of the names to include
+            exclude (Optional[NamePatterns]): regular expression(s) of the names to exclude
+        """
+        include_patterns = _as_list(include)
+        self.include = _PatternSet(include_patterns) if include_patterns else None
+        self.exclude = _PatternSet(_as_list(exclude))
+
+    def matches(self, name: str) -> bool:
+        """Tells whether the name matches
+
+        Args:
+            name (str): resource name
+
+        Returns:
+            bool: True if the name matches
+        """
+        if self.include and not self.include.matches(name):
+            return False
+        return not self.exclude.matches(name)
+
+
+def _as_list(patterns: Optional[NamePatterns]) -> list[str]:
+    if not patterns:
+        return []
+    if isinstance(patterns, str):
+        return [patterns]
+    return list(patterns)
+
+
+def _is_literal(text: str) -> bool:
+    return not any(c in _REGEX_METACHARS for c in text)
+
+
+def _literal_prefix(pattern: str) -> Optional[str]:
+    # "^myproj-" or "myproj-"
+    body = pattern.removeprefix("^")
+    return body if _is_literal(body) else None
+
+
+def _literal_suffix(pattern: str) -> Optional[str]:
+    # ".*-dlq$" or "^.*-dlq$"
+    body = pattern.removeprefix("^")
+    if body.startswith(".*") and body.endswith("$") and not body.endswith("\\$"):
+        literal = body[2:-1]
+        return literal if _is_literal(literal) else None
+    return None
+
+
+def _combine(regexes: Sequence[str]) -> list[re.Pattern[str]]:
+    # group numbers are shifted in the alternation, and global flags would apply to all the alternatives.
+    # patterns with back references or global flags are compiled one by one
+    separate = [r for r in regexes if re.search(r"\\[1-9]", r) or _GLOBAL_FLAGS.search(r)]
+    combinable = [r for r in regexes if r not in separate]
+    compiled = [re.compile(r) for r in separate]
+    if not combinable:
+        return compiled
+
+    try:
+        return compiled + [re.compile("|".join(f"(?:{r})" for r in combinable))]
+    except re.error:
+        return compiled + [re.compile(r) for r in combinable]
@@ -1,8 +1,15 @@
+import logging
+import threading
 from abc import ABC, abstractmethod
-from typing import Any, Final, Generic, Iterable, Mapping, Optional, Sequence, TypeVar
+from typing import TYPE_CHECKING, Any, Final, Generic, Iterable, Mapping, NamedTuple, Optional, Sequence, TypeVar
 
 from alarm_craft.models import MetricAlarmParam, ResourceConfig
 
+if TYPE_CHECKING:
+    from .metric_index import MetricIndex
+
+logger = logging.getLogger(__name__)
+
 
 class TargetMetricsProvider(ABC):
     """Target Metrics Provider
@@ -34,6 +41,18 @@ class TargetMetricsProvider(ABC):
 T = TypeVar("T")
 
 
+class MetricTemplate(NamedTuple):
+    """Alarm properties of a metric shared among the resources of a resource config"""
+
+    metric_name: str
+    namespace: str
+    overrides: Optional[Mapping[str, Any]]
+
+
+# boto3 default session is not thread-safe to create clients. providers discovering concurrently take this lock
+client_lock = threading.Lock()
+
+
 class TargetMetricsProviderBase(TargetMetricsProvider, Generic[T]):
     """Target Metrics Provider Base
 
@@ -42,32 +61,86 @@ class TargetMetricsProviderBase(TargetMetricsProvider, Generic[T]):
         Generic (_type_): type
     """
 
+    # index of the existing metrics to skip the alarms of metrics never emitted, given by the facade
+    metric_index: Optional["MetricIndex"] = None
+
+    # whether `dimensions()` doesn't depend on the metric. if so, the dimensions are shared among the metrics
+    dimensions_per_resource: bool = False
+
     def get_metric_alarms(self) -> Iterable[MetricAlarmParam]:
         """Gets metric alarms
 
+        The alarm properties of the metrics are compiled into templates once, and filled in with each resource.
+
         Yields:
             Iterator[Iterable[MetricAlarmParam]]: list of metric alarm params
         """
+        templates = self.compile_metric_templates()
+        priority = self.resource_config.get("priority")
         for resource in self.get_monitoring_target_resources():
-            for metric in self.metric_names(resource):
+            resource_name = self.get_resource_name(resource)
+            shared_dimensions = None
+            for template in templates if templates is not None else self._metric_templates_of(resource):
+                if shared_dimensions is not None:
+                    dimensions = shared_dimensions
+                else:
+                    dimensions = self.dimensions(template.metric_name, resource)
+                    if self.dimensions_per_resource:
+                        shared_dimensions = dimensions
+
                 param: MetricAlarmParam = {
                     "TargetResource": {
-                        "ResourceName": self.get_resource_name(resource),
+                        "ResourceName": resource_name,
                     },
                     "AlarmProps": {
-                        "MetricName": metric,
-                        "Namespace": self.namespace(),
-                        "Dimensions": self.dimensions(metric, resource),
+                        "MetricName": template.metric_name,
+                        "Namespace": template.namespace,
+                        "Dimensions": dimensions,
                     },
                 }
 
-                param_overrides = self.param_overrides(metric, resource)
-                if param_overrides:
+                if priority is not None:
+                    param["TargetResource"]["Priority"] = priority
+
+                if template.overrides:
                     # param_overrides is a AlarmProps ensured by jsonschema checking
-                    param["AlarmProps"].update(param_overrides)  # type: ignore
+                    param["AlarmProps"].update(template.overrides)  # type: ignore
+
+                if self.metric_index and not self._metric_exists(param):
+                    logger.debug("skipped the metric not existing: %s", param)
+                    continue
 
                 yield param
 
+    def compile_metric_templates(self) -> Optional[list[MetricTemplate]]:
+        """Compiles the alarm properties of the metrics shared among the resources
+
+        Returns:
+            Optional[list[MetricTemplate]]: templates of the metrics,
+                                            or None if `metric_names()` or `param_overrides()` depend on the resource
+        """
+        cls = type(self)
+        if (
+            cls.metric_names is not TargetMetricsProviderBase.metric_names
+            or cls.param_overrides is not TargetMetricsProviderBase.param_overrides
+        ):
+            return None
+
+        alarm_config = self.resource_config["alarm"]
+        namespace = self.namespace()
+        param_overrides = alarm_config.get("alarm_param_overrides") or {}
+        return [MetricTemplate(m, namespace, param_overrides.get(m)) for m in alarm_config["metrics"]]
+
+    def _metric_templates_of(self, resource: T) -> list[MetricTemplate]:
+        namespace = self.namespace()
+        return [MetricTemplate(m, namespace, self.param_overrides(m, resource)) for m in self.metric_names(resource)]
+
+    def _metric_exists(self, param: MetricAlarmParam) -> bool:
+        props = param["AlarmProps"]
+        return self.metric_index is None or self.metric_index.contains(
+            props["Namespace"], props["MetricName"], props["Dimensions"]
+        )
+
     @abstractmethod
     def get_monitoring_target_resources(self) -> Iterable[T]:
         """Gets monitoring target resources
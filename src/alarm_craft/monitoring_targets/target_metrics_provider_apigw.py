@@ -1,14 +1,21 @@
-from typing import Iterable, Mapping, Optional, Sequence
+from typing import Any, Iterable, Mapping, Optional, Sequence
 
 import boto3
 
-from .target_metrics_provider import TargetMetricsProviderBase, metric_provider
+from alarm_craft.pagination import prefetch_pages
+
+from .target_metrics_provider import TargetMetricsProviderBase, client_lock, metric_provider
 
 
 @metric_provider("apigateway:restapi")
 class ApiGatewayMetricsProvider(TargetMetricsProviderBase[str]):
     """API Gateway Metrics Provider"""
 
+    # the largest page size of GetRestApis
+    page_size = 500
+
+    dimensions_per_resource = True
+
     def get_monitoring_target_resources(self) -> Iterable[str]:
         """Gets monitoring target resources
 
@@ -17,14 +24,19 @@ class ApiGatewayMetricsProvider(TargetMetricsProviderBase[str]):
         """
         target_tags = self.resource_config.get("target_resource_tags")
 
-        client = boto3.client("apigateway")
-        try:
-            resources = client.get_rest_apis()["items"]
-            return [res["name"] for res in resources if self._contains_tags(res["tags"], target_tags)]
+        with client_lock:
+            client = boto3.client("apigateway")
+
+        def _get_rest_apis(position: str) -> Mapping[str, Any]:
+            position_param = {"position": position} if position else {}
+            resp: Mapping[str, Any] = client.get_rest_apis(limit=self.page_size, **position_param)
+            return resp
 
-        finally:
-            pass
-            # client.close()
+        # tags are filtered while the next page is fetched
+        for resp in prefetch_pages(_get_rest_apis, "position"):
+            for res in resp["items"]:
+                if self._contains_tags(res.get("tags", {}), target_tags):
+                    yield res["name"]
 
     def _contains_tags(self, actual_tags: Mapping[str, str], expected_tags: Optional[Mapping[str, str]]) -> bool:
         if expected_tags:
@@ -1,17 +1,32 @@
+import logging
 import re
-from typing import Callable, Iterable, Mapping, Optional, Sequence
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Final, Iterable, Literal, Mapping, NamedTuple, Optional, Sequence
 
 import boto3
 
-from .target_metrics_provider import TargetMetricsProviderBase, metric_provider
+from alarm_craft.hedging import RequestHedger
+from alarm_craft.pagination import prefetch_pages
+
+from .arn import parse_arn
+from .discovery_cache import DiscoveryCache
+from .name_matcher import NameMatcher, NamePatterns
+from .target_metrics_provider import (
+    TargetMetricsProviderBase,
+    client_lock,
+    metric_provider,
+    provider_class_name_postfix,
+)
+
+logger = logging.getLogger(__name__)
 
 
 class ResourceGroupsTaggingAPITargetMetricsProviderBase(TargetMetricsProviderBase[str]):
     """ResourceGroupsTaggingAPI target metrics provider base"""
 
-    default_arn_pattern = re.compile("^arn:aws:[^:]*:[^:]*:[0-9]*:[^:]*:")
-    arn_pattern_no_restype = re.compile("^arn:aws:[^:]*:[^:]*:[0-9]*:")
-    arn_pattern_name_by_slash = re.compile("^arn:aws:[^:]*:[^:]*:[0-9]*:[^:]*/")
+    # planner of the scans shared among resource configs, given by the facade
+    scan_planner: Optional["ResourceScanPlanner"] = None
 
     def get_monitoring_target_resources(self) -> Iterable[str]:
         """Gets monitoring target resources
@@ -19,38 +34,19 @@ class ResourceGroupsTaggingAPITargetMetricsProviderBase(TargetMetricsProviderBas
         Returns:
             Iterable[str]: monitoring target resources
         """
-        resource_client = boto3.client("resourcegroupstaggingapi")
-        try:
-            tags = self.resource_config.get("target_resource_tags")
-            pattern = self.resource_config.get("target_resource_name_pattern")
-            resource_type = self.resource_config["target_resource_type"]
-            request_param: dict = {
-                "ResourceTypeFilters": [resource_type],
-                "PaginationToken": "",
-            }
-
-            # tags condition
-            if tags:
-                tag_filters = [{"Key": k, "Values": [v]} for k, v in tags.items()]
-                request_param["TagFilters"] = tag_filters
-
-            filter_func = self.create_resource_filter(pattern)
-
-            while True:
-                resp = resource_client.get_resources(**request_param)
-
-                yield from filter(filter_func, [r["ResourceARN"] for r in resp["ResourceTagMappingList"]])
-
-                next_token = resp.get("PaginationToken")
-                if next_token and next_token != "":
-                    request_param["PaginationToken"] = next_token
-                else:
-                    # no more results
-                    break
-
-        finally:
-            pass
-            # resource_client.close()
+        tags = self.resource_config.get("target_resource_tags")
+        pattern = self.resource_config.get("target_resource_name_pattern")
+        exclude_pattern = self.resource_config.get("target_resource_name_exclude_pattern")
+        resource_type = self.resource_config["target_resource_type"]
+        filter_func = self.create_resource_filter(pattern, exclude_pattern)
+
+        arns: Iterable[str]
+        if self.scan_planner:
+            arns = self.scan_planner.get_resources(resource_type, tags)
+        else:
+            arns = _get_resources(_resource_client(), [resource_type], tags)
+
+        return filter(filter_func, arns)
 
     def get_resource_name(self, arn: str) -> str:
         """Gets resource name
@@ -61,27 +57,32 @@ class ResourceGroupsTaggingAPITargetMetricsProviderBase(TargetMetricsProviderBas
         Returns:
             str: resource name
         """
-        return self.default_arn_pattern.sub("", arn, 1)
+        return parse_arn(arn).resource_id
 
-    def create_resource_filter(self, pattern: Optional[str]) -> Callable[[str], bool]:
+    def create_resource_filter(
+        self, pattern: Optional[NamePatterns], exclude_pattern: Optional[NamePatterns] = None
+    ) -> Callable[[str], bool]:
         """Gets resource filter function
 
         Args:
-            pattern (str): filter condition for resource name
+            pattern (Optional[NamePatterns]): filter condition(s) for resource name to include
+            exclude_pattern (Optional[NamePatterns]): filter condition(s) for resource name to exclude
 
         Returns:
             Callable[[str], bool]: function of predicate for resource name matches
         """
-        if pattern:
-            return self._get_filter_by_resource_name_pattern(pattern)
+        if pattern or exclude_pattern:
+            return self._get_filter_by_resource_name_pattern(pattern, exclude_pattern)
         else:
             return ResourceGroupsTaggingAPITargetMetricsProviderBase._nofilter
 
-    def _get_filter_by_resource_name_pattern(self, pattern: str) -> Callable[[str], bool]:
-        regex = re.compile(pattern)
+    def _get_filter_by_resource_name_pattern(
+        self, pattern: Optional[NamePatterns], exclude_pattern: Optional[NamePatterns]
+    ) -> Callable[[str], bool]:
+        matcher = NameMatcher(pattern, exclude_pattern)
 
         def _filter_by_resource_name_pattern(arn: str) -> bool:
-            return regex.match(self.get_resource_name(arn)) is not None
+            return matcher.matches(self.get_resource_name(arn))
 
         return _filter_by_resource_name_pattern
 
@@ -90,213 +91,250 @@ class ResourceGroupsTaggingAPITargetMetricsProviderBase(TargetMetricsProviderBas
         return True
 
 
-#
-# Implementations
-#
-
+class ResourceScanPlanner:
+    """Planner of ResourceGroupsTaggingAPI scans shared among resource configs
 
-@metric_provider("lambda:function")
-class LambdaMetricsProvider(ResourceGroupsTaggingAPITargetMetricsProviderBase):
-    """Lambda Metric Provider"""
+    Resource configs with the same tag filters are scanned at once by `GetResources` with all their resource types,
+    and the ARNs are split out to each resource type by the service in the ARN.
+    Resource types of the same service are scanned separately, as the ARNs don't always tell the resource type.
+    """
 
-    def dimensions(self, metric_name: str, arn: str) -> Sequence[Mapping[str, str]]:
-        """Gets alarm dimensions
+    def __init__(self, cache: Optional[DiscoveryCache] = None, hedger: Optional[RequestHedger] = None) -> None:
+        """Constructor
 
         Args:
-            metric_name (str): metric name
-            arn (T): resource
-
-        Returns:
-            Sequence[Mapping[str, str]]: alarm dimensions
-        """
-        name = self.get_resource_name(arn)
-        return [{"Name": "FunctionName", "Value": name}]
-
-    def get_default_namespace(self) -> str:
-        """Gets alarm namespace
-
-        Returns:
-            str: alarm namespace
+            cache (Optional[DiscoveryCache]): cache of the ARNs discovered
+            hedger (Optional[RequestHedger]): hedger of the slow page calls
         """
-        return "AWS/Lambda"
-
+        self.cache = cache
+        self.hedger = hedger
+        self._registered: dict[TagKey, set[str]] = defaultdict(set)
+        self._scans: dict[tuple[str, TagKey], _SharedScan] = {}
+        self._lock = threading.Lock()
 
-@metric_provider("states:stateMachine")
-class SfnMetricsProvider(ResourceGroupsTaggingAPITargetMetricsProviderBase):
-    """StepFunctions Metrics Provider"""
-
-    def dimensions(self, metric_name: str, arn: str) -> Sequence[Mapping[str, str]]:
-        """Gets alarm dimensions
+    def register(self, resource_type: str, tags: Optional[Mapping[str, str]]) -> None:
+        """Registers a resource type to scan
 
         Args:
-            metric_name (str): metric name
-            arn (T): resource
-
-        Returns:
-            Sequence[Mapping[str, str]]: alarm dimensions
+            resource_type (str): resource type
+            tags (Optional[Mapping[str, str]]): tags to filter the resources
         """
-        return [{"Name": "StateMachineArn", "Value": arn}]
+        with self._lock:
+            self._registered[_tag_key(tags)].add(resource_type)
+            self._scans.clear()  # planned again
 
-    def get_default_namespace(self) -> str:
-        """Gets alarm namespace
-
-        Returns:
-            str: alarm namespace
-        """
-        return "AWS/States"
-
-
-@metric_provider("sns:topic")
-class SnsMetricsProvider(ResourceGroupsTaggingAPITargetMetricsProviderBase):
-    """SNS Metrics Provider"""
-
-    def get_resource_name(self, arn: str) -> str:
-        """Gets resource name
+    def get_resources(self, resource_type: str, tags: Optional[Mapping[str, str]]) -> list[str]:
+        """Gets ARNs of the resources, scanning them together with the other resource types if not yet scanned
 
         Args:
-            arn (T): resource
+            resource_type (str): resource type
+            tags (Optional[Mapping[str, str]]): tags to filter the resources
 
         Returns:
-            str: resource name
+            list[str]: ARNs of the resources
         """
-        return self.arn_pattern_no_restype.sub("", arn, 1)
+        key = (resource_type, _tag_key(tags))
+        with self._lock:
+            if not self._scans:
+                self._plan()
+            scan = self._scans.get(key)
+            if scan is None:
+                # not registered. scanned alone
+                scan = self._scans[key] = _SharedScan([resource_type], tags, self.cache, self.hedger)
+
+        return scan.get(resource_type)
+
+    def _plan(self) -> None:
+        for tag_key, resource_types in self._registered.items():
+            types_by_service: dict[str, list[str]] = defaultdict(list)
+            for resource_type in sorted(resource_types):
+                types_by_service[_service_of_resource_type(resource_type)].append(resource_type)
+
+            shared = [types[0] for types in types_by_service.values() if len(types) == 1]
+            separate = [[t] for types in types_by_service.values() if len(types) > 1 for t in types]
+            for types in [shared, *separate]:
+                if types:
+                    scan = _SharedScan(types, dict(tag_key), self.cache, self.hedger)
+                    for t in types:
+                        self._scans[(t, tag_key)] = scan
+
+        logger.debug("planned %d scans for %d resource configs", len(set(self._scans.values())), len(self._scans))
+
+
+TagKey = tuple[tuple[str, str], ...]
+
+
+class _SharedScan:
+    def __init__(
+        self,
+        resource_types: list[str],
+        tags: Optional[Mapping[str, str]],
+        cache: Optional[DiscoveryCache] = None,
+        hedger: Optional[RequestHedger] = None,
+    ) -> None:
+        self.resource_types = resource_types
+        self.tags = tags
+        self.cache = cache
+        self.hedger = hedger
+        self._resources: Optional[dict[str, list[str]]] = None
+        self._lock = threading.Lock()
+
+    def get(self, resource_type: str) -> list[str]:
+        with self._lock:
+            if self._resources is None:
+                self._resources = self._scan()
+
+        return self._resources[resource_type]
+
+    def _scan(self) -> dict[str, list[str]]:
+        resources: dict[str, list[str]] = {}
+        if self.cache:
+            for t in self.resource_types:
+                cached = self.cache.get(t, self.tags)
+                if cached is not None:
+                    resources[t] = cached
+
+        # scans only the resource types not cached
+        resource_types = [t for t in self.resource_types if t not in resources]
+        if resource_types:
+            scanned = self._scan_resource_types(resource_types)
+            if self.cache:
+                for t, arns in scanned.items():
+                    self.cache.put(t, self.tags, arns)
+            resources.update(scanned)
+
+        return resources
+
+    def _scan_resource_types(self, resource_types: list[str]) -> dict[str, list[str]]:
+        arns = _get_resources(_resource_client(), resource_types, self.tags, self.hedger)
+        if len(resource_types) == 1:
+            return {resource_types[0]: list(arns)}
+
+        type_by_service = {_service_of_resource_type(t): t for t in resource_types}
+        resources: dict[str, list[str]] = {t: [] for t in resource_types}
+        for arn in arns:
+            resource_type = type_by_service.get(_service_of_arn(arn))
+            if resource_type:
+                resources[resource_type].append(arn)
+            else:
+                logger.debug("resource of no type requested: %s", arn)
+
+        return resources
+
+
+def _get_resources(
+    resource_client: Any,
+    resource_types: Sequence[str],
+    tags: Optional[Mapping[str, str]],
+    hedger: Optional[RequestHedger] = None,
+) -> Iterable[str]:
+    request_param: dict = {
+        "ResourceTypeFilters": list(resource_types),
+    }
+
+    # tags condition
+    if tags:
+        tag_filters = [{"Key": k, "Values": [v]} for k, v in tags.items()]
+        request_param["TagFilters"] = tag_filters
 
-    def dimensions(self, metric_name: str, arn: str) -> Sequence[Mapping[str, str]]:
-        """Gets alarm dimensions
+    def _get_resources_page(token: str) -> Mapping[str, Any]:
+        resp: Mapping[str, Any] = resource_client.get_resources(**request_param, PaginationToken=token)
+        return resp
 
-        Args:
-            metric_name (str): metric name
-            arn (T): resource
+    for resp in prefetch_pages(_get_resources_page, "PaginationToken", hedger=hedger):
+        yield from (r["ResourceARN"] for r in resp["ResourceTagMappingList"])
 
-        Returns:
-            Sequence[Mapping[str, str]]: alarm dimensions
-        """
-        name = self.get_resource_name(arn)
-        return [{"Name": "TopicName", "Value": name}]
 
-    def get_default_namespace(self) -> str:
-        """Gets alarm namespace
+def _resource_client() -> Any:
+    with client_lock:
+        return boto3.client("resourcegroupstaggingapi")
 
-        Returns:
-            str: alarm namespace
-        """
-        return "AWS/SNS"
 
+def _tag_key(tags: Optional[Mapping[str, str]]) -> TagKey:
+    return tuple(sorted(tags.items())) if tags else ()
 
-@metric_provider("sqs:queue")
-class SqsMetricsProvider(ResourceGroupsTaggingAPITargetMetricsProviderBase):
-    """SQS Metric Provider"""
 
-    def get_resource_name(self, arn: str) -> str:
-        """Gets resource name
+def _service_of_resource_type(resource_type: str) -> str:
+    # "lambda:function" -> "lambda"
+    return resource_type.split(":")[0]
 
-        Args:
-            arn (T): resource
 
-        Returns:
-            str: resource name
-        """
-        return self.arn_pattern_no_restype.sub("", arn, 1)
+def _service_of_arn(arn: str) -> str:
+    return parse_arn(arn).service
 
-    def dimensions(self, metric_name: str, arn: str) -> Sequence[Mapping[str, str]]:
-        """Gets alarm dimensions
 
-        Args:
-            metric_name (str): metric name
-            arn (T): resource
-
-        Returns:
-            Sequence[Mapping[str, str]]: alarm dimensions
-        """
-        name = self.get_resource_name(arn)
-        return [{"Name": "QueueName", "Value": name}]
-
-    def get_default_namespace(self) -> str:
-        """Gets alarm namespace
-
-        Returns:
-            str: alarm namespace
-        """
-        return "AWS/SQS"
-
-
-@metric_provider("events:rule")
-class EventBridgeMetricsProvider(ResourceGroupsTaggingAPITargetMetricsProviderBase):
-    """EventBridge Metrics Provider"""
-
-    def get_resource_name(self, arn: str) -> str:
-        """Gets resource name
-
-        Args:
-            arn (T): resource
-
-        Returns:
-            str: resource name
-        """
-        return self.arn_pattern_name_by_slash.sub("", arn, 1)
+#
+# Declarative providers
+#
 
-    def dimensions(self, metric_name: str, arn: str) -> Sequence[Mapping[str, str]]:
-        """Gets alarm dimensions
 
-        Args:
-            metric_name (str): metric name
-            arn (T): resource
+class ProviderDefinition(NamedTuple):
+    """Declaration of a provider for a resource type found by ResourceGroupsTaggingAPI
 
-        Returns:
-            Sequence[Mapping[str, str]]: alarm dimensions
-        """
-        name = self.get_resource_name(arn)
-        return [{"Name": "RuleName", "Value": name}]
+    `name_rule` tells which part of the ARN is the resource name, `"resource_id"` or the whole `"resource"`,
+    and `dimension_value_rule` tells whether the dimension value is the resource `"name"` or the `"arn"` itself.
+    ARNs whose resource type contains `excluded_resource_type` are not monitored.
+    """
 
-    def get_default_namespace(self) -> str:
-        """Gets alarm namespace
+    resource_type: str
+    name_rule: Literal["resource_id", "resource"]
+    dimension_name: str
+    default_namespace: str
+    dimension_value_rule: Literal["name", "arn"] = "name"
+    excluded_resource_type: Optional[str] = None
 
-        Returns:
-            str: alarm namespace
-        """
-        return "AWS/Events"
 
+PROVIDER_DEFINITIONS: Final[Sequence[ProviderDefinition]] = (
+    ProviderDefinition("lambda:function", "resource_id", "FunctionName", "AWS/Lambda"),
+    ProviderDefinition("states:stateMachine", "resource_id", "StateMachineArn", "AWS/States", "arn"),
+    ProviderDefinition("sns:topic", "resource", "TopicName", "AWS/SNS"),
+    ProviderDefinition("sqs:queue", "resource", "QueueName", "AWS/SQS"),
+    ProviderDefinition("events:rule", "resource_id", "RuleName", "AWS/Events"),
+    # api stage ARN is like "arn:aws:apigateway:ap-northeast-1::/apis/abcd1234fg/stages/$default"
+    ProviderDefinition("apigateway:apis", "resource_id", "ApiId", "AWS/ApiGateway", excluded_resource_type="/stages"),
+    # "arn:aws:scheduler:ap-northeast-1:123456789012:schedule-group/name-of-schedulegroup"
+    ProviderDefinition("scheduler:schedule-group", "resource_id", "ScheduleGroup", "AWS/Scheduler"),
+)
 
-@metric_provider("apigateway:apis")
-class ApiGatewayV2MetricsProvider(ResourceGroupsTaggingAPITargetMetricsProviderBase):
-    """API Gateway V2(HttpApi) Metrics Provider"""
+_NAME_RULES: Final[Mapping[str, Callable[[str], str]]] = {
+    "resource_id": lambda arn: parse_arn(arn).resource_id,
+    "resource": lambda arn: parse_arn(arn).resource,
+}
 
-    # api stage ARN is like below
-    # "arn:aws:apigateway:ap-northeast-1::/apis/abcd1234fg/stages/$default"
-    arn_api_stage = re.compile("^arn:aws:apigateway:[^:]*::/apis/[^/]*/stages/.*")
 
-    def create_resource_filter(self, pattern: Optional[str]) -> Callable[[str], bool]:
-        """Creates filter with default one and filter stage ARNs"""
-        original_filter = super().create_resource_filter(pattern)
+class DeclaredTargetMetricsProviderBase(ResourceGroupsTaggingAPITargetMetricsProviderBase):
+    """Provider of a resource type declared by a ProviderDefinition
 
-        def composed_filter(arn: str) -> bool:
-            return original_filter(arn) and self.arn_api_stage.match(arn) is None
+    The rules of the definition are looked up once when the class is compiled, not per ARN.
+    """
 
-        return composed_filter
+    definition: ProviderDefinition
+    _name_of: Callable[[str], str]
+    _dimension_value_of: Callable[[str], str]
+    dimensions_per_resource = True
 
     def get_resource_name(self, arn: str) -> str:
         """Gets resource name
 
         Args:
-            arn (T): resource
+            arn (str): resource
 
         Returns:
             str: resource name
         """
-        return self.arn_pattern_name_by_slash.sub("", arn, 1)
+        return self._name_of(arn)
 
     def dimensions(self, metric_name: str, arn: str) -> Sequence[Mapping[str, str]]:
         """Gets alarm dimensions
 
         Args:
             metric_name (str): metric name
-            arn (T): resource
+            arn (str): resource
 
         Returns:
             Sequence[Mapping[str, str]]: alarm dimensions
         """
-        api_id = self.get_resource_name(arn)
-        return [{"Name": "ApiId", "Value": api_id}]
+        return [{"Name": self.definition.dimension_name, "Value": self._dimension_value_of(arn)}]
 
     def get_default_namespace(self) -> str:
         """Gets alarm namespace
@@ -304,42 +342,79 @@ class ApiGatewayV2MetricsProvider(ResourceGroupsTaggingAPITargetMetricsProviderB
         Returns:
             str: alarm namespace
         """
-        return "AWS/ApiGateway"
-
+        return self.definition.default_namespace
 
-@metric_provider("scheduler:schedule-group")
-class EventBridgeSchedulerMetricsProvider(ResourceGroupsTaggingAPITargetMetricsProviderBase):
-    """EventBridge Scheduler Metrics Provider"""
-
-    def get_resource_name(self, arn: str) -> str:
-        """Gets resource name
+    def create_resource_filter(
+        self, pattern: Optional[NamePatterns], exclude_pattern: Optional[NamePatterns] = None
+    ) -> Callable[[str], bool]:
+        """Gets resource filter function, excluding the ARNs of the excluded resource type
 
         Args:
-            arn (T): resource
+            pattern (Optional[NamePatterns]): filter condition(s) for resource name to include
+            exclude_pattern (Optional[NamePatterns]): filter condition(s) for resource name to exclude
 
         Returns:
-            str: resource name
+            Callable[[str], bool]: function of predicate for resource name matches
         """
-        # "arn:aws:scheduler:ap-northeast-1:123456789012:schedule-group/name-of-schedulegroup"
-        return self.arn_pattern_name_by_slash.sub("", arn, 1)
+        name_filter = super().create_resource_filter(pattern, exclude_pattern)
+        excluded = self.definition.excluded_resource_type
+        if not excluded:
+            return name_filter
 
-    def dimensions(self, metric_name: str, arn: str) -> Sequence[Mapping[str, str]]:
-        """Gets alarm dimensions
-
-        Args:
-            metric_name (str): metric name
-            arn (T): resource
+        def composed_filter(arn: str) -> bool:
+            return excluded not in parse_arn(arn).resource_type and name_filter(arn)
 
-        Returns:
-            Sequence[Mapping[str, str]]: alarm dimensions
-        """
-        name = self.get_resource_name(arn)
-        return [{"Name": "ScheduleGroup", "Value": name}]
+        return composed_filter
 
-    def get_default_namespace(self) -> str:
-        """Gets alarm namespace
 
-        Returns:
-            str: alarm namespace
-        """
-        return "AWS/Scheduler"
+def compile_provider_definitions(
+    definitions: Iterable[ProviderDefinition],
+) -> dict[str, type[DeclaredTargetMetricsProviderBase]]:
+    """Compiles provider definitions into a table of provider classes by resource type
+
+    Args:
+        definitions (Iterable[ProviderDefinition]): provider definitions
+
+    Returns:
+        dict[str, type[DeclaredTargetMetricsProviderBase]]: provider classes by resource type
+
+    Raises:
+        ValueError: if a definition has an unknown rule
+    """
+    table: dict[str, type[DeclaredTargetMetricsProviderBase]] = {}
+    for definition in definitions:
+        name_of = _NAME_RULES.get(definition.name_rule)
+        if name_of is None:
+            raise ValueError(f"unknown name rule of {definition.resource_type}: {definition.name_rule}")
+        dimension_value_rules: dict[str, Callable[[str], str]] = {"name": name_of, "arn": lambda arn: arn}
+        dimension_value_of = dimension_value_rules.get(definition.dimension_value_rule)
+        if dimension_value_of is None:
+            raise ValueError(
+                f"unknown dimension value rule of {definition.resource_type}: {definition.dimension_value_rule}"
+            )
+
+        cls = type(
+            _provider_class_name(definition.resource_type),
+            (DeclaredTargetMetricsProviderBase,),
+            {
+                "__module__": __name__,
+                "definition": definition,
+                "_name_of": staticmethod(name_of),
+                "_dimension_value_of": staticmethod(dimension_value_of),
+            },
+        )
+        table[definition.resource_type] = metric_provider(definition.resource_type)(cls)
+
+    return table
+
+
+def _provider_class_name(resource_type: str) -> str:
+    # "scheduler:schedule-group" -> "SchedulerScheduleGroupMetricsProvider"
+    words = re.split(r"[^0-9A-Za-z]+", resource_type)
+    return "".join(w[:1].upper() + w[1:] for w in words) + provider_class_name_postfix
+
+
+# providers of the declared resource types, loaded by the facade
+DECLARED_PROVIDERS: Final[Mapping[str, type[DeclaredTargetMetricsProviderBase]]] = compile_provider_definitions(
+    PROVIDER_DEFINITIONS
+)
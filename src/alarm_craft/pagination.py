@@ -0,0 +1,74 @@
+import queue
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Mapping, Optional, Union
+
+if TYPE_CHECKING:
+    from alarm_craft.hedging import RequestHedger
+
+# max number of pages fetched ahead of the caller
+DEFAULT_LOOKAHEAD = 2
+
+
+class _Done:
+    pass
+
+
+def prefetch_pages(
+    fetch_page: Callable[[str], Mapping[str, Any]],
+    next_token_key: str,
+    lookahead: int = DEFAULT_LOOKAHEAD,
+    hedger: Optional["RequestHedger"] = None,
+) -> Iterable[Mapping[str, Any]]:
+    """Iterates pages of a paginated API, fetching the next page in the background while the caller processes one
+
+    Args:
+        fetch_page (Callable[[str], Mapping[str, Any]]): function calling the API with the token, empty for the first
+        next_token_key (str): key of the next token in the response
+        lookahead (int): max number of pages fetched ahead
+        hedger (Optional[RequestHedger]): hedger of the slow page calls, which must be idempotent
+
+    Yields:
+        Mapping[str, Any]: response of each page
+    """
+    pages: queue.Queue[Union[Mapping[str, Any], BaseException, _Done]] = queue.Queue(maxsize=max(lookahead, 1))
+    stopped = threading.Event()
+
+    def _put(item: Union[Mapping[str, Any], BaseException, _Done]) -> bool:
+        # waits for the room, giving up when the caller stops iterating
+        while not stopped.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _fetch_pages() -> None:
+        token = ""
+        try:
+            while True:
+                resp = hedger.call(lambda: fetch_page(token)) if hedger else fetch_page(token)
+                if not _put(resp):
+                    return
+
+                token = resp.get(next_token_key) or ""
+                if not token:
+                    # no more results
+                    break
+        except BaseException as e:
+            _put(e)
+            return
+        _put(_Done())
+
+    fetcher = threading.Thread(target=_fetch_pages, daemon=True)
+    fetcher.start()
+    try:
+        while True:
+            item = pages.get()
+            if isinstance(item, _Done):
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stopped.set()
@@ -0,0 +1,65 @@
+import threading
+from typing import Iterable
+
+
+class AlarmQuotaGate:
+    """Gate keeping the number of alarms in the account under the quota
+
+    Creating a new alarm takes a slot, and deleting an alarm gives it back.
+    Creations wait for deletions running alongside when no slot is left.
+    """
+
+    def __init__(self, quota: int, existing_alarm_names: Iterable[str]) -> None:
+        """Constructor
+
+        Args:
+            quota (int): maximum number of alarms in the account
+            existing_alarm_names (Iterable[str]): names of all the alarms in the account
+        """
+        self.existing_alarm_names = set(existing_alarm_names)
+        self.slots = quota - len(self.existing_alarm_names)
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def acquire(self, alarm_name: str) -> None:
+        """Takes a slot to create an alarm, blocking until one is available
+
+        Updating an existing alarm takes no slot.
+
+        Args:
+            alarm_name (str): alarm name
+        """
+        if alarm_name in self.existing_alarm_names:
+            return
+
+        with self._cond:
+            self._cond.wait_for(lambda: self.slots > 0 or self._closed)
+            self.slots -= 1
+
+    def cancel(self, alarm_name: str) -> None:
+        """Gives back the slot taken for an alarm failed to create
+
+        Args:
+            alarm_name (str): alarm name
+        """
+        if alarm_name not in self.existing_alarm_names:
+            self.release(1)
+
+    def release(self, num_alarms: int) -> None:
+        """Gives back slots of alarms deleted
+
+        Args:
+            num_alarms (int): number of alarms deleted
+        """
+        with self._cond:
+            self.slots += num_alarms
+            self._cond.notify_all()
+
+    def close(self) -> None:
+        """Stops blocking as no more slots will be given back
+
+        Alarms still waiting are created beyond the quota and left to fail by the service.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
@@ -0,0 +1,114 @@
+import logging
+import threading
+from time import monotonic, sleep
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Token Bucket rate limiter shared among worker threads"""
+
+    def __init__(self, calls_per_sec: Optional[float], capacity: int = 1) -> None:
+        """Constructor
+
+        Args:
+            calls_per_sec (Optional[float]): number of tokens refilled per second, or None for no limit
+            capacity (int): maximum number of tokens to be accumulated
+        """
+        self.calls_per_sec = calls_per_sec
+        self.capacity = capacity
+        # the bucket starts empty so that the first call is also paced
+        self._tokens = 0.0
+        self._last_refill = monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Takes a token, blocking until one is available"""
+        if not self.calls_per_sec:
+            return
+
+        with self._lock:
+            self._refill()
+
+            # reserve a token. the negative balance is the queue of callers waiting for refill
+            self._tokens -= 1
+            wait = -self._tokens / self.calls_per_sec if self._tokens < 0 else 0.0
+
+        if wait > 0:
+            sleep(wait)
+
+    def _refill(self) -> None:
+        now = monotonic()
+        if self.calls_per_sec:
+            elapsed = now - self._last_refill
+            self._tokens = min(float(self.capacity), self._tokens + elapsed * self.calls_per_sec)
+        self._last_refill = now
+
+    def on_success(self) -> None:
+        """Feedback on a call made without retries. the fixed rate ignores it"""
+        pass
+
+    def on_throttled(self) -> None:
+        """Feedback on a call throttled or retried. the fixed rate ignores it"""
+        pass
+
+
+# well-known error codes for throttling of AWS APIs
+THROTTLING_ERROR_CODES = frozenset(
+    [
+        "Throttling",
+        "ThrottlingException",
+        "ThrottledException",
+        "RequestLimitExceeded",
+        "TooManyRequestsException",
+        "RequestThrottled",
+    ]
+)
+
+
+class AdaptiveTokenBucket(TokenBucket):
+    """Token Bucket adapting its rate by AIMD (additive increase / multiplicative decrease)
+
+    The rate goes up by `increase_step` on every successful call,
+    and is cut by `decrease_factor` on every throttled call.
+    """
+
+    def __init__(
+        self,
+        calls_per_sec: Optional[float],
+        min_calls_per_sec: float = 0.5,
+        max_calls_per_sec: float = 100.0,
+        increase_step: float = 0.1,
+        decrease_factor: float = 0.5,
+    ) -> None:
+        """Constructor
+
+        Args:
+            calls_per_sec (Optional[float]): initial rate, or None to start with `max_calls_per_sec`
+            min_calls_per_sec (float): lower bound of the rate
+            max_calls_per_sec (float): upper bound of the rate
+            increase_step (float): calls per second added on a success
+            decrease_factor (float): factor multiplied on a throttling
+        """
+        initial = calls_per_sec if calls_per_sec else max_calls_per_sec
+        super().__init__(min(max(initial, min_calls_per_sec), max_calls_per_sec))
+        self.min_calls_per_sec = min_calls_per_sec
+        self.max_calls_per_sec = max_calls_per_sec
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+
+    def on_success(self) -> None:
+        """Increases the rate additively"""
+        with self._lock:
+            self._refill()  # tokens until now are refilled at the current rate
+            assert self.calls_per_sec
+            self.calls_per_sec = min(self.calls_per_sec + self.increase_step, self.max_calls_per_sec)
+
+    def on_throttled(self) -> None:
+        """Decreases the rate multiplicatively"""
+        with self._lock:
+            self._refill()
+            assert self.calls_per_sec
+            self.calls_per_sec = max(self.calls_per_sec * self.decrease_factor, self.min_calls_per_sec)
+            logger.debug("throttled. calls per second decreased to %s", self.calls_per_sec)
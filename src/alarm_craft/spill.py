@@ -0,0 +1,253 @@
+import itertools
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import weakref
+from typing import Any, Iterable, Iterator, Optional, Sequence, Union, overload
+
+from .alarm_record import AlarmRecord
+
+# rough bytes of an alarm held in memory other than its texts like the name and the description
+RECORD_OVERHEAD_IN_BYTES = 512
+
+# rows inserted or fetched at once
+BATCH_SIZE = 1000
+
+_SCHEMA = """
+CREATE TABLE required (seq INTEGER PRIMARY KEY, priority INTEGER, name TEXT, description TEXT, payload TEXT);
+CREATE TABLE current (pos INTEGER PRIMARY KEY, name TEXT, description TEXT);
+CREATE TABLE change_set (kind TEXT, pos INTEGER, seq INTEGER, PRIMARY KEY (kind, pos));
+"""
+
+
+class MemoryMeter:
+    """Meter of the memory held by the alarms against a ceiling"""
+
+    def __init__(self, limit_in_mb: float) -> None:
+        """Constructor
+
+        Args:
+            limit_in_mb (float): ceiling of the memory in MB
+        """
+        self.limit_in_bytes = limit_in_mb * 1024 * 1024
+        self.used_in_bytes = 0
+
+    def add(self, *texts: str) -> bool:
+        """Counts an alarm held in memory
+
+        Args:
+            texts (str): texts of the alarm like the name and the description
+
+        Returns:
+            bool: True if the memory exceeds the ceiling
+        """
+        self.used_in_bytes += sum(sys.getsizeof(t) for t in texts) + RECORD_OVERHEAD_IN_BYTES
+        return self.used_in_bytes > self.limit_in_bytes
+
+
+class SpillStore:
+    """On-disk store of the required and the existing alarms to compute the change set from
+
+    The store is an SQLite database in a temporary file, which is removed when the store is no longer referenced.
+    """
+
+    def __init__(self, directory: Optional[str] = None) -> None:
+        """Constructor
+
+        Args:
+            directory (Optional[str]): directory of the database file, the temporary directory if not given
+        """
+        fd, self.file_path = tempfile.mkstemp(prefix="alarm-craft-", suffix=".sqlite", dir=directory)
+        os.close(fd)
+        # iterated by the threads applying the alarms
+        self._conn = sqlite3.connect(self.file_path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._change_set_lengths: dict[str, int] = {}
+        self._finalizer = weakref.finalize(self, _remove_database, self._conn, self.file_path)
+
+    def add_required(self, records: Iterable[AlarmRecord]) -> None:
+        """Stores the required alarms
+
+        Args:
+            records (Iterable[AlarmRecord]): required alarms in the order to apply in the same priority
+        """
+        rows = ((r.priority, r.name, r.description, json.dumps(r.to_dict(), separators=(",", ":"))) for r in records)
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO required (priority, name, description, payload) VALUES (?, ?, ?, ?)", rows
+            )
+
+    def add_current(self, alarms: Iterable[tuple[str, Optional[str]]]) -> None:
+        """Stores the existing alarms
+
+        Args:
+            alarms (Iterable[tuple[str, Optional[str]]]): names, and the descriptions with the fingerprints
+                                                          or None for those without
+        """
+        with self._lock:
+            self._conn.executemany("INSERT INTO current (name, description) VALUES (?, ?)", alarms)
+
+    def created(self) -> Iterator[int]:
+        """Iterates the required alarms not existing, in the order to apply
+
+        Yields:
+            int: sequence number of the required alarm
+        """
+        yield from (row[0] for row in self._query("""
+            SELECT r.seq FROM required r LEFT JOIN current c ON r.name = c.name
+            WHERE c.name IS NULL ORDER BY r.priority DESC, r.seq
+        """))
+
+    def matched(self) -> Iterator[tuple[int, str, Optional[str]]]:
+        """Iterates the required alarms existing, in the order to apply
+
+        Yields:
+            tuple[int, str, Optional[str]]: sequence number and the description of the required alarm,
+                                            and the description of the existing one
+        """
+        yield from self._query("""
+            SELECT r.seq, r.description, c.description
+            FROM required r JOIN current c ON r.name = c.name ORDER BY r.priority DESC, r.seq
+        """)
+
+    def deleted(self) -> Iterator[str]:
+        """Iterates the existing alarms not required
+
+        Yields:
+            str: alarm name
+        """
+        yield from (row[0] for row in self._query("""
+            SELECT c.name FROM current c LEFT JOIN required r ON c.name = r.name WHERE r.name IS NULL ORDER BY c.pos
+        """))
+
+    def index(self) -> None:
+        """Indexes the alarms by name to join them"""
+        with self._lock:
+            self._conn.execute("CREATE INDEX IF NOT EXISTS required_name ON required (name)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS current_name ON current (name)")
+
+    def add_change_set(self, entries: Iterable[tuple[str, int]]) -> None:
+        """Stores the alarms of the change set
+
+        Entries are read in batches, so they can be produced by a query on this store.
+
+        Args:
+            entries (Iterable[tuple[str, int]]): kinds of the lists like `create` and the sequence numbers
+                                                 of the required alarms, in the order in each list
+        """
+        entries = iter(entries)
+        while batch := list(itertools.islice(entries, BATCH_SIZE)):
+            rows = []
+            for kind, seq in batch:
+                pos = self._change_set_lengths.get(kind, 0)
+                self._change_set_lengths[kind] = pos + 1
+                rows.append((kind, pos, seq))
+            with self._lock:
+                self._conn.executemany("INSERT INTO change_set (kind, pos, seq) VALUES (?, ?, ?)", rows)
+
+    def change_set(self, kind: str) -> "SpilledAlarms":
+        """Gets a list of the change set
+
+        Args:
+            kind (str): kind of the list like `create`
+
+        Returns:
+            SpilledAlarms: list of the alarms read from the store
+        """
+        return SpilledAlarms(self, kind, self._change_set_lengths.get(kind, 0))
+
+    def close(self) -> None:
+        """Removes the database"""
+        self._finalizer()
+
+    def _query(self, sql: str, params: Sequence[Any] = ()) -> Iterator[tuple[Any, ...]]:
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(BATCH_SIZE)
+            if not rows:
+                return
+            yield from rows
+
+
+class SpilledAlarms(Sequence[AlarmRecord]):
+    """List of the alarms in a change set, read from the spill store on demand"""
+
+    def __init__(self, store: SpillStore, kind: str, length: int) -> None:
+        """Constructor
+
+        Args:
+            store (SpillStore): spill store
+            kind (str): kind of the list
+            length (int): number of the alarms
+        """
+        self.store = store
+        self.kind = kind
+        self.length = length
+
+    @overload
+    def __getitem__(self, index: int) -> AlarmRecord: ...  # noqa: D105, E704
+
+    @overload
+    def __getitem__(self, index: slice) -> Sequence[AlarmRecord]: ...  # noqa: D105, E704
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[AlarmRecord, Sequence[AlarmRecord]]:
+        """Gets the alarm(s) at the position
+
+        Args:
+            index (Union[int, slice]): position
+
+        Returns:
+            Union[AlarmRecord, Sequence[AlarmRecord]]: alarm, or a list of the alarms for a slice
+
+        Raises:
+            IndexError: if the position is out of range
+        """
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.length))]
+
+        pos = index + self.length if index < 0 else index
+        if not 0 <= pos < self.length:
+            raise IndexError(index)
+        ((priority, payload),) = self.store._query(
+            """
+            SELECT r.priority, r.payload FROM change_set s JOIN required r ON s.seq = r.seq
+            WHERE s.kind = ? AND s.pos = ?
+            """,
+            (self.kind, pos),
+        )
+        return AlarmRecord.from_props(json.loads(payload), priority=priority)
+
+    def __iter__(self) -> Iterator[AlarmRecord]:
+        """Iterates the alarms in order
+
+        Yields:
+            AlarmRecord: alarm
+        """
+        for priority, payload in self.store._query(
+            """
+            SELECT r.priority, r.payload FROM change_set s JOIN required r ON s.seq = r.seq
+            WHERE s.kind = ? ORDER BY s.pos
+            """,
+            (self.kind,),
+        ):
+            yield AlarmRecord.from_props(json.loads(payload), priority=priority)
+
+    def __len__(self) -> int:
+        """Number of the alarms
+
+        Returns:
+            int: number of the alarms
+        """
+        return self.length
+
+
+def _remove_database(conn: sqlite3.Connection, file_path: str) -> None:
+    conn.close()
+    if os.path.exists(file_path):
+        os.remove(file_path)
@@ -0,0 +1,64 @@
+import pytest
+
+from alarm_craft.monitoring_targets.arn import Arn, parse_arn
+
+
+@pytest.mark.parametrize(
+    "arn, expected",
+    [
+        (
+            "arn:aws:lambda:ap-northeast-1:123456789012:function:my-function",
+            Arn("aws", "lambda", "ap-northeast-1", "123456789012", "function:my-function", "function", "my-function"),
+        ),
+        (
+            "arn:aws:lambda:ap-northeast-1:123456789012:function:my-function:1",
+            Arn(
+                "aws", "lambda", "ap-northeast-1", "123456789012", "function:my-function:1", "function", "my-function:1"
+            ),
+        ),
+        (
+            "arn:aws:sns:ap-northeast-1:123456789012:my-topic",
+            Arn("aws", "sns", "ap-northeast-1", "123456789012", "my-topic", "", "my-topic"),
+        ),
+        (
+            "arn:aws:events:ap-northeast-1:123456789012:rule/my-bus/my-rule",
+            Arn("aws", "events", "ap-northeast-1", "123456789012", "rule/my-bus/my-rule", "rule/my-bus", "my-rule"),
+        ),
+        (
+            "arn:aws:apigateway:ap-northeast-1::/apis/abcd1234fg/stages/$default",
+            Arn(
+                "aws",
+                "apigateway",
+                "ap-northeast-1",
+                "",
+                "/apis/abcd1234fg/stages/$default",
+                "/apis/abcd1234fg/stages",
+                "$default",
+            ),
+        ),
+        (
+            "arn:aws-cn:sqs:cn-north-1:123456789012:my-queue",
+            Arn("aws-cn", "sqs", "cn-north-1", "123456789012", "my-queue", "", "my-queue"),
+        ),
+    ],
+)
+def test_parse_arn(arn: str, expected: Arn):
+    """Test ARNs are split into the fields
+
+    Args:
+        arn (str): ARN
+        expected (Arn): expected fields
+    """
+    assert parse_arn(arn) == expected
+
+
+def test_parse_arn_cached():
+    """Test an ARN is parsed once"""
+    arn = "arn:aws:lambda:ap-northeast-1:123456789012:function:cached"
+    assert parse_arn(arn) is parse_arn(arn)
+
+
+def test_parse_not_arn():
+    """Test a string not an ARN is rejected"""
+    with pytest.raises(ValueError):
+        parse_arn("my-function")
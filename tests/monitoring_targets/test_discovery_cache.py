@@ -0,0 +1,108 @@
+from pathlib import Path
+
+import pytest
+from moto import mock_sts
+from pytest_mock import MockerFixture
+
+from alarm_craft.monitoring_targets import get_target_metrics
+from alarm_craft.monitoring_targets.discovery_cache import DiscoveryCache, from_config
+
+
+@pytest.fixture(autouse=True)
+def sts():
+    """Mock STS to resolve the account"""
+    with mock_sts():
+        yield
+
+
+def test_put_and_get(tmp_path: Path):
+    """Test ARNs are cached per resource type and tags
+
+    Args:
+        tmp_path (Path): temporary directory path
+    """
+    cache = DiscoveryCache(str(tmp_path / "cache"), 60)
+    arns = ["arn:aws:sqs:ap-northeast-1:123456789012:queue1"]
+
+    assert cache.get("sqs:queue", None) is None
+    cache.put("sqs:queue", {"a": "1", "b": "2"}, arns)
+
+    assert cache.get("sqs:queue", {"b": "2", "a": "1"}) == arns
+    assert cache.get("sqs:queue", {"a": "1"}) is None
+    assert cache.get("lambda:function", {"a": "1", "b": "2"}) is None
+    # read by another run
+    assert DiscoveryCache(str(tmp_path / "cache"), 60).get("sqs:queue", {"a": "1", "b": "2"}) == arns
+
+
+def test_expired(mocker: MockerFixture, tmp_path: Path):
+    """Test an entry older than the TTL is not used
+
+    Args:
+        mocker (MockerFixture): mocker
+        tmp_path (Path): temporary directory path
+    """
+    mock_time = mocker.patch("alarm_craft.monitoring_targets.discovery_cache.time.time")
+    mock_time.return_value = 1000.0
+    cache = DiscoveryCache(str(tmp_path), 60)
+    cache.put("sqs:queue", None, ["arn"])
+
+    mock_time.return_value = 1060.0
+    assert cache.get("sqs:queue", None) == ["arn"]
+    mock_time.return_value = 1061.0
+    assert cache.get("sqs:queue", None) is None
+
+
+def test_invalidate_and_broken_file(tmp_path: Path):
+    """Test entries are removed by the invalidation and a broken file is ignored
+
+    Args:
+        tmp_path (Path): temporary directory path
+    """
+    cache = DiscoveryCache(str(tmp_path), 60)
+    cache.put("sqs:queue", None, ["arn1"])
+    cache.put("sns:topic", None, ["arn2"])
+
+    for file_path in tmp_path.glob("*.json.gz"):
+        file_path.write_bytes(b"broken")
+    assert cache.get("sqs:queue", None) is None
+
+    assert cache.invalidate() == 2
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_discovery_with_cache(mocker: MockerFixture, tmp_path: Path):
+    """Test resources cached are not scanned again
+
+    Args:
+        mocker (MockerFixture): mocker
+        tmp_path (Path): temporary directory path
+    """
+    mock_boto3 = mocker.patch("alarm_craft.monitoring_targets.target_metrics_provider_rgta.boto3")
+    mock_get_resources = mock_boto3.client.return_value.get_resources
+    mock_get_resources.return_value = {
+        "ResourceTagMappingList": [{"ResourceARN": "arn:aws:sqs:ap-northeast-1:123456789012:queue1"}]
+    }
+
+    config = {
+        "globals": {"discovery_cache": {"directory": str(tmp_path), "ttl_in_sec": 60}},
+        "resources": {
+            "sqs": {"target_resource_type": "sqs:queue", "alarm": {"metrics": ["m"]}},
+        },
+    }
+
+    first = list(get_target_metrics(config))
+    second = list(get_target_metrics(config))
+
+    assert first == second
+    assert [p["TargetResource"]["ResourceName"] for p in second] == ["queue1"]
+    mock_get_resources.assert_called_once()
+
+    cache = from_config(config)
+    assert cache and cache.invalidate() == 1
+    list(get_target_metrics(config))
+    assert mock_get_resources.call_count == 2
+
+
+def test_not_configured():
+    """Test no cache is used without the config"""
+    assert from_config({"resources": {}}) is None
@@ -0,0 +1,127 @@
+import time
+
+import pytest
+from pytest_mock import MockerFixture
+
+from alarm_craft.monitoring_targets import get_target_metrics
+
+
+def _config(num_resources: int):
+    # distinct tags so that every resource config is scanned separately
+    return {
+        "resources": {
+            f"res{i}": {
+                "target_resource_type": "sqs:queue",
+                "target_resource_tags": {"Name": f"queue{i}"},
+                "alarm": {"metrics": ["m"]},
+            }
+            for i in range(num_resources)
+        },
+    }
+
+
+def test_concurrent_discovery_in_order(mocker: MockerFixture):
+    """Test providers discover resources concurrently, keeping the order of the resource configs
+
+    Args:
+        mocker (MockerFixture): mocker
+    """
+    mock_boto3 = mocker.patch("alarm_craft.monitoring_targets.target_metrics_provider_rgta.boto3")
+    mock_get_resources = mock_boto3.client.return_value.get_resources
+
+    num_resources = 6
+    latency = 0.2
+
+    def _slow_get_resources(**kwargs):
+        i = int(kwargs["TagFilters"][0]["Values"][0].removeprefix("queue"))
+        time.sleep(latency * (num_resources - i) / num_resources)  # the first one is the slowest
+        return {"ResourceTagMappingList": [{"ResourceARN": f"arn:aws:sqs:ap-northeast-1:123456789012:queue{i}"}]}
+
+    mock_get_resources.side_effect = _slow_get_resources
+
+    before = time.time()
+    alarm_params = list(get_target_metrics(_config(num_resources)))
+    after = time.time()
+
+    assert [p["TargetResource"]["ResourceName"] for p in alarm_params] == [f"queue{i}" for i in range(num_resources)]
+    assert (after - before) < latency * 2
+
+
+def test_concurrent_discovery_error(mocker: MockerFixture):
+    """Test an error in a provider is raised after the metrics of the preceding providers
+
+    Args:
+        mocker (MockerFixture): mocker
+    """
+    mock_boto3 = mocker.patch("alarm_craft.monitoring_targets.target_metrics_provider_rgta.boto3")
+    mock_get_resources = mock_boto3.client.return_value.get_resources
+
+    def _get_resources(**kwargs):
+        name = kwargs["TagFilters"][0]["Values"][0]
+        if name == "queue1":
+            raise ValueError("dummy")
+        return {"ResourceTagMappingList": [{"ResourceARN": f"arn:aws:sqs:ap-northeast-1:123456789012:{name}"}]}
+
+    mock_get_resources.side_effect = _get_resources
+
+    alarm_params = get_target_metrics(_config(3))
+    assert next(iter(alarm_params))["TargetResource"]["ResourceName"] == "queue0"
+    with pytest.raises(ValueError):
+        list(alarm_params)
+
+
+def test_discovery_lookahead(mocker: MockerFixture):
+    """Test providers discover metrics only up to the lookahead ahead of the consumer
+
+    Args:
+        mocker (MockerFixture): mocker
+    """
+    produced = {"p0": 0, "p1": 0}
+
+    class _Provider:
+        def __init__(self, name: str):
+            self.name = name
+
+        def get_metric_alarms(self):
+            for i in range(100):
+                produced[self.name] += 1
+                yield {"TargetResource": {"ResourceName": f"{self.name}-{i}"}}
+
+    mocker.patch(
+        "alarm_craft.monitoring_targets.facade._get_target_metrics_providers",
+        return_value=[_Provider("p0"), _Provider("p1")],
+    )
+
+    lookahead = 5
+    alarm_params = iter(get_target_metrics({"globals": {}, "resources": {}}, lookahead=lookahead))
+    assert next(alarm_params)["TargetResource"]["ResourceName"] == "p0-0"
+    time.sleep(0.2)
+    # the queued ones, and the one waiting for room
+    assert produced["p0"] <= lookahead + 2
+    assert produced["p1"] <= lookahead + 1
+
+    names = [p["TargetResource"]["ResourceName"] for p in alarm_params]
+    assert names == [f"p0-{i}" for i in range(1, 100)] + [f"p1-{i}" for i in range(100)]
+
+
+def test_discovery_stopped(mocker: MockerFixture):
+    """Test providers stop when the consumer stops
+
+    Args:
+        mocker (MockerFixture): mocker
+    """
+
+    class _Provider:
+        def get_metric_alarms(self):
+            i = 0
+            while True:
+                i += 1
+                yield {"TargetResource": {"ResourceName": f"res{i}"}}
+
+    mocker.patch("alarm_craft.monitoring_targets.facade._get_target_metrics_providers", return_value=[_Provider()])
+
+    alarm_params = iter(get_target_metrics({"globals": {}, "resources": {}}, lookahead=1))
+    next(alarm_params)
+    before = time.time()
+    alarm_params.close()  # type: ignore
+    assert time.time() - before < 1
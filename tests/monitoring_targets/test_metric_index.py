@@ -0,0 +1,101 @@
+import boto3
+import pytest
+from moto import mock_cloudwatch
+from mypy_boto3_cloudwatch.client import CloudWatchClient
+from pytest_mock import MockerFixture
+
+from alarm_craft.monitoring_targets import get_target_metrics
+from alarm_craft.monitoring_targets.metric_index import MetricIndex
+
+
+@pytest.fixture()
+def cloudwatch_client():
+    """Create mock cloudwatch client for tests
+
+    Yields:
+        CloudWatchClient : mocked by moto
+    """
+    with mock_cloudwatch():
+        cloudwatch_client = boto3.client("cloudwatch")
+        yield cloudwatch_client
+
+
+def _put_metric(client: CloudWatchClient, namespace: str, metric_name: str, dimensions: dict[str, str]) -> None:
+    client.put_metric_data(
+        Namespace=namespace,
+        MetricData=[
+            {
+                "MetricName": metric_name,
+                "Dimensions": [{"Name": k, "Value": v} for k, v in dimensions.items()],
+                "Value": 1.0,
+            }
+        ],
+    )
+
+
+def test_contains(cloudwatch_client: CloudWatchClient, mocker: MockerFixture):
+    """Test looking up metrics in the index
+
+    Args:
+        cloudwatch_client (CloudWatchClient): mocked client
+        mocker (MockerFixture): mocker
+    """
+    _put_metric(cloudwatch_client, "AWS/SQS", "NumberOfMessagesReceived", {"QueueName": "queue1"})
+    _put_metric(cloudwatch_client, "AWS/Lambda", "Errors", {"FunctionName": "func1", "Resource": "func1"})
+
+    index = MetricIndex()
+    spy_list_metrics = mocker.spy(index._get_client(), "list_metrics")
+
+    assert index.contains("AWS/SQS", "NumberOfMessagesReceived", [{"Name": "QueueName", "Value": "queue1"}])
+    assert not index.contains("AWS/SQS", "NumberOfMessagesReceived", [{"Name": "QueueName", "Value": "queue2"}])
+    assert not index.contains("AWS/SQS", "NumberOfMessagesSent", [{"Name": "QueueName", "Value": "queue1"}])
+    assert index.contains(
+        "AWS/Lambda", "Errors", [{"Name": "Resource", "Value": "func1"}, {"Name": "FunctionName", "Value": "func1"}]
+    )
+    assert not index.contains("AWS/Lambda", "Errors", [{"Name": "FunctionName", "Value": "func1"}])
+    assert not index.contains("AWS/SNS", "NumberOfNotificationsFailed", [{"Name": "TopicName", "Value": "topic1"}])
+
+    # scanned once per namespace
+    assert index.contains("AWS/SQS", "NumberOfMessagesReceived", [{"Name": "QueueName", "Value": "queue1"}])
+    assert [c.kwargs["Namespace"] for c in spy_list_metrics.call_args_list] == ["AWS/SQS", "AWS/Lambda", "AWS/SNS"]
+
+
+def test_get_target_metrics_with_metric_index(cloudwatch_client: CloudWatchClient, mocker: MockerFixture):
+    """Test the alarms of the metrics not existing are skipped with the metric index
+
+    Args:
+        cloudwatch_client (CloudWatchClient): mocked client
+        mocker (MockerFixture): mocker
+    """
+    _put_metric(cloudwatch_client, "AWS/SQS", "NumberOfMessagesReceived", {"QueueName": "queue1"})
+    _put_metric(cloudwatch_client, "AWS/SQS", "NumberOfMessagesSent", {"QueueName": "queue1"})
+    _put_metric(cloudwatch_client, "AWS/SQS", "NumberOfMessagesSent", {"QueueName": "queue2"})
+
+    mock_boto3 = mocker.patch("alarm_craft.monitoring_targets.target_metrics_provider_rgta.boto3")
+    mock_boto3.client.return_value.get_resources.return_value = {
+        "ResourceTagMappingList": [
+            {"ResourceARN": "arn:aws:sqs:ap-northeast-1:123456789012:queue1"},
+            {"ResourceARN": "arn:aws:sqs:ap-northeast-1:123456789012:queue2"},
+        ]
+    }
+    config = {
+        "globals": {"metric_index": True},
+        "resources": {
+            "sqs": {
+                "target_resource_type": "sqs:queue",
+                "alarm": {"metrics": ["NumberOfMessagesReceived", "NumberOfMessagesSent"]},
+            },
+        },
+    }
+
+    alarms = list(get_target_metrics(config))
+    actual = [(a["TargetResource"]["ResourceName"], a["AlarmProps"]["MetricName"]) for a in alarms]
+    assert actual == [
+        ("queue1", "NumberOfMessagesReceived"),
+        ("queue1", "NumberOfMessagesSent"),
+        ("queue2", "NumberOfMessagesSent"),
+    ]
+
+    # all the combinations without the metric index
+    config["globals"] = {}
+    assert len(list(get_target_metrics(config))) == 4
@@ -0,0 +1,61 @@
+import pytest
+
+from alarm_craft.monitoring_targets.name_matcher import NameMatcher
+
+
+@pytest.mark.parametrize(
+    "include, exclude, name, expected",
+    [
+        # a single regular expression, matched at the beginning
+        ("^myproj-(dev|prod)-", None, "myproj-dev-func", True),
+        ("^myproj-(dev|prod)-", None, "myproj-stg-func", False),
+        ("func", None, "myproj-func", False),
+        # literal prefixes
+        (["^myproj-", "other-"], None, "other-func", True),
+        (["^myproj-", "other-"], None, "another-func", False),
+        # literal suffixes
+        ([".*-dlq$", "^.*-main$"], None, "orders-dlq", True),
+        ([".*-dlq$", "^.*-main$"], None, "orders-dlq-2", False),
+        # literals and regular expressions
+        (["^myproj-", ".*-dlq$", "^[a-z]+-[0-9]+$"], None, "queue-123", True),
+        (["^myproj-", ".*-dlq$", "^[a-z]+-[0-9]+$"], None, "queue-abc", False),
+        # exclusion
+        (None, "^myproj-test-", "myproj-test-func", False),
+        (None, "^myproj-test-", "myproj-func", True),
+        (["^myproj-"], [".*-dlq$", "^myproj-test-"], "myproj-orders-dlq", False),
+        (["^myproj-"], [".*-dlq$", "^myproj-test-"], "myproj-orders", True),
+        # back references are kept working
+        (["^(a+)-\\1$", "^x"], None, "aa-aa", True),
+        (["^(a+)-\\1$", "^x"], None, "aa-a", False),
+        # global flags apply only to their own patterns
+        (["(?i)^abc", "^D[e]f"], None, "DEF", False),
+        (["(?i)^abc", "^D[e]f"], None, "ABC", True),
+        (None, ["(?i)^abc", "^D[e]f"], "DEF", True),
+    ],
+)
+def test_name_matcher(include, exclude, name: str, expected: bool):
+    """Test names are matched with include and exclude patterns
+
+    Args:
+        include (NamePatterns): patterns to include
+        exclude (NamePatterns): patterns to exclude
+        name (str): resource name
+        expected (bool): expected result
+    """
+    assert NameMatcher(include, exclude).matches(name) == expected
+
+
+def test_name_matcher_fast_path():
+    """Test literal prefixes and suffixes are not compiled into the regular expression"""
+    matcher = NameMatcher(["^myproj-", "other-", ".*-dlq$", "^[a-z]+-[0-9]+$"])
+
+    assert matcher.include
+    assert [r.pattern for r in matcher.include.regexes] == ["(?:^[a-z]+-[0-9]+$)"]
+
+
+def test_name_matcher_global_flags():
+    """Test patterns with global flags are not combined with the others"""
+    matcher = NameMatcher(["(?i)^abc", "^[a-z]+-[0-9]+$", "^Def|^x"])
+
+    assert matcher.include
+    assert [r.pattern for r in matcher.include.regexes] == ["(?i)^abc", "(?:^[a-z]+-[0-9]+$)|(?:^Def|^x)"]
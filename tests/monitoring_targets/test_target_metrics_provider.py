@@ -219,6 +219,31 @@ def test_base_provider_optional_config_key(mocker: MockerFixture):
     mock_get_resources.assert_called_once_with(PaginationToken="", ResourceTypeFilters=[target_resource_type])
 
 
+def test_base_provider_priority(mocker: MockerFixture):
+    """Test for ResourceGroupsTaggingAPITargetMetricsProviderBase with the priority of the resources
+
+    Args:
+        mocker (MockerFixture): mocker
+    """
+    mock_boto3 = mocker.patch("alarm_craft.monitoring_targets.target_metrics_provider_rgta.boto3")
+    mock_get_resources = mock_boto3.client.return_value.get_resources
+
+    resource_name = "my-test-1"
+    config = _config()
+    config["priority"] = 10
+
+    mock_get_resources.return_value = {
+        "ResourceTagMappingList": [
+            {"ResourceARN": "arn:aws:myservice:ap-northeast-1:123456789012:myresource:" + resource_name},
+        ]
+    }
+
+    target = MyTestMetricsProvider(config, "myservice")  # type: ignore
+    alarms = list(target.get_metric_alarms())
+
+    assert [a["TargetResource"] for a in alarms] == [TargetResource(ResourceName=resource_name, Priority=10)]
+
+
 def test_alarm_namespace_for_custom_metric(mocker: MockerFixture):
     """Test for ResourceGroupsTaggingAPITargetMetricsProviderBase with alarm param overrides
 
@@ -367,6 +392,47 @@ def test_api_pagenation(mocker: MockerFixture):
     assert num_calls == 0
 
 
+def test_metric_templates(mocker: MockerFixture):
+    """Test the alarm properties of the metrics are compiled into templates unless they depend on the resource
+
+    Args:
+        mocker (MockerFixture): mocker
+    """
+    mock_boto3 = mocker.patch("alarm_craft.monitoring_targets.target_metrics_provider_rgta.boto3")
+    mock_boto3.client.return_value.get_resources.return_value = {
+        "ResourceTagMappingList": [
+            {"ResourceARN": "arn:aws:myservice:ap-northeast-1:123456789012:myresource:my-test-1"},
+            {"ResourceARN": "arn:aws:myservice:ap-northeast-1:123456789012:myresource:my-test-2"},
+        ]
+    }
+    config = _config(alarm_metrics=["m1", "m2"])
+    config["alarm"]["alarm_param_overrides"] = {"m2": {"Threshold": 10}}  # type: ignore
+
+    target = MyTestMetricsProvider(config, "myservice")
+    templates = target.compile_metric_templates()
+    assert templates is not None
+    assert [(t.metric_name, t.namespace, t.overrides) for t in templates] == [
+        ("m1", "AWS/MyService", None),
+        ("m2", "AWS/MyService", {"Threshold": 10}),
+    ]
+
+    class PerResourceMetricsProvider(MyTestMetricsProvider):
+        dimensions_per_resource = True
+
+        def metric_names(self, resource: str) -> Sequence[str]:
+            return ["m1", "m2"] if resource.endswith("-1") else ["m1"]
+
+    target = PerResourceMetricsProvider(config, "myservice")
+    assert target.compile_metric_templates() is None
+
+    alarms = list(target.get_metric_alarms())
+    actual = [(a["TargetResource"]["ResourceName"], a["AlarmProps"]["MetricName"]) for a in alarms]
+    assert actual == [("my-test-1", "m1"), ("my-test-1", "m2"), ("my-test-2", "m1")]
+    assert alarms[1]["AlarmProps"]["Threshold"] == 10  # type: ignore
+    # dimensions are shared among the metrics of a resource
+    assert alarms[0]["AlarmProps"]["Dimensions"] is alarms[1]["AlarmProps"]["Dimensions"]
+
+
 def _config(
     target_resource_type: str = "",
     target_resource_tags: dict[str, str] = {},
@@ -1,6 +1,7 @@
 import boto3
 import pytest
 from moto import mock_apigateway
+from pytest_mock import MockerFixture
 
 from alarm_craft.models import AlarmProps, MetricAlarmParam, TargetResource
 
@@ -183,6 +184,32 @@ def test_apigateway_provider_through_get_target_metrics():
     assert expects == actuals
 
 
+def test_apigateway_provider_pagination(mocker: MockerFixture):
+    """Test for ApiGatewayMetricsProvider paginating REST APIs with the largest page size
+
+    Args:
+        mocker (MockerFixture): mocker
+    """
+    from alarm_craft.monitoring_targets.target_metrics_provider_apigw import ApiGatewayMetricsProvider
+
+    mock_boto3 = mocker.patch("alarm_craft.monitoring_targets.target_metrics_provider_apigw.boto3")
+    mock_get_rest_apis = mock_boto3.client.return_value.get_rest_apis
+    pages = {
+        "": {
+            "items": [{"name": "restapi-1", "tags": {"tagkey1": "tagvalue1"}}, {"name": "restapi-2"}],
+            "position": "p1",
+        },
+        "p1": {"items": [{"name": "restapi-3", "tags": {"tagkey1": "tagvalue1"}}]},
+    }
+    mock_get_rest_apis.side_effect = lambda limit, position="": pages[position]
+
+    config = _config(target_resource_tags={"tagkey1": "tagvalue1"})
+    target = ApiGatewayMetricsProvider(config, "apigateway")
+
+    assert list(target.get_monitoring_target_resources()) == ["restapi-1", "restapi-3"]
+    assert [c.kwargs for c in mock_get_rest_apis.call_args_list] == [{"limit": 500}, {"limit": 500, "position": "p1"}]
+
+
 def _config(
     target_resource_type: str = "",
     target_resource_tags: dict[str, str] = {},
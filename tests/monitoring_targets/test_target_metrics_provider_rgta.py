@@ -2,6 +2,11 @@ import pytest
 from pytest_mock import MockerFixture
 
 from alarm_craft.monitoring_targets import get_target_metrics
+from alarm_craft.monitoring_targets.target_metrics_provider_rgta import (
+    DECLARED_PROVIDERS,
+    ProviderDefinition,
+    compile_provider_definitions,
+)
 
 
 def _test_params(name1: str = "test1"):
@@ -43,8 +48,8 @@ def _test_params(name1: str = "test1"):
     ]
 
     arn = [
-        f"arn:aws:{s}:ap-northeast-1:123456789012{resource_type[i]}{name_sep[i]}{name1}"
-        for i, s in enumerate(service_name)
+        f"arn:aws:{t.split(':')[0]}:ap-northeast-1:123456789012{resource_type[i]}{name_sep[i]}{name1}"
+        for i, t in enumerate(target_resource_type)
     ]
 
     index_for_sfn = 3  # take care for this magic number in case you add a param
@@ -196,7 +201,7 @@ def test_custom_namespaces(mocker: MockerFixture):
 
     def _mock_do_get_resources(*args, **kwargs):
         res_types = kwargs["ResourceTypeFilters"]
-        return {"ResourceTagMappingList": mock_result[res_types[0]]}
+        return {"ResourceTagMappingList": [r for t in res_types for r in mock_result[t]]}
 
     mock_get_resources.side_effect = _mock_do_get_resources
 
@@ -205,14 +210,52 @@ def test_custom_namespaces(mocker: MockerFixture):
     }
 
     alarm_params = list(get_target_metrics(config))
+    # resource configs without tags are scanned at once
+    mock_get_resources.assert_called_once()
     for i, expected_param in enumerate(expects):
         assert expected_param["TargetResource"] == alarm_params[i]["TargetResource"]
         for k, v in expected_param["AlarmProps"].items():
             assert alarm_params[i]["AlarmProps"][k] == v  # type: ignore
 
 
+def test_declared_provider(mocker: MockerFixture):
+    """Test a resource type added by a provider definition
+
+    Args:
+        mocker (MockerFixture): mocker
+    """
+    definition = ProviderDefinition("kinesis:stream", "resource_id", "StreamName", "AWS/Kinesis")
+    mocker.patch.dict(DECLARED_PROVIDERS, compile_provider_definitions([definition]))
+    mock_boto3 = mocker.patch("alarm_craft.monitoring_targets.target_metrics_provider_rgta.boto3")
+    mock_boto3.client.return_value.get_resources.return_value = {
+        "ResourceTagMappingList": [{"ResourceARN": "arn:aws:kinesis:ap-northeast-1:123456789012:stream/test1"}]
+    }
+    config = {
+        "resources": {
+            "kinesis": {
+                "target_resource_type": "kinesis:stream",
+                "alarm": {"metrics": ["GetRecords.IteratorAgeMilliseconds"]},
+            },
+        },
+    }
+
+    alarms = list(get_target_metrics(config))
+    assert len(alarms) == 1
+    assert alarms[0]["TargetResource"]["ResourceName"] == "test1"
+    assert alarms[0]["AlarmProps"]["Dimensions"] == [{"Name": "StreamName", "Value": "test1"}]
+    assert alarms[0]["AlarmProps"]["Namespace"] == "AWS/Kinesis"
+    assert DECLARED_PROVIDERS["kinesis:stream"].__name__ == "KinesisStreamMetricsProvider"
+
+
+def test_declared_provider_unknown_rule():
+    """Test compiling a provider definition with an unknown rule"""
+    definition = ProviderDefinition("kinesis:stream", "stream", "StreamName", "AWS/Kinesis")  # type: ignore
+    with pytest.raises(ValueError, match="unknown name rule"):
+        compile_provider_definitions([definition])
+
+
 def test_apigateway_v2_metrics_provider_create_resource_filter(mocker: MockerFixture):
-    """Test create_resource_filter() of ApiGatewayV2MetricsProvider
+    """Test create_resource_filter() of the provider for apigateway:apis
 
     Args:
         mocker (MockerFixture): mocker
@@ -255,3 +298,70 @@ def test_apigateway_v2_metrics_provider_create_resource_filter(mocker: MockerFix
         "efgh5678CD",
         "ijkl9012CD",
     ]
+
+    config["resources"]["test"]["target_resource_name_pattern"] = [".*CD$", "^abcd"]
+    config["resources"]["test"]["target_resource_name_exclude_pattern"] = "^efgh"
+    alarm_params = list(get_target_metrics(config))
+    actual = [a["TargetResource"]["ResourceName"] for a in alarm_params]
+    assert actual == [
+        "abcd1234AB",
+        "ijkl9012CD",
+    ]
+
+
+def test_shared_scan_grouped_by_tags(mocker: MockerFixture):
+    """Test resource configs are scanned together per tag set, and the ARNs are split out to each resource type
+
+    Args:
+        mocker (MockerFixture): mocker
+    """
+    mock_boto3 = mocker.patch("alarm_craft.monitoring_targets.target_metrics_provider_rgta.boto3")
+    mock_get_resources = mock_boto3.client.return_value.get_resources
+
+    lambda_arn = "arn:aws:lambda:ap-northeast-1:123456789012:function:test1"
+    sqs_arn = "arn:aws:sqs:ap-northeast-1:123456789012:test1"
+    sns_arn = "arn:aws:sns:ap-northeast-1:123456789012:test1"
+    arns_by_type = {"lambda:function": [lambda_arn], "sqs:queue": [sqs_arn], "sns:topic": [sns_arn]}
+
+    def _mock_do_get_resources(*args, **kwargs):
+        arns = [arn for t in kwargs["ResourceTypeFilters"] for arn in arns_by_type[t]]
+        return {"ResourceTagMappingList": [{"ResourceARN": arn} for arn in arns]}
+
+    mock_get_resources.side_effect = _mock_do_get_resources
+
+    def _resource_config(resource_type: str, tags: dict):
+        return {"target_resource_type": resource_type, "target_resource_tags": tags, "alarm": {"metrics": ["m"]}}
+
+    config = {
+        "resources": {
+            "lambda": _resource_config("lambda:function", {"a": "1", "b": "2"}),
+            "sqs": _resource_config("sqs:queue", {"b": "2", "a": "1"}),
+            "sns": _resource_config("sns:topic", {"c": "3"}),
+        },
+    }
+
+    alarm_params = list(get_target_metrics(config))
+
+    assert [p["AlarmProps"]["Dimensions"][0]["Name"] for p in alarm_params] == [
+        "FunctionName",
+        "QueueName",
+        "TopicName",
+    ]
+    assert mock_get_resources.call_count == 2
+    assert sorted(c.kwargs["ResourceTypeFilters"] for c in mock_get_resources.call_args_list) == [
+        ["lambda:function", "sqs:queue"],
+        ["sns:topic"],
+    ]
+
+
+def test_shared_scan_same_service():
+    """Test resource types of the same service are scanned separately"""
+    from alarm_craft.monitoring_targets.target_metrics_provider_rgta import ResourceScanPlanner
+
+    planner = ResourceScanPlanner()
+    for resource_type in ["apigateway:apis", "apigateway:restapis", "lambda:function", "sqs:queue"]:
+        planner.register(resource_type, None)
+    planner._plan()
+
+    scans = {tuple(scan.resource_types) for scan in planner._scans.values()}
+    assert scans == {("lambda:function", "sqs:queue"), ("apigateway:apis",), ("apigateway:restapis",)}
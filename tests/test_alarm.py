@@ -1,15 +1,22 @@
+import copy
+import functools
 import itertools
 import time
-from typing import Union
+from typing import Any, Optional, Union
 
 import boto3
 import pytest
+from botocore.exceptions import ClientError, EndpointConnectionError
 from moto import mock_cloudwatch
 from mypy_boto3_cloudwatch.client import CloudWatchClient
+from pytest_mock import MockerFixture
 
 from alarm_craft.alarm import AlarmHandler
 from alarm_craft.config_loader import DEFAULT_ALARM_NAME_PREFIX, DEFAULT_ALARM_PARAMS
+from alarm_craft.deadline import Deadline
 from alarm_craft.models import AlarmProps, MetricAlarmParam, TargetResource
+from alarm_craft.rate_limiter import AdaptiveTokenBucket
+from alarm_craft.spill import SpilledAlarms
 
 
 @pytest.fixture()
@@ -49,7 +56,7 @@ def test_alarm_props_from_metric_alarm_params(cloudwatch_client: CloudWatchClien
         },
     }
     handler = AlarmHandler(_config(alarm_name_prefix=prefix))
-    create_alarms, _, _ = handler.get_alarms_change_set([params])
+    create_alarms, _, _, _ = handler.get_alarms_change_set([params])
     for alm in create_alarms:
         assert f"{prefix}{resource_name}-{alarm_metric}" == alm["AlarmName"]
 
@@ -428,6 +435,489 @@ def test_delete_with_interval(cloudwatch_client: CloudWatchClient, interval: int
     assert (after - before) >= (interval / 1000 * num_api_calls)
 
 
+@pytest.mark.parametrize("concurrency", [2, 4])
+def test_update_with_concurrency(cloudwatch_client: CloudWatchClient, concurrency: int):
+    """Tests creating alarms concurrently hides the latency of API calls
+
+    Args:
+        cloudwatch_client (CloudWatchClient): CloudWatchClient
+        concurrency (int): number of concurrent API calls
+    """
+    num_alarms = 8
+    latency = 0.2
+    handler = AlarmHandler(_config(), concurrency)
+
+    put_metric_alarm = handler.cloudwatch.put_metric_alarm
+
+    def _slow_put_metric_alarm(**kwargs):
+        time.sleep(latency)
+        return put_metric_alarm(**kwargs)
+
+    handler.cloudwatch.put_metric_alarm = _slow_put_metric_alarm  # type: ignore
+
+    alarms = [
+        AlarmProps(
+            AlarmName=f"{DEFAULT_ALARM_NAME_PREFIX}{i}",
+            AlarmDescription="",
+            MetricName="dummy",
+            Namespace="dummy",
+            Dimensions=[],
+        )
+        for i in range(num_alarms)
+    ]
+
+    before = time.time()
+    handler.update_alarms(alarms, [], [])
+    after = time.time()
+
+    curr_alarms = cloudwatch_client.describe_alarms(
+        AlarmNamePrefix=DEFAULT_ALARM_NAME_PREFIX,
+        AlarmTypes=["MetricAlarm"],
+    )["MetricAlarms"]
+
+    assert len(curr_alarms) == num_alarms
+    assert (after - before) < latency * num_alarms / concurrency * 1.5
+
+
+def test_update_with_deadline(cloudwatch_client: CloudWatchClient):
+    """Tests no more alarms are created once the measured latency tells they wouldn't finish before the deadline
+
+    Args:
+        cloudwatch_client (CloudWatchClient): CloudWatchClient
+    """
+    num_alarms = 10
+    latency = 0.2
+    deadline_in_sec = 0.7
+    handler = AlarmHandler(_config())
+
+    put_metric_alarm = handler.cloudwatch.put_metric_alarm
+
+    def _slow_put_metric_alarm(**kwargs):
+        time.sleep(latency)
+        return put_metric_alarm(**kwargs)
+
+    handler.cloudwatch.put_metric_alarm = _slow_put_metric_alarm  # type: ignore
+
+    alarms = [
+        AlarmProps(
+            AlarmName=f"{DEFAULT_ALARM_NAME_PREFIX}{i}",
+            AlarmDescription="",
+            MetricName="dummy",
+            Namespace="dummy",
+            Dimensions=[],
+        )
+        for i in range(num_alarms)
+    ]
+
+    before = time.time()
+    result = handler.update_alarms(alarms, [], [], deadline=Deadline(deadline_in_sec))
+    after = time.time()
+
+    curr_alarms = cloudwatch_client.describe_alarms(
+        AlarmNamePrefix=DEFAULT_ALARM_NAME_PREFIX,
+        AlarmTypes=["MetricAlarm"],
+    )["MetricAlarms"]
+
+    assert (after - before) < deadline_in_sec
+    assert 0 < len(curr_alarms) < num_alarms
+    assert sorted([a["AlarmName"] for a in curr_alarms] + [a["AlarmName"] for a in result.not_created]) == sorted(
+        a["AlarmName"] for a in alarms
+    )
+    assert not result.failed_to_create
+
+
+def test_update_under_alarm_quota(cloudwatch_client: CloudWatchClient):
+    """Tests alarms exceeding the quota are created after deleting alarms makes room
+
+    Args:
+        cloudwatch_client (CloudWatchClient): CloudWatchClient
+    """
+    num_alarms = 4
+    for i in range(num_alarms):
+        cloudwatch_client.put_metric_alarm(
+            AlarmName=f"{DEFAULT_ALARM_NAME_PREFIX}old-{i}",
+            MetricName="dummy",
+            Namespace="dummy",
+            EvaluationPeriods=1,
+            ComparisonOperator="GreaterThanOrEqualToThreshold",
+        )
+
+    # room for one more alarm
+    config = _config()
+    config["globals"]["alarm_quota"] = num_alarms + 1
+    handler = AlarmHandler(config, concurrency=2)
+    handler.delete_batch_size = 1  # interleaves deletions with the creation
+
+    events = []
+    put_metric_alarm = handler.cloudwatch.put_metric_alarm
+    delete_alarms = handler.cloudwatch.delete_alarms
+
+    def _put_metric_alarm(**kwargs):
+        events.append(1)
+        return put_metric_alarm(**kwargs)
+
+    def _slow_delete_alarms(**kwargs):
+        time.sleep(0.1)
+        resp = delete_alarms(**kwargs)
+        events.append(-len(kwargs["AlarmNames"]))
+        return resp
+
+    handler.cloudwatch.put_metric_alarm = _put_metric_alarm  # type: ignore
+    handler.cloudwatch.delete_alarms = _slow_delete_alarms  # type: ignore
+
+    alarms = [
+        AlarmProps(
+            AlarmName=f"{DEFAULT_ALARM_NAME_PREFIX}new-{i}",
+            AlarmDescription="",
+            MetricName="dummy",
+            Namespace="dummy",
+            Dimensions=[],
+        )
+        for i in range(num_alarms)
+    ]
+    to_delete = [f"{DEFAULT_ALARM_NAME_PREFIX}old-{i}" for i in range(num_alarms)]
+    result = handler.update_alarms(alarms, to_delete, [])
+
+    assert not result.failed_to_create
+    assert not result.failed_to_delete
+    # the number of alarms never exceeds the quota
+    assert max(itertools.accumulate(events, initial=num_alarms)) <= num_alarms + 1
+    curr_alarms = cloudwatch_client.describe_alarms(AlarmNamePrefix=DEFAULT_ALARM_NAME_PREFIX)["MetricAlarms"]
+    assert sorted(a["AlarmName"] for a in curr_alarms) == sorted(a["AlarmName"] for a in alarms)
+
+
+def test_update_with_concurrency_and_interval(cloudwatch_client: CloudWatchClient):
+    """Tests the rate of API calls is limited by the interval even if called concurrently
+
+    Args:
+        cloudwatch_client (CloudWatchClient): CloudWatchClient
+    """
+    num_alarms = 6
+    interval = 100
+    config = _config()
+    config["globals"]["api_call_intervals_in_millis"] = interval
+
+    handler = AlarmHandler(config, concurrency=3)
+
+    alarms = [
+        AlarmProps(
+            AlarmName=f"{DEFAULT_ALARM_NAME_PREFIX}{i}",
+            AlarmDescription="",
+            MetricName="dummy",
+            Namespace="dummy",
+            Dimensions=[],
+        )
+        for i in range(num_alarms)
+    ]
+
+    before = time.time()
+    handler.update_alarms(alarms, [], [])
+    after = time.time()
+
+    curr_alarms = cloudwatch_client.describe_alarms(
+        AlarmNamePrefix=DEFAULT_ALARM_NAME_PREFIX,
+        AlarmTypes=["MetricAlarm"],
+    )["MetricAlarms"]
+
+    assert len(curr_alarms) == num_alarms
+    assert (after - before) >= (interval / 1000 * num_alarms)
+
+
+def test_update_with_adaptive_rate_control(cloudwatch_client: CloudWatchClient, mocker: MockerFixture):
+    """Tests the adaptive rate control gets feedbacks of retries and throttling errors
+
+    Args:
+        cloudwatch_client (CloudWatchClient): CloudWatchClient
+        mocker (MockerFixture): mocker
+    """
+    config = _config()
+    config["globals"]["api_call_rate_control"] = "adaptive"
+    handler = AlarmHandler(config)
+
+    on_success = mocker.spy(AdaptiveTokenBucket, "on_success")
+    on_throttled = mocker.spy(AdaptiveTokenBucket, "on_throttled")
+
+    put_metric_alarm = handler.cloudwatch.put_metric_alarm
+    num_calls = 0
+
+    def _put_metric_alarm(**kwargs):
+        nonlocal num_calls
+        num_calls += 1
+        resp = put_metric_alarm(**kwargs)
+        if num_calls == 2:
+            resp["ResponseMetadata"]["RetryAttempts"] = 2
+        if num_calls == 4:
+            raise ClientError({"Error": {"Code": "Throttling", "Message": "Rate exceeded"}}, "PutMetricAlarm")
+        return resp
+
+    handler.cloudwatch.put_metric_alarm = _put_metric_alarm  # type: ignore
+
+    alarms = [
+        AlarmProps(
+            AlarmName=f"{DEFAULT_ALARM_NAME_PREFIX}{i}",
+            AlarmDescription="",
+            MetricName="dummy",
+            Namespace="dummy",
+            Dimensions=[],
+        )
+        for i in range(4)
+    ]
+
+    handler.retry_backoff_in_sec = 0
+    result = handler.update_alarms(alarms, [], [])
+
+    assert result.failed_to_create == []
+    assert on_success.call_count == 3  # includes the retry of the throttled one
+    assert on_throttled.call_count == 2
+
+
+def test_delete_alarms_alongside_creation(cloudwatch_client: CloudWatchClient):
+    """Tests deleting alarms runs alongside creating alarms, with its own rate limit
+
+    Args:
+        cloudwatch_client (CloudWatchClient): CloudWatchClient
+    """
+    num_api_calls = 3
+    interval = 200
+    config = _config()
+    config["globals"]["api_call_intervals_in_millis"] = interval
+    handler = AlarmHandler(config)
+
+    alarm_names_to_delete = [f"{DEFAULT_ALARM_NAME_PREFIX}old-{i}" for i in range((num_api_calls - 1) * 100 + 1)]
+    for name in alarm_names_to_delete:
+        cloudwatch_client.put_metric_alarm(
+            AlarmName=name,
+            MetricName="dummy",
+            Namespace="dummy",
+            EvaluationPeriods=1,
+            ComparisonOperator="GreaterThanOrEqualToThreshold",
+        )
+    alarms_to_create = [
+        AlarmProps(
+            AlarmName=f"{DEFAULT_ALARM_NAME_PREFIX}new-{i}",
+            AlarmDescription="",
+            MetricName="dummy",
+            Namespace="dummy",
+            Dimensions=[],
+        )
+        for i in range(num_api_calls)
+    ]
+
+    before = time.time()
+    result = handler.update_alarms(alarms_to_create, alarm_names_to_delete, [])
+    after = time.time()
+
+    curr_alarms = cloudwatch_client.describe_alarms(
+        AlarmNamePrefix=DEFAULT_ALARM_NAME_PREFIX,
+        AlarmTypes=["MetricAlarm"],
+    )["MetricAlarms"]
+    assert {a["AlarmName"] for a in curr_alarms} == {a["AlarmName"] for a in alarms_to_create}
+    assert len(result.delete_batches) == num_api_calls
+    assert result.failed_to_delete == []
+
+    # both of them take `num_api_calls` intervals
+    assert (after - before) < (interval / 1000 * num_api_calls * 2)
+
+
+def test_delete_alarms_report_failures(cloudwatch_client: CloudWatchClient):
+    """Tests alarms failed to delete are reported per batch
+
+    Args:
+        cloudwatch_client (CloudWatchClient): CloudWatchClient
+    """
+    handler = AlarmHandler(_config())
+
+    alarm_names = [f"{DEFAULT_ALARM_NAME_PREFIX}{i}" for i in range(150)]
+    for name in alarm_names:
+        cloudwatch_client.put_metric_alarm(
+            AlarmName=name,
+            MetricName="dummy",
+            Namespace="dummy",
+            EvaluationPeriods=1,
+            ComparisonOperator="GreaterThanOrEqualToThreshold",
+        )
+    undeletable = {alarm_names[7], alarm_names[42], alarm_names[120]}
+
+    delete_alarms = handler.cloudwatch.delete_alarms
+
+    def _delete_alarms(**kwargs):
+        if undeletable.intersection(kwargs["AlarmNames"]):
+            # no alarms are deleted if any of them fails
+            raise ClientError({"Error": {"Code": "ResourceNotFound", "Message": "dummy"}}, "DeleteAlarms")
+        return delete_alarms(**kwargs)
+
+    handler.cloudwatch.delete_alarms = _delete_alarms  # type: ignore
+    handler.retry_attempts = 0
+
+    result = handler.update_alarms([], alarm_names, [])
+
+    batches = sorted(result.delete_batches, key=lambda b: len(b.alarm_names))
+    assert [len(b.alarm_names) for b in batches] == [50, 100]
+    assert batches[0].failed_alarm_names == [alarm_names[120]]
+    assert batches[1].failed_alarm_names == [alarm_names[7], alarm_names[42]]
+    assert sorted(result.failed_to_delete) == sorted(undeletable)
+
+    curr_alarms = cloudwatch_client.describe_alarms(
+        AlarmNamePrefix=DEFAULT_ALARM_NAME_PREFIX,
+        AlarmTypes=["MetricAlarm"],
+    )["MetricAlarms"]
+    assert {a["AlarmName"] for a in curr_alarms} == undeletable
+
+
+def test_delete_alarms_fail_batch_at_once(cloudwatch_client: CloudWatchClient):
+    """Tests a batch isn't bisected on errors failing the whole batch
+
+    Args:
+        cloudwatch_client (CloudWatchClient): CloudWatchClient
+    """
+    handler = AlarmHandler(_config())
+    handler.retry_attempts = 0
+    alarm_names = [f"{DEFAULT_ALARM_NAME_PREFIX}{i}" for i in range(150)]
+
+    calls = []
+
+    def _delete_alarms(**kwargs):
+        calls.append(kwargs["AlarmNames"])
+        raise ClientError({"Error": {"Code": "AccessDenied", "Message": "dummy"}}, "DeleteAlarms")
+
+    handler.cloudwatch.delete_alarms = _delete_alarms  # type: ignore
+
+    result = handler.update_alarms([], alarm_names, [])
+
+    assert len(calls) == 2
+    assert sorted(result.failed_to_delete) == sorted(alarm_names)
+
+
+def test_delete_alarms_connection_error(cloudwatch_client: CloudWatchClient):
+    """Tests a batch failed to reach the API is reported as failed alongside the creation
+
+    Args:
+        cloudwatch_client (CloudWatchClient): CloudWatchClient
+    """
+    handler = AlarmHandler(_config())
+    handler.retry_attempts = 0
+    alarm_names = [f"{DEFAULT_ALARM_NAME_PREFIX}old-{i}" for i in range(3)]
+
+    def _delete_alarms(**kwargs):
+        raise EndpointConnectionError(endpoint_url="https://monitoring.ap-northeast-1.amazonaws.com")
+
+    handler.cloudwatch.delete_alarms = _delete_alarms  # type: ignore
+
+    alarm = {
+        "AlarmName": f"{DEFAULT_ALARM_NAME_PREFIX}new-0",
+        "MetricName": "dummy",
+        "Namespace": "dummy",
+    }
+    result = handler.update_alarms([alarm], alarm_names, [])
+
+    assert result.failed_to_create == []
+    assert result.failed_to_delete == alarm_names
+
+
+def test_update_alarms_isolates_failures(cloudwatch_client: CloudWatchClient):
+    """Tests an alarm failed to create doesn't stop the others and is retried at the end
+
+    Args:
+        cloudwatch_client (CloudWatchClient): CloudWatchClient
+    """
+    handler = AlarmHandler(_config())
+    handler.retry_backoff_in_sec = 0
+
+    alarms = [
+        AlarmProps(
+            AlarmName=f"{DEFAULT_ALARM_NAME_PREFIX}{i}",
+            AlarmDescription="",
+            MetricName="dummy",
+            Namespace="dummy",
+            Dimensions=[],
+        )
+        for i in range(5)
+    ]
+    flaky_alarm = alarms[1]["AlarmName"]
+    broken_alarm = alarms[3]["AlarmName"]
+
+    put_metric_alarm = handler.cloudwatch.put_metric_alarm
+    calls: list[str] = []
+
+    def _put_metric_alarm(**kwargs):
+        calls.append(kwargs["AlarmName"])
+        if kwargs["AlarmName"] == broken_alarm or (kwargs["AlarmName"] == flaky_alarm and calls.count(flaky_alarm) < 3):
+            raise ClientError({"Error": {"Code": "InvalidParameterValue", "Message": "dummy"}}, "PutMetricAlarm")
+        return put_metric_alarm(**kwargs)
+
+    handler.cloudwatch.put_metric_alarm = _put_metric_alarm  # type: ignore
+
+    result = handler.update_alarms(alarms, [], [])
+
+    assert [f.alarm_param["AlarmName"] for f in result.failed_to_create] == [broken_alarm]
+    assert "InvalidParameterValue" in result.failed_to_create[0].error
+    assert calls.count(flaky_alarm) == 3
+    assert calls.count(broken_alarm) == 1 + handler.retry_attempts
+
+    curr_alarms = cloudwatch_client.describe_alarms(
+        AlarmNamePrefix=DEFAULT_ALARM_NAME_PREFIX,
+        AlarmTypes=["MetricAlarm"],
+    )["MetricAlarms"]
+    assert {a["AlarmName"] for a in curr_alarms} == {a["AlarmName"] for a in alarms} - {broken_alarm}
+
+
+def test_verify_alarms(mocker: MockerFixture, cloudwatch_client: CloudWatchClient):
+    """Tests only the alarms touched are verified by their names
+
+    Args:
+        mocker (MockerFixture): mocker
+        cloudwatch_client (CloudWatchClient): CloudWatchClient
+    """
+    for i in range(3):
+        _put_dummy_alarm(cloudwatch_client, f"{DEFAULT_ALARM_NAME_PREFIX}old-{i}")
+    _put_dummy_alarm(cloudwatch_client, "not-touched")
+
+    handler = AlarmHandler(_config())
+    alarms = [
+        AlarmProps(
+            AlarmName=f"{DEFAULT_ALARM_NAME_PREFIX}new-{i}",
+            AlarmDescription="",
+            MetricName="dummy",
+            Namespace="dummy",
+            Dimensions=[{"Name": "A", "Value": f"{i}"}],
+            Threshold=10,
+        )
+        for i in range(4)
+    ]
+    to_delete = [f"{DEFAULT_ALARM_NAME_PREFIX}old-{i}" for i in range(3)]
+    result = handler.update_alarms(alarms, to_delete, [])
+    result.failed_to_delete.append(to_delete[2])  # regarded as failed
+
+    # changes made by others after the update
+    cloudwatch_client.delete_alarms(AlarmNames=[f"{DEFAULT_ALARM_NAME_PREFIX}new-0"])
+    changed_alarm: dict[str, Any] = {**handler._get_common_alarm_params([]), **alarms[1], "Threshold": 20}
+    cloudwatch_client.put_metric_alarm(**changed_alarm)
+    _put_dummy_alarm(cloudwatch_client, to_delete[0])
+
+    spy_call_api = mocker.spy(handler, "_call_api")
+    verification = handler.verify_alarms(alarms, to_delete, [], result)
+
+    assert verification.verified == 6
+    assert verification.missing == [f"{DEFAULT_ALARM_NAME_PREFIX}new-0"]
+    assert verification.different == [f"{DEFAULT_ALARM_NAME_PREFIX}new-1"]
+    assert verification.not_deleted == [to_delete[0]]
+    # a batch of names instead of scanning the alarms
+    assert spy_call_api.call_count == 1
+    assert sorted(spy_call_api.call_args.kwargs["AlarmNames"]) == sorted(
+        [a["AlarmName"] for a in alarms] + to_delete[:2]
+    )
+
+
+def _put_dummy_alarm(cloudwatch_client: CloudWatchClient, alarm_name: str) -> None:
+    cloudwatch_client.put_metric_alarm(
+        AlarmName=alarm_name,
+        MetricName="dummy",
+        Namespace="dummy",
+        EvaluationPeriods=1,
+        ComparisonOperator="GreaterThanOrEqualToThreshold",
+    )
+
+
 def test_create_and_delete_alarms(cloudwatch_client: CloudWatchClient):
     """Tests creating and deleting alarms
 
@@ -518,8 +1008,8 @@ def test_create_changeset(cloudwatch_client: CloudWatchClient):
     ]
 
     handler = AlarmHandler(_config(alarm_name_prefix=alarm_name_prefix))
-    to_create, no_update, to_delete = handler.get_alarms_change_set(alarm_params)
-    no_update_alarm_names = {a["AlarmName"] for a in no_update}
+    to_create, to_update, no_update, to_delete = handler.get_alarms_change_set(alarm_params)
+    no_update_alarm_names = {a["AlarmName"] for a in itertools.chain(to_update, no_update)}
 
     assert {a["AlarmName"] for a in to_create} == {
         f"{alarm_name_prefix}20-m1",
@@ -541,6 +1031,218 @@ def test_create_changeset(cloudwatch_client: CloudWatchClient):
     }
 
 
+def test_create_changeset_in_priority_order(cloudwatch_client: CloudWatchClient):
+    """Tests alarms to create are ordered by the priority of the resources, keeping the order in the same priority
+
+    Args:
+        cloudwatch_client (CloudWatchClient): cloudwatch client
+    """
+    alarm_name_prefix = "test-priority-alarm-"
+    priorities = {"res0": None, "res1": 10, "res2": -1, "res3": 10, "res4": 0}
+    alarm_params = []
+    for name, priority in priorities.items():
+        target_resource = TargetResource(ResourceName=name)
+        if priority is not None:
+            target_resource["Priority"] = priority
+        alarm_params.append(MetricAlarmParam(TargetResource=target_resource, AlarmProps=AlarmProps(MetricName="m1")))
+
+    handler = AlarmHandler(_config(alarm_name_prefix=alarm_name_prefix))
+    to_create, _, _, _ = handler.get_alarms_change_set(alarm_params)
+
+    assert [a["AlarmName"] for a in to_create] == [
+        f"{alarm_name_prefix}{name}-m1" for name in ["res1", "res3", "res0", "res4", "res2"]
+    ]
+
+
+@pytest.mark.parametrize(
+    "diff_mode, memory_limit_in_mb", [("hash", None), ("merge-join", None), ("columnar", None), ("hash", 0)]
+)
+def test_create_changeset_with_drifts(
+    cloudwatch_client: CloudWatchClient, diff_mode: str, memory_limit_in_mb: Optional[float]
+):
+    """Tests existing alarms are compared with required ones by fingerprints or properties
+
+    Args:
+        cloudwatch_client (CloudWatchClient): cloudwatch client
+        diff_mode (str): diff mode
+        memory_limit_in_mb (Optional[float]): memory limit to spill the change set to disk
+    """
+    if diff_mode == "columnar":
+        pytest.importorskip("numpy")
+    alarm_name_prefix = "test-drift-alarm-"
+    additional_alarm_actions = ["arn:aws:sns:ap-northeast-1:123456789012:topic-1"]
+    handler = AlarmHandler(_config(alarm_name_prefix=alarm_name_prefix))
+    get_alarms_change_set = functools.partial(
+        handler.get_alarms_change_set, diff_mode=diff_mode, memory_limit_in_mb=memory_limit_in_mb
+    )
+
+    def _alarm_params(threshold_of_res1: int = 1):
+        params = [
+            MetricAlarmParam(
+                TargetResource=TargetResource(ResourceName=f"res{i}"),
+                AlarmProps=AlarmProps(
+                    MetricName="m1",
+                    Namespace="AWS/MyService",
+                    Dimensions=[{"Name": "MyResourceName", "Value": f"res{i}"}],
+                ),
+            )
+            for i in range(4)
+        ]
+        params[1]["AlarmProps"]["Threshold"] = threshold_of_res1
+        return params
+
+    # all the alarms exist as required
+    to_create, _, _, _ = get_alarms_change_set(_alarm_params(), additional_alarm_actions)
+    handler.update_alarms(to_create, [], additional_alarm_actions)
+
+    to_create, to_update, no_update, to_delete = get_alarms_change_set(_alarm_params(), additional_alarm_actions)
+    assert list(to_create) == []
+    assert list(to_update) == []
+    assert {a["AlarmName"] for a in no_update} == {f"{alarm_name_prefix}res{i}-m1" for i in range(4)}
+    assert to_delete == []
+    for a in no_update:
+        assert "[fingerprint:" in a["AlarmDescription"]
+
+    # an alarm created without the fingerprint is updated to embed it
+    legacy_alarm: dict = handler._get_common_alarm_params(additional_alarm_actions) | no_update[2]
+    legacy_alarm["AlarmDescription"] = "Metric Alarm for `m1` of res2"
+    cloudwatch_client.put_metric_alarm(**legacy_alarm)
+    # an alarm changed outside keeping its fingerprint is regarded as unchanged
+    changed_outside: dict = handler._get_common_alarm_params(additional_alarm_actions) | no_update[3]
+    changed_outside["Threshold"] = 100
+    cloudwatch_client.put_metric_alarm(**changed_outside)
+
+    # desired state of res1 changes
+    to_create, to_update, no_update, to_delete = get_alarms_change_set(
+        _alarm_params(threshold_of_res1=50), additional_alarm_actions
+    )
+    assert list(to_create) == []
+    assert {a["AlarmName"] for a in to_update} == {f"{alarm_name_prefix}res{i}-m1" for i in [1, 2]}
+    assert {a["AlarmName"] for a in no_update} == {f"{alarm_name_prefix}res{i}-m1" for i in [0, 3]}
+    assert to_delete == []
+
+    # desired actions change
+    to_create, to_update, no_update, to_delete = get_alarms_change_set(_alarm_params(), [])
+    assert {a["AlarmName"] for a in to_update} == {f"{alarm_name_prefix}res{i}-m1" for i in range(4)}
+
+
+@pytest.mark.parametrize(
+    "diff_mode, existing_in_name_order, memory_limit_in_mb",
+    [
+        ("merge-join", True, None),
+        ("merge-join", False, None),
+        ("columnar", False, None),
+        ("hash", False, 0),
+        ("hash", False, 7.5),
+        ("columnar", False, 7.5),
+    ],
+)
+def test_create_changeset_in_diff_modes(
+    cloudwatch_client: CloudWatchClient,
+    mocker: MockerFixture,
+    diff_mode: str,
+    existing_in_name_order: bool,
+    memory_limit_in_mb: Optional[float],
+):
+    """Tests the diff modes and the change set spilled to disk give the same change set as the hash mode
+
+    Args:
+        cloudwatch_client (CloudWatchClient): cloudwatch client
+        mocker (MockerFixture): mocker
+        diff_mode (str): diff mode
+        existing_in_name_order (bool): whether the existing alarms are listed in name order
+        memory_limit_in_mb (Optional[float]): memory limit to spill the change set to disk
+    """
+    if diff_mode == "columnar":
+        pytest.importorskip("numpy")
+    # an alarm counts as 1 MB. the 7 required alarms fit in 7.5 MB, and the existing ones exceed it
+    mocker.patch("alarm_craft.spill.RECORD_OVERHEAD_IN_BYTES", 1024 * 1024)
+
+    alarm_name_prefix = "test-merge-join-alarm-"
+    existing = ["res1", "res3", "res4", "res6", "res8"]
+    for name in existing if existing_in_name_order else reversed(existing):
+        _put_dummy_alarm(cloudwatch_client, f"{alarm_name_prefix}{name}-m1")
+
+    priorities = {"res5": None, "res4": None, "res0": 10, "res3": None, "res7": 10, "res1": -1, "res2": None}
+    alarm_params = []
+    for name, priority in priorities.items():
+        target_resource = TargetResource(ResourceName=name)
+        if priority is not None:
+            target_resource["Priority"] = priority
+        alarm_params.append(MetricAlarmParam(TargetResource=target_resource, AlarmProps=AlarmProps(MetricName="m1")))
+
+    handler = AlarmHandler(_config(alarm_name_prefix=alarm_name_prefix))
+    expected = handler.get_alarms_change_set(copy.deepcopy(alarm_params), diff_mode="hash")
+    actual = handler.get_alarms_change_set(
+        copy.deepcopy(alarm_params), diff_mode=diff_mode, memory_limit_in_mb=memory_limit_in_mb
+    )
+
+    assert [a["AlarmName"] for a in actual[0]] == [
+        f"{alarm_name_prefix}{name}-m1" for name in ["res0", "res7", "res5", "res2"]
+    ]
+    for expected_alarms, actual_alarms in zip(expected[:3], actual[:3]):
+        assert list(actual_alarms) == list(expected_alarms)
+        assert [a.priority for a in actual_alarms] == [a.priority for a in expected_alarms]
+    assert sorted(actual[3]) == sorted(expected[3]) == [f"{alarm_name_prefix}{name}-m1" for name in ["res6", "res8"]]
+    assert isinstance(actual[0], SpilledAlarms) == (memory_limit_in_mb is not None)
+
+    with pytest.raises(ValueError):
+        handler.get_alarms_change_set(alarm_params, diff_mode="unknown")
+
+
+def test_alarm_fingerprint_is_stable():
+    """Tests the fingerprint doesn't depend on the order of keys, dimensions and actions"""
+    from alarm_craft.alarm import _fingerprint
+
+    alarm1 = {
+        "MetricName": "m1",
+        "Namespace": "AWS/MyService",
+        "Threshold": 1,
+        "Dimensions": [{"Name": "A", "Value": "a"}, {"Name": "B", "Value": "b"}],
+        "AlarmActions": ["action1", "action2"],
+    }
+    alarm2 = {
+        "AlarmActions": ["action2", "action1"],
+        "Dimensions": [{"Name": "B", "Value": "b"}, {"Name": "A", "Value": "a"}],
+        "Threshold": 1.0,
+        "Namespace": "AWS/MyService",
+        "MetricName": "m1",
+        "AlarmDescription": "description is not a part of the fingerprint",
+    }
+    assert _fingerprint(alarm1) == _fingerprint(alarm2)
+    assert _fingerprint(alarm1) != _fingerprint(alarm1 | {"Threshold": 2})
+    assert _fingerprint(alarm1) != _fingerprint(alarm1 | {"Tags": [{"Key": "k", "Value": "v"}]})
+
+
+@pytest.mark.parametrize(
+    "dimensions",
+    [
+        [{"Name": "B", "Value": "b"}, {"Name": "A", "Value": "a"}],
+        [{"Name": "Name", "Value": 'quoted "value" \\ with\ttab'}],
+        [{"Name": "Name", "Value": "非ASCII"}],
+        [],
+    ],
+)
+def test_alarm_template_fingerprint(dimensions: list):
+    """Tests the fingerprint of a template is the same as computed on the whole params
+
+    Args:
+        dimensions (list): alarm dimensions
+    """
+    from alarm_craft.alarm import _AlarmTemplate, _fingerprint, _serialize_dimensions
+
+    common_param = {"Statistic": "Sum", "Tags": [{"Key": "k", "Value": "v"}], "AlarmActions": ["action1"]}
+    alarm_props = {"MetricName": "m1", "Namespace": "AWS/MyService", "Threshold": 1, "Dimensions": dimensions}
+    template = _AlarmTemplate("prefix-", common_param, alarm_props)
+
+    expected = _fingerprint({**common_param, **alarm_props})
+    assert template.fingerprint(_serialize_dimensions(dimensions)) == expected
+    assert template.name("res1") == "prefix-res1-m1"
+    assert template.description("res1", _serialize_dimensions(dimensions)) == (
+        f"Metric Alarm for `m1` of res1 [fingerprint:{expected}]"
+    )
+
+
 def test_describe_alarm_api_more_than_100(cloudwatch_client: CloudWatchClient):
     """Test on calling describe_alarm() with token
 
@@ -578,9 +1280,9 @@ def test_describe_alarm_api_more_than_100(cloudwatch_client: CloudWatchClient):
     ]
 
     handler = AlarmHandler(_config())
-    to_create, no_update, to_delete = handler.get_alarms_change_set(alarm_params)
+    to_create, to_update, no_update, to_delete = handler.get_alarms_change_set(alarm_params)
     assert len(list(to_create)) == offset + addition
-    assert len(list(no_update)) == num_current_alarms - offset
+    assert len(list(to_update)) + len(list(no_update)) == num_current_alarms - offset
     assert len(to_delete) == offset
 
 
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from alarm_craft.alarm_record import AlarmRecord
+
+
+def _props(resource_name: str, metric_name: str = "Errors") -> dict:
+    return {
+        "MetricName": metric_name,
+        "Namespace": "AWS/Lambda",
+        "Dimensions": [{"Name": "FunctionName", "Value": resource_name}],
+        "Threshold": 5,
+        "AlarmActions": ["arn:aws:sns:ap-northeast-1:123456789012:topic-1"],
+        "AlarmName": f"alarm-{resource_name}-{metric_name}",
+        "AlarmDescription": f"Metric Alarm for `{metric_name}` of {resource_name}",
+    }
+
+
+def test_record_as_params():
+    """Tests a record is read as the params of PutMetricAlarm API"""
+    props = _props("func1")
+    record = AlarmRecord.from_props(props)
+
+    assert record == props
+    assert dict(record) == props
+    assert record.to_dict() == props
+    assert sorted(record) == sorted(props)
+    assert len(record) == len(props)
+    assert record["Dimensions"] == props["Dimensions"]
+    assert "Threshold" in record
+    assert "Statistic" not in record
+    with pytest.raises(KeyError):
+        record["Statistic"]
+
+    common_param = {"Statistic": "Sum", "Threshold": 1}
+    assert {**common_param, **record} == common_param | record == {**common_param, **props}
+    assert json.loads(json.dumps({**record})) == props
+
+
+def test_record_without_optional_props():
+    """Tests a record of the props without namespace and dimensions"""
+    props = {"MetricName": "m1", "AlarmName": "alarm-m1", "AlarmDescription": "desc"}
+    record = AlarmRecord.from_props(props, name="alarm-renamed", priority=10)
+
+    assert record == {**props, "AlarmName": "alarm-renamed"}
+    assert record.priority == 10
+    with pytest.raises(KeyError):
+        record["Namespace"]
+
+
+def test_record_shares_objects():
+    """Tests records share the dimensions and the overrides, and are immutable"""
+    record1 = AlarmRecord.from_props(_props("func1", "Errors"))
+    record2 = AlarmRecord.from_props(_props("func1", "Throttles"))
+    record3 = AlarmRecord.from_props(_props("func2", "Errors"))
+
+    assert record1.dimensions is record2.dimensions
+    assert record1.dimensions != record3.dimensions
+    assert record1.overrides is record2.overrides is record3.overrides
+    assert record1.namespace is record3.namespace
+
+    assert not hasattr(record1, "__dict__")
+    with pytest.raises(AttributeError):
+        record1.name = "renamed"  # type: ignore
+    with pytest.raises(TypeError):
+        record1.overrides["Threshold"] = 10  # type: ignore
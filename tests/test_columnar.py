@@ -0,0 +1,70 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from alarm_craft.alarm_record import AlarmRecord  # noqa: E402
+from alarm_craft.columnar import AlarmTable, diff  # noqa: E402
+
+
+def _alarm(name: str, threshold: int = 1, fingerprint: str = "0") -> dict:
+    return {
+        "MetricName": "m1",
+        "Namespace": "AWS/MyService",
+        "Dimensions": [{"Name": "MyResourceName", "Value": name}],
+        "Threshold": threshold,
+        "AlarmName": f"alarm-{name}",
+        "AlarmDescription": f"Metric Alarm for `m1` of {name} [fingerprint:{fingerprint}]",
+    }
+
+
+def test_alarm_table():
+    """Tests rows of the table are built back into the records"""
+    alarms = [_alarm("res0"), _alarm("res1", threshold=2), _alarm("res2"), {"MetricName": "m2", **_alarm("res3")}]
+    alarms[3].pop("Namespace")
+    records = [AlarmRecord.from_props(a, priority=i) for i, a in enumerate(alarms)]
+    table = AlarmTable.from_alarms(records)
+
+    assert len(table) == 4
+    assert table.names.tolist() == [a["AlarmName"] for a in alarms]
+    assert table.profile_ids.tolist() == [0, 1, 0, 0]
+    assert len(table.profiles) == 2
+    for row, record in enumerate(records):
+        assert table.record(row) == record == alarms[row]
+        assert table.record(row).priority == row
+
+    rows = table.rows(np.array([2, 0, 3]))
+    assert len(rows) == 3
+    assert [r["AlarmName"] for r in rows] == ["alarm-res2", "alarm-res0", "alarm-res3"]
+    assert rows[-1] == alarms[3]
+    assert list(rows[1:]) == [alarms[0], alarms[3]]
+    with pytest.raises(IndexError):
+        rows[3]
+    assert list(table.rows()) == records
+
+
+def test_diff():
+    """Tests the change set computed on the columns"""
+    required = [_alarm("res3"), _alarm("res0", fingerprint="1"), _alarm("res2"), _alarm("res1"), _alarm("res4")]
+    table = AlarmTable.from_alarms([AlarmRecord.from_props(a) for a in required])
+    current_names = ["alarm-res9", "alarm-res0", "alarm-res1", "alarm-res2", "alarm-res5"]
+    current_descriptions = [
+        None,
+        _alarm("res0")["AlarmDescription"],
+        _alarm("res1")["AlarmDescription"],
+        None,
+        _alarm("res5")["AlarmDescription"],
+    ]
+
+    change_set = diff(table, current_names, current_descriptions)
+    assert change_set.created.tolist() == [0, 4]
+    assert change_set.updated.tolist() == [1, 2]
+    assert change_set.kept.tolist() == [3]
+    assert change_set.deleted.tolist() == [0, 4]
+
+    change_set = diff(table, [], [])
+    assert change_set.created.tolist() == [0, 1, 2, 3, 4]
+    assert change_set.deleted.tolist() == []
+
+    change_set = diff(AlarmTable.from_alarms([]), current_names, current_descriptions)
+    assert change_set.created.tolist() == []
+    assert change_set.deleted.tolist() == [0, 1, 2, 3, 4]
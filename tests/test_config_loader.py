@@ -1,7 +1,7 @@
 import json
 import os
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Union
 
 import pytest
 import yaml
@@ -144,6 +144,49 @@ def test_merge_global_name_conf(tmp_path: Path):
     assert loaded_conf[key1][key2 + "2"][key3] == "globally_configured_pattern"  # type: ignore
 
 
+@pytest.mark.parametrize("global_exclude_pattern", [["-test$"], "-test$"])
+def test_merge_global_name_patterns_conf(tmp_path: Path, global_exclude_pattern: Union[str, list[str]]):
+    """Tests lists of name patterns are overridden for including, and merged for excluding"""
+    conf = {
+        "globals": {
+            "resource_filter": {
+                "target_resource_name_pattern": ["^global-"],
+                "target_resource_name_exclude_pattern": global_exclude_pattern,
+            },
+        },
+        "resources": {
+            "myservice1": {
+                "target_resource_type": "lambda:function",
+                "target_resource_name_pattern": ["^myproj-", "^other-"],
+                "target_resource_name_exclude_pattern": ".*-dlq$",
+                "alarm": {
+                    "metrics": [""],
+                },
+            },
+            "myservice2": {
+                "target_resource_type": "lambda:function",
+                "target_resource_name_exclude_pattern": [".*-dlq$"],
+                "alarm": {
+                    "metrics": [""],
+                },
+            },
+        },
+    }
+
+    config_path = tmp_path / "config.json"
+
+    with open(config_path, "w") as f:
+        json.dump(conf, f)
+
+    loaded_conf = config_loader.load(str(config_path))
+
+    resources = loaded_conf["resources"]
+    assert resources["myservice1"]["target_resource_name_pattern"] == ["^myproj-", "^other-"]  # type: ignore
+    assert resources["myservice1"]["target_resource_name_exclude_pattern"] == ["-test$", ".*-dlq$"]  # type: ignore
+    assert resources["myservice2"]["target_resource_name_pattern"] == ["^global-"]  # type: ignore
+    assert resources["myservice2"]["target_resource_name_exclude_pattern"] == ["-test$", ".*-dlq$"]  # type: ignore
+
+
 def test_merge_global_tag_conf(tmp_path: Path):
     """Tests merge globals to resources"""
     conf = {
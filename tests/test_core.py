@@ -2,6 +2,7 @@ import itertools
 import json
 from io import StringIO
 from pathlib import Path
+from typing import Optional
 
 import boto3
 import pytest
@@ -94,9 +95,9 @@ def test_end_to_end_exec(
         f"+ {DEFAULT_ALARM_NAME_PREFIX}10-{metric}",
         f"+ {DEFAULT_ALARM_NAME_PREFIX}20-{metric}",
         f"+ {DEFAULT_ALARM_NAME_PREFIX}30-{metric}",
-        f"  {DEFAULT_ALARM_NAME_PREFIX}21-{metric}",
-        f"  {DEFAULT_ALARM_NAME_PREFIX}11-{metric}",
-        f"  {DEFAULT_ALARM_NAME_PREFIX}31-{metric}",
+        f"~ {DEFAULT_ALARM_NAME_PREFIX}21-{metric}",
+        f"~ {DEFAULT_ALARM_NAME_PREFIX}11-{metric}",
+        f"~ {DEFAULT_ALARM_NAME_PREFIX}31-{metric}",
         f"- {DEFAULT_ALARM_NAME_PREFIX}12-{metric}",
         f"- {DEFAULT_ALARM_NAME_PREFIX}22-{metric}",
         f"- {DEFAULT_ALARM_NAME_PREFIX}32-{metric}",
@@ -344,6 +345,151 @@ def test_end_to_end_update_existing(
         assert f"U {alarm_name_prefix}{i}-{metric}" in out
 
 
+@pytest.mark.parametrize("memory_limit_in_mb", [None, 0])
+def test_end_to_end_update_only_drifted(
+    mocker: MockerFixture,
+    tmp_path: Path,
+    capfd: pytest.CaptureFixture[str],
+    cloudwatch_client: CloudWatchClient,
+    memory_limit_in_mb: Optional[float],
+):
+    """Tests end-to-end functionality with update option doesn't update alarms without drifts
+
+    Args:
+        mocker (MockerFixture): mocker
+        tmp_path (Path): temporary directory path
+        capfd (CaptureFixture): capture
+        cloudwatch_client (CloudWatchClient): cloudwatch client
+        memory_limit_in_mb (Optional[float]): memory limit to spill the change set to disk
+    """
+    alarm_name_prefix = DEFAULT_ALARM_NAME_PREFIX
+    mock_get_target_metrics = mocker.patch("alarm_craft.core.get_target_metrics")
+
+    metric = "dummy"
+    mock_get_target_metrics.side_effect = lambda _: [
+        MetricAlarmParam(
+            TargetResource=TargetResource(
+                ResourceName=f"{i}",
+            ),
+            AlarmProps=AlarmProps(
+                MetricName=metric,
+                Namespace="dummy",
+                Dimensions=[{"Name": "DummyName", "Value": f"{i}"}],
+            ),
+        )
+        for i in range(10)
+    ]
+
+    config_path = tmp_path / "config.json"
+    conf = _config(alarm_name_prefix)
+    with open(config_path, "w") as f:
+        json.dump(conf, f)
+
+    from alarm_craft import core
+
+    command_opts = core.CommandOpts(
+        config_file=str(config_path),
+        confirm_changeset=False,
+        notification_topic_arn=[],
+        update_existing_alarms=True,
+        memory_limit_in_mb=memory_limit_in_mb,
+    )
+    core.main(command_opts)
+    out, _ = capfd.readouterr()
+    for i in range(10):
+        assert f"+ {alarm_name_prefix}{i}-{metric}" in out
+
+    # drift an alarm
+    cloudwatch_client.put_metric_alarm(
+        AlarmName=f"{alarm_name_prefix}3-{metric}",
+        MetricName=metric,
+        Namespace="dummy",
+        EvaluationPeriods=1,
+        ComparisonOperator="GreaterThanOrEqualToThreshold",
+    )
+
+    core.main(command_opts)
+    out, _ = capfd.readouterr()
+    assert f"U {alarm_name_prefix}3-{metric}" in out
+    for i in [0, 1, 2, 4, 5, 6, 7, 8, 9]:
+        assert f"  {alarm_name_prefix}{i}-{metric}" in out
+
+    core.main(command_opts)
+    out, _ = capfd.readouterr()
+    assert "no updates" in out
+
+
+def test_end_to_end_dead_letter(
+    mocker: MockerFixture, tmp_path: Path, capfd: pytest.CaptureFixture[str], cloudwatch_client: CloudWatchClient
+):
+    """Tests alarms failed to create are written to the dead-letter file and replayed
+
+    Args:
+        mocker (MockerFixture): mocker
+        tmp_path (Path): temporary directory path
+        capfd (CaptureFixture): capture
+        cloudwatch_client (CloudWatchClient): cloudwatch client
+    """
+    from botocore.exceptions import ClientError
+
+    from alarm_craft import core
+    from alarm_craft.alarm import AlarmHandler
+
+    mocker.patch.object(AlarmHandler, "retry_backoff_in_sec", 0)
+    mock_get_target_metrics = mocker.patch("alarm_craft.core.get_target_metrics")
+    metric = "dummy"
+    mock_get_target_metrics.return_value = [
+        MetricAlarmParam(
+            TargetResource=TargetResource(ResourceName=f"{i}"),
+            AlarmProps=AlarmProps(MetricName=metric),
+        )
+        for i in range(5)
+    ]
+    broken_alarm = f"{DEFAULT_ALARM_NAME_PREFIX}2-{metric}"
+
+    config_path = tmp_path / "config.json"
+    with open(config_path, "w") as f:
+        json.dump(_config(), f)
+    dead_letter_path = tmp_path / "dead-letter.jsonl"
+
+    original_call_api = AlarmHandler._call_api
+
+    def _call_api(self, rate_limiter, api, **kwargs):
+        if kwargs.get("AlarmName") == broken_alarm:
+            raise ClientError({"Error": {"Code": "InvalidParameterValue", "Message": "dummy"}}, "PutMetricAlarm")
+        return original_call_api(self, rate_limiter, api, **kwargs)
+
+    patched = mocker.patch.object(AlarmHandler, "_call_api", _call_api)
+
+    command_opts = core.CommandOpts(
+        config_file=str(config_path),
+        confirm_changeset=False,
+        notification_topic_arn=[],
+        update_existing_alarms=False,
+        dead_letter_file=str(dead_letter_path),
+    )
+    core.main(command_opts)
+
+    out, _ = capfd.readouterr()
+    assert f"! failed to create {broken_alarm}" in out
+    assert dead_letter_path.read_text().count("\n") == 1
+
+    # replay after the cause is fixed
+    mocker.stop(patched)
+    command_opts.replay_dead_letter_file = str(dead_letter_path)
+    core.main(command_opts)
+
+    out, _ = capfd.readouterr()
+    assert f"+ {broken_alarm}" in out
+    assert dead_letter_path.read_text() == ""
+
+    actual_result_alarms = cloudwatch_client.describe_alarms(
+        AlarmNamePrefix=DEFAULT_ALARM_NAME_PREFIX, AlarmTypes=["MetricAlarm"]
+    )
+    actual_alarm_names = {a["AlarmName"] for a in actual_result_alarms["MetricAlarms"]}
+    assert actual_alarm_names == {f"{DEFAULT_ALARM_NAME_PREFIX}{i}-{metric}" for i in range(5)}
+
+
 def _config(alarm_name_prefix: str = DEFAULT_ALARM_NAME_PREFIX, alarm_actions: list[str] = None) -> dict:
     conf = {
         "globals": {
@@ -364,3 +510,189 @@ def _config(alarm_name_prefix: str = DEFAULT_ALARM_NAME_PREFIX, alarm_actions: l
         conf["globals"]["alarm"]["alarm_actions"] = alarm_actions  # type: ignore
 
     return conf
+
+
+def test_end_to_end_resume(
+    mocker: MockerFixture, tmp_path: Path, capfd: pytest.CaptureFixture[str], cloudwatch_client: CloudWatchClient
+):
+    """Tests an interrupted run is resumed from the journal without repeating the operations applied
+
+    Args:
+        mocker (MockerFixture): mocker
+        tmp_path (Path): temporary directory path
+        capfd (CaptureFixture): capture
+        cloudwatch_client (CloudWatchClient): cloudwatch client
+    """
+    from alarm_craft import core
+    from alarm_craft.alarm import AlarmHandler
+
+    mock_get_target_metrics = mocker.patch("alarm_craft.core.get_target_metrics")
+    metric = "dummy"
+    mock_get_target_metrics.return_value = [
+        MetricAlarmParam(
+            TargetResource=TargetResource(ResourceName=f"{i}"),
+            AlarmProps=AlarmProps(MetricName=metric),
+        )
+        for i in range(5)
+    ]
+
+    config_path = tmp_path / "config.json"
+    with open(config_path, "w") as f:
+        json.dump(_config(), f)
+    journal_path = tmp_path / "journal.jsonl"
+
+    original_call_api = AlarmHandler._call_api
+    put_alarm_names: list[str] = []
+
+    def _call_api(self, rate_limiter, api, **kwargs):
+        if len(put_alarm_names) == 3:
+            raise KeyboardInterrupt()  # killed halfway
+        put_alarm_names.append(kwargs["AlarmName"])
+        return original_call_api(self, rate_limiter, api, **kwargs)
+
+    patched = mocker.patch.object(AlarmHandler, "_call_api", _call_api)
+
+    command_opts = core.CommandOpts(
+        config_file=str(config_path),
+        confirm_changeset=False,
+        notification_topic_arn=[],
+        update_existing_alarms=False,
+        journal_file=str(journal_path),
+    )
+    with pytest.raises(KeyboardInterrupt):
+        core.main(command_opts)
+    assert len(put_alarm_names) == 3
+
+    mocker.stop(patched)
+    mock_put_metric_alarm = mocker.spy(AlarmHandler, "_call_api")
+    mock_get_target_metrics.reset_mock()
+    command_opts.resume = True
+    core.main(command_opts)
+
+    # discovery is skipped and only the rest is applied
+    mock_get_target_metrics.assert_not_called()
+    resumed_alarm_names = [c.kwargs["AlarmName"] for c in mock_put_metric_alarm.call_args_list]
+    assert sorted(resumed_alarm_names + put_alarm_names) == [
+        f"{DEFAULT_ALARM_NAME_PREFIX}{i}-{metric}" for i in range(5)
+    ]
+    alarms = cloudwatch_client.describe_alarms(AlarmNamePrefix=DEFAULT_ALARM_NAME_PREFIX)["MetricAlarms"]
+    assert len(alarms) == 5
+
+    # nothing to resume after the plan is finished
+    core.main(command_opts)
+    mock_get_target_metrics.assert_called_once()
+
+
+def test_end_to_end_deadline(
+    mocker: MockerFixture, tmp_path: Path, capfd: pytest.CaptureFixture[str], cloudwatch_client: CloudWatchClient
+):
+    """Tests the run stops applying changes before the deadline and prints the rest in JSON
+
+    Args:
+        mocker (MockerFixture): mocker
+        tmp_path (Path): temporary directory path
+        capfd (CaptureFixture): capture
+        cloudwatch_client (CloudWatchClient): cloudwatch client
+    """
+    import time
+
+    from alarm_craft import core
+    from alarm_craft.alarm import AlarmHandler
+
+    mock_get_target_metrics = mocker.patch("alarm_craft.core.get_target_metrics")
+    metric = "dummy"
+    num_alarms = 10
+    mock_get_target_metrics.return_value = [
+        MetricAlarmParam(
+            TargetResource=TargetResource(ResourceName=f"{i}"),
+            AlarmProps=AlarmProps(MetricName=metric),
+        )
+        for i in range(num_alarms)
+    ]
+
+    config_path = tmp_path / "config.json"
+    with open(config_path, "w") as f:
+        json.dump(_config(), f)
+
+    original_call_api = AlarmHandler._call_api
+
+    def _slow_call_api(self, rate_limiter, api, **kwargs):
+        time.sleep(0.2)
+        return original_call_api(self, rate_limiter, api, **kwargs)
+
+    mocker.patch.object(AlarmHandler, "_call_api", _slow_call_api)
+
+    command_opts = core.CommandOpts(
+        config_file=str(config_path),
+        confirm_changeset=False,
+        notification_topic_arn=[],
+        update_existing_alarms=False,
+        deadline_in_sec=0.7,
+    )
+    core.main(command_opts)
+
+    out, _ = capfd.readouterr()
+    summary = json.loads(out.splitlines()[-1])
+    alarms = cloudwatch_client.describe_alarms(AlarmNamePrefix=DEFAULT_ALARM_NAME_PREFIX)["MetricAlarms"]
+    assert summary["Completed"] is False
+    assert len(summary["RemainingToCreate"]) == num_alarms - len(alarms)
+    assert summary["RemainingToDelete"] == []
+    assert summary["FailedToCreate"] == []
+
+
+@pytest.mark.parametrize("memory_limit_in_mb", [None, 0])
+def test_end_to_end_verify(
+    mocker: MockerFixture,
+    tmp_path: Path,
+    capfd: pytest.CaptureFixture[str],
+    cloudwatch_client: CloudWatchClient,
+    memory_limit_in_mb: Optional[float],
+):
+    """Tests alarms updated are verified after the update, with the change set in memory or spilled to disk
+
+    Args:
+        mocker (MockerFixture): mocker
+        tmp_path (Path): temporary directory path
+        capfd (CaptureFixture): capture
+        cloudwatch_client (CloudWatchClient): cloudwatch client
+        memory_limit_in_mb (Optional[float]): memory limit to spill the change set to disk
+    """
+    from alarm_craft import core
+
+    # an existing alarm without the fingerprint to update
+    cloudwatch_client.put_metric_alarm(
+        AlarmName=f"{DEFAULT_ALARM_NAME_PREFIX}0-dummy",
+        MetricName="dummy",
+        Namespace="dummy",
+        EvaluationPeriods=1,
+        ComparisonOperator="GreaterThanOrEqualToThreshold",
+    )
+
+    mock_get_target_metrics = mocker.patch("alarm_craft.core.get_target_metrics")
+    mock_get_target_metrics.return_value = [
+        MetricAlarmParam(
+            TargetResource=TargetResource(ResourceName=f"{i}"),
+            AlarmProps=AlarmProps(MetricName="dummy"),
+        )
+        for i in range(3)
+    ]
+
+    config_path = tmp_path / "config.json"
+    with open(config_path, "w") as f:
+        json.dump(_config(), f)
+
+    command_opts = core.CommandOpts(
+        config_file=str(config_path),
+        confirm_changeset=False,
+        notification_topic_arn=[],
+        update_existing_alarms=True,
+        verify=True,
+        journal_file=str(tmp_path / "journal.jsonl"),
+        memory_limit_in_mb=memory_limit_in_mb,
+    )
+    core.main(command_opts)
+
+    out, _ = capfd.readouterr()
+    assert "!" not in out.replace("!!! UPDATE ALARMS !!!", "")
+    assert "verified 3 alarm(s). 0 problem(s) found" in out
+    assert core.ApplyJournal(str(tmp_path / "journal.jsonl")).load_unfinished_plan() is None
@@ -0,0 +1,39 @@
+from pathlib import Path
+
+from alarm_craft import dead_letter
+from alarm_craft.alarm import CreateFailure, DeleteBatchResult, UpdateResult
+
+
+def test_write_and_load(tmp_path: Path):
+    """Tests alarms written to the dead-letter file are loaded to replay
+
+    Args:
+        tmp_path (Path): temporary directory path
+    """
+    file_path = str(tmp_path / "dead-letter.jsonl")
+    alarm_param1 = {"AlarmName": "alarm1", "MetricName": "m1", "Dimensions": [{"Name": "A", "Value": "a"}]}
+    alarm_param2 = {"AlarmName": "alarm2", "MetricName": "m2", "Threshold": 10}
+    result = UpdateResult(
+        delete_batches=[DeleteBatchResult(["alarm3", "alarm4", "alarm5"], ["alarm4"])],
+        failed_to_create=[CreateFailure(alarm_param1, "error1"), CreateFailure(alarm_param2, "error2")],
+        failed_to_delete=["alarm4"],
+    )
+
+    assert dead_letter.write(file_path, result) == 3
+
+    to_create, to_delete = dead_letter.load(file_path)
+    assert to_create == [alarm_param1, alarm_param2]
+    assert to_delete == ["alarm4"]
+
+
+def test_write_truncates(tmp_path: Path):
+    """Tests the dead-letter file keeps the failures of the last run only
+
+    Args:
+        tmp_path (Path): temporary directory path
+    """
+    file_path = str(tmp_path / "dead-letter.jsonl")
+    dead_letter.write(file_path, UpdateResult(failed_to_delete=["alarm1"]))
+    assert dead_letter.write(file_path, UpdateResult()) == 0
+
+    assert dead_letter.load(file_path) == ([], [])
@@ -0,0 +1,35 @@
+import time
+
+import pytest
+
+from alarm_craft.deadline import Deadline, LatencyTracker
+
+
+def test_remaining():
+    """Tests the remaining time decreases"""
+    deadline = Deadline(10)
+    remaining = deadline.remaining()
+    assert 9 < remaining <= 10
+
+    time.sleep(0.1)
+    assert deadline.remaining() < remaining
+
+
+def test_tracker_allows_next():
+    """Tests the tracker allows the next work only if it's expected to finish before the deadline"""
+    tracker = LatencyTracker(Deadline(1), smoothing=0.5, safety_factor=2.0)
+    assert tracker.allows_next()  # no measurement yet
+
+    tracker.observe(0.2)
+    assert tracker.estimated_latency == 0.2
+    assert tracker.allows_next()
+
+    tracker.observe(1.0)
+    assert tracker.estimated_latency == pytest.approx(0.6)
+    assert not tracker.allows_next()
+
+
+def test_tracker_after_deadline():
+    """Tests the tracker allows nothing after the deadline"""
+    tracker = Deadline(0).new_tracker()
+    assert not tracker.allows_next()
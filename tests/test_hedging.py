@@ -0,0 +1,114 @@
+import threading
+import time
+
+import pytest
+
+from alarm_craft.hedging import MIN_SAMPLES, RequestHedger, from_config
+from alarm_craft.pagination import prefetch_pages
+
+
+def _warm_up(hedger: RequestHedger) -> None:
+    for _ in range(MIN_SAMPLES):
+        hedger.call(lambda: None)
+
+
+def _slow_first_call(release: threading.Event):
+    calls: list[None] = []
+    lock = threading.Lock()
+
+    def _call() -> str:
+        with lock:
+            calls.append(None)
+            nth = len(calls)
+        if nth == 1:
+            # stalls until the test ends
+            release.wait(5)
+            return "slow"
+        return "fast"
+
+    return _call, calls
+
+
+def test_no_hedge_before_enough_latencies():
+    """Test calls are not hedged until enough latencies are observed"""
+    hedger = RequestHedger(max_extra_ratio=1.0)
+    assert hedger.hedge_delay() is None
+
+    _warm_up(hedger)
+    assert hedger.hedge_delay() is not None
+    assert hedger.hedged_calls == 0
+
+
+def test_hedge_slow_call():
+    """Test a slow call is sent again and the first response is used"""
+    hedger = RequestHedger(max_extra_ratio=1.0)
+    _warm_up(hedger)
+
+    release = threading.Event()
+    func, calls = _slow_first_call(release)
+    try:
+        assert hedger.call(func) == "fast"
+    finally:
+        release.set()
+    assert len(calls) == 2
+    assert hedger.hedged_calls == 1
+
+
+def test_hedge_capped():
+    """Test the extra calls are capped"""
+    hedger = RequestHedger(max_extra_ratio=0.0)
+    _warm_up(hedger)
+
+    release = threading.Event()
+    func, calls = _slow_first_call(release)
+    threading.Timer(0.2, release.set).start()
+    assert hedger.call(func) == "slow"
+    assert len(calls) == 1
+    assert hedger.hedged_calls == 0
+
+
+def test_hedge_error():
+    """Test an error is raised only when all the calls fail"""
+    hedger = RequestHedger(max_extra_ratio=1.0)
+    _warm_up(hedger)
+
+    nth = []
+
+    def _fails_first() -> str:
+        nth.append(None)
+        if len(nth) == 1:
+            time.sleep(0.2)
+            raise ValueError("failed")
+        return "fast"
+
+    # the first call fails, and the duplicate succeeds
+    assert hedger.call(_fails_first) == "fast"
+    assert len(nth) == 2
+
+    def _always_fails() -> str:
+        time.sleep(0.2)
+        raise ValueError("failed")
+
+    with pytest.raises(ValueError):
+        hedger.call(_always_fails)
+
+
+def test_prefetch_pages_hedged():
+    """Test pages are fetched through the hedger"""
+    hedger = RequestHedger(max_extra_ratio=1.0)
+    _warm_up(hedger)
+    pages = [{"Items": [1], "Next": "a"}, {"Items": [2], "Next": "b"}, {"Items": [3]}]
+    tokens = {"": 0, "a": 1, "b": 2}
+
+    results = [p["Items"][0] for p in prefetch_pages(lambda token: pages[tokens[token]], "Next", hedger=hedger)]
+    assert results == [1, 2, 3]
+    assert hedger.calls == MIN_SAMPLES + 3
+
+
+def test_from_config():
+    """Test creating the hedger from the config"""
+    assert from_config({"globals": {}}) is None
+
+    hedger = from_config({"globals": {"request_hedging": {"percentile": 90}}})
+    assert hedger is not None
+    assert hedger.percentile == 90
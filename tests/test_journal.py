@@ -0,0 +1,117 @@
+from pathlib import Path
+
+from alarm_craft.journal import ApplyJournal
+
+
+def test_resume_unfinished_plan(tmp_path: Path):
+    """Tests operations recorded for an unfinished plan are skipped on resume
+
+    Args:
+        tmp_path (Path): temporary directory path
+    """
+    file_path = str(tmp_path / "journal.jsonl")
+    to_create = [{"AlarmName": f"alarm{i}", "Threshold": i} for i in range(3)]
+    to_delete = ["alarm3", "alarm4"]
+
+    journal = ApplyJournal(file_path)
+    assert journal.begin(to_create, to_delete) == set()
+    journal.record_created("alarm0")
+    journal.record_deleted(["alarm4"])
+    journal.close()  # interrupted
+
+    resumed = ApplyJournal(file_path)
+    plan = resumed.load_unfinished_plan()
+    assert plan == (to_create, to_delete)
+    assert resumed.begin(*plan) == {"alarm0", "alarm4"}
+    resumed.end()
+
+    assert ApplyJournal(file_path).load_unfinished_plan() is None
+
+
+def test_finished_plan(tmp_path: Path):
+    """Tests operations recorded for a finished plan are not skipped when the same plan is applied again
+
+    Args:
+        tmp_path (Path): temporary directory path
+    """
+    file_path = str(tmp_path / "journal.jsonl")
+    to_create = [{"AlarmName": "alarm1", "Threshold": 1}, {"AlarmName": "alarm2", "Threshold": 1}]
+
+    journal = ApplyJournal(file_path)
+    journal.begin(to_create, [])
+    journal.record_created("alarm1")
+    journal.record_created("alarm2")
+    journal.end()
+
+    again = ApplyJournal(file_path)
+    assert again.begin(to_create, []) == set()
+    again.record_created("alarm1")
+    again.close()  # interrupted
+
+    assert ApplyJournal(file_path).begin(to_create, []) == {"alarm1"}
+
+
+def test_different_plan(tmp_path: Path):
+    """Tests operations recorded for another plan are not skipped
+
+    Args:
+        tmp_path (Path): temporary directory path
+    """
+    file_path = str(tmp_path / "journal.jsonl")
+    journal = ApplyJournal(file_path)
+    journal.begin([{"AlarmName": "alarm1", "Threshold": 1}], [])
+    journal.record_created("alarm1")
+    journal.close()
+
+    another = ApplyJournal(file_path)
+    assert another.begin([{"AlarmName": "alarm1", "Threshold": 2}], []) == set()
+    another.close()
+
+    # the last plan is the one to resume
+    assert ApplyJournal(file_path).load_unfinished_plan() == ([{"AlarmName": "alarm1", "Threshold": 2}], [])
+
+
+def test_broken_record(tmp_path: Path):
+    """Tests a record broken by a killed run is skipped
+
+    Args:
+        tmp_path (Path): temporary directory path
+    """
+    file_path = tmp_path / "journal.jsonl"
+    to_create = [{"AlarmName": "alarm1"}, {"AlarmName": "alarm2"}]
+    journal = ApplyJournal(str(file_path))
+    journal.begin(to_create, [])
+    journal.record_created("alarm1")
+    journal.close()
+    with open(file_path, "a") as f:
+        f.write('{"PlanId": "broken')
+
+    resumed = ApplyJournal(str(file_path))
+    assert resumed.begin(to_create, []) == {"alarm1"}
+    resumed.record_created("alarm2")
+    resumed.end()
+
+    assert ApplyJournal(str(file_path)).load_unfinished_plan() is None
+
+
+def test_plan_with_common_params(tmp_path: Path):
+    """Tests a plan is recorded with the common params and identified in any order
+
+    Args:
+        tmp_path (Path): temporary directory path
+    """
+    file_path = str(tmp_path / "journal.jsonl")
+    to_create = [{"AlarmName": f"alarm{i}", "Threshold": i} for i in range(3)]
+    common_param = {"Period": 60, "Threshold": 0}
+
+    journal = ApplyJournal(file_path)
+    journal.begin(to_create, ["alarm3"], common_param)
+    journal.record_created("alarm1")
+    journal.close()
+
+    plan = ApplyJournal(file_path).load_unfinished_plan()
+    assert plan == ([{"Period": 60, **alarm} for alarm in to_create], ["alarm3"])
+
+    resumed = ApplyJournal(file_path)
+    assert resumed.begin(list(reversed(plan[0])), plan[1]) == {"alarm1"}
+    assert resumed.plan_id == journal.plan_id
@@ -0,0 +1,80 @@
+import threading
+import time
+from typing import Any, Optional
+
+import pytest
+
+from alarm_craft.pagination import prefetch_pages
+
+
+def _fetch_page_func(num_pages: int, latency: float = 0.0, tokens: Optional[list[str]] = None):
+    def _fetch_page(token: str):
+        if tokens is not None:
+            tokens.append(token)
+        time.sleep(latency)
+        page = int(token or "0")
+        resp: dict[str, Any] = {"Items": [page]}
+        if page + 1 < num_pages:
+            resp["NextToken"] = str(page + 1)
+        return resp
+
+    return _fetch_page
+
+
+def test_prefetch_pages():
+    """Tests pages are iterated in order, passing the next token"""
+    tokens: list[str] = []
+    pages = list(prefetch_pages(_fetch_page_func(3, tokens=tokens), "NextToken"))
+
+    assert [p["Items"] for p in pages] == [[0], [1], [2]]
+    assert tokens == ["", "1", "2"]
+
+
+def test_prefetch_pages_hides_latency():
+    """Tests the next page is fetched while the caller processes a page"""
+    num_pages = 5
+    latency = 0.1
+
+    before = time.time()
+    for _ in prefetch_pages(_fetch_page_func(num_pages, latency), "NextToken"):
+        time.sleep(latency)  # processing
+    after = time.time()
+
+    # fetching and processing overlap
+    assert (after - before) < latency * num_pages * 1.5
+
+
+def test_prefetch_pages_lookahead():
+    """Tests pages are not fetched beyond the lookahead"""
+    tokens: list[str] = []
+    pages = iter(prefetch_pages(_fetch_page_func(10, tokens=tokens), "NextToken", lookahead=2))
+    next(pages)
+    time.sleep(0.3)
+
+    # a page taken, two pages queued and one page waiting for the room
+    assert len(tokens) == 4
+
+
+def test_prefetch_pages_error():
+    """Tests an error in fetching is raised to the caller after the pages fetched before"""
+
+    def _fetch_page(token: str):
+        if token:
+            raise ValueError("dummy")
+        return {"NextToken": "1"}
+
+    pages = iter(prefetch_pages(_fetch_page, "NextToken"))
+    assert next(pages) == {"NextToken": "1"}
+    with pytest.raises(ValueError):
+        next(pages)
+
+
+def test_prefetch_pages_stop():
+    """Tests fetching stops when the caller stops iterating"""
+    pages = iter(prefetch_pages(_fetch_page_func(1000), "NextToken", lookahead=1))
+    next(pages)
+    num_threads = threading.active_count()
+    pages.close()  # type: ignore
+    time.sleep(0.3)
+
+    assert threading.active_count() < num_threads
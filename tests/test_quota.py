@@ -0,0 +1,48 @@
+import threading
+import time
+
+from alarm_craft.quota import AlarmQuotaGate
+
+
+def test_acquire_within_quota():
+    """Tests new alarms take slots and existing alarms don't"""
+    gate = AlarmQuotaGate(3, ["alarm1", "alarm2"])
+    assert gate.slots == 1
+
+    gate.acquire("alarm1")
+    gate.acquire("alarm3")
+    assert gate.slots == 0
+
+    gate.cancel("alarm3")
+    assert gate.slots == 1
+
+
+def test_acquire_waits_for_release():
+    """Tests a new alarm exceeding the quota waits until an alarm is deleted"""
+    gate = AlarmQuotaGate(2, ["alarm1", "alarm2"])
+    acquired = threading.Event()
+
+    def _acquire():
+        gate.acquire("alarm3")
+        acquired.set()
+
+    worker = threading.Thread(target=_acquire)
+    worker.start()
+    time.sleep(0.1)
+    assert not acquired.is_set()
+
+    gate.release(1)
+    worker.join(1)
+    assert acquired.is_set()
+    assert gate.slots == 0
+
+
+def test_close_stops_blocking():
+    """Tests alarms waiting for the slots proceed when no more alarms are deleted"""
+    gate = AlarmQuotaGate(1, ["alarm1"])
+    worker = threading.Thread(target=gate.acquire, args=["alarm2"])
+    worker.start()
+
+    gate.close()
+    worker.join(1)
+    assert not worker.is_alive()
@@ -0,0 +1,82 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from alarm_craft.rate_limiter import AdaptiveTokenBucket, TokenBucket
+
+
+@pytest.mark.parametrize("calls_per_sec, num_calls", [(10, 5), (20, 8)])
+def test_token_bucket_paces_calls(calls_per_sec: float, num_calls: int):
+    """Tests the token bucket paces calls at the given rate
+
+    Args:
+        calls_per_sec (float): rate
+        num_calls (int): number of calls
+    """
+    bucket = TokenBucket(calls_per_sec)
+
+    before = time.monotonic()
+    for _ in range(num_calls):
+        bucket.acquire()
+    after = time.monotonic()
+
+    assert (after - before) >= num_calls / calls_per_sec * 0.95
+
+
+def test_token_bucket_shared_among_threads():
+    """Tests the rate is kept when the token bucket is shared among threads"""
+    calls_per_sec = 20
+    num_calls = 10
+    bucket = TokenBucket(calls_per_sec)
+
+    before = time.monotonic()
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        for _ in range(num_calls):
+            executor.submit(bucket.acquire)
+    after = time.monotonic()
+
+    assert (after - before) >= num_calls / calls_per_sec * 0.95
+
+
+def test_token_bucket_no_limit():
+    """Tests the token bucket without rate limit never blocks"""
+    bucket = TokenBucket(None)
+
+    before = time.monotonic()
+    for _ in range(1000):
+        bucket.acquire()
+    after = time.monotonic()
+
+    assert (after - before) < 0.5
+
+
+def test_adaptive_token_bucket_increases_on_success():
+    """Tests the adaptive token bucket increases its rate additively up to the max"""
+    bucket = AdaptiveTokenBucket(3, max_calls_per_sec=4, increase_step=0.25)
+
+    for _ in range(3):
+        bucket.on_success()
+    assert bucket.calls_per_sec == pytest.approx(3.75)
+
+    for _ in range(10):
+        bucket.on_success()
+    assert bucket.calls_per_sec == 4
+
+
+def test_adaptive_token_bucket_decreases_on_throttled():
+    """Tests the adaptive token bucket decreases its rate multiplicatively down to the min"""
+    bucket = AdaptiveTokenBucket(8, min_calls_per_sec=1.5, decrease_factor=0.5)
+
+    bucket.on_throttled()
+    assert bucket.calls_per_sec == 4
+    bucket.on_throttled()
+    assert bucket.calls_per_sec == 2
+    bucket.on_throttled()
+    assert bucket.calls_per_sec == 1.5
+
+
+def test_adaptive_token_bucket_initial_rate():
+    """Tests the initial rate of the adaptive token bucket without a configured rate"""
+    assert AdaptiveTokenBucket(None, max_calls_per_sec=20).calls_per_sec == 20
+    assert AdaptiveTokenBucket(0.1, min_calls_per_sec=0.5).calls_per_sec == 0.5
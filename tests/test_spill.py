@@ -0,0 +1,69 @@
+import gc
+import os
+
+import pytest
+
+from alarm_craft.alarm_record import AlarmRecord
+from alarm_craft.spill import MemoryMeter, SpillStore
+
+
+def _record(name: str, description: str = "desc", priority: int = 0) -> AlarmRecord:
+    props = {
+        "MetricName": "m1",
+        "Namespace": "AWS/MyService",
+        "Dimensions": [{"Name": "MyResourceName", "Value": name}],
+        "Threshold": 1,
+        "AlarmName": name,
+        "AlarmDescription": description,
+    }
+    return AlarmRecord.from_props(props, priority=priority)
+
+
+def test_memory_meter():
+    """Tests the meter tells when the records exceed the limit"""
+    meter = MemoryMeter(0.001)
+    exceeded = [meter.add(f"alarm{i}", "desc") for i in range(10)]
+    assert exceeded[0] is False
+    assert exceeded[-1] is True
+
+    assert MemoryMeter(0).add("alarm0") is True
+
+
+def test_spilled_change_set(tmp_path):
+    """Tests the change set is computed and read on disk"""
+    store = SpillStore(str(tmp_path))
+    store.add_required(
+        [_record("a1"), _record("a2", "new", priority=-1), _record("a3", priority=10), _record("a4", "same")]
+    )
+    store.add_current([("a4", "same"), ("a5", None), ("a2", "old")])
+    store.index()
+
+    store.add_change_set(("create", seq) for seq in store.created())
+    store.add_change_set(
+        ("update" if current != description else "keep", seq) for seq, description, current in store.matched()
+    )
+
+    created = store.change_set("create")
+    assert [r.name for r in created] == ["a3", "a1"]
+    assert len(created) == 2
+    assert created[0] == _record("a3", priority=10)
+    assert created[0].priority == 10
+    assert created[-1].name == "a1"
+    assert [r.name for r in created[:1]] == ["a3"]
+    with pytest.raises(IndexError):
+        created[2]
+
+    assert [r.name for r in store.change_set("update")] == ["a2"]
+    assert [r.name for r in store.change_set("keep")] == ["a4"]
+    assert list(store.change_set("delete")) == []
+    assert list(store.deleted()) == ["a5"]
+
+    file_path = store.file_path
+    assert os.path.exists(file_path)
+    # the database lives as long as the lists read from it
+    del store
+    gc.collect()
+    assert os.path.exists(file_path)
+    del created
+    gc.collect()
+    assert not os.path.exists(file_path)